@@ -0,0 +1,56 @@
+"""
+Compare re-parsing a strain bank from gnomic strings with opening a :mod:`gnomic.archive` file and decoding a
+sample of its strains::
+
+    python benchmarks/bench_archive.py [strains]
+"""
+from __future__ import print_function
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from gnomic import Genotype
+from gnomic.archive import GenotypeArchive, write_archive
+
+
+def strain(rng):
+    changes = ['-gene{}'.format(i) for i in rng.sample(range(500), 5)]
+    changes += ['+Ec/gene{}(v{})'.format(i, rng.randrange(3)) for i in rng.sample(range(500, 1000), 5)]
+    changes.append('site{}>promoterA:gene{}'.format(rng.randrange(100), rng.randrange(1000)))
+    return ' '.join(changes)
+
+
+def main(n=500):
+    rng = random.Random(0)
+    strings = {'strain-{}'.format(i): strain(rng) for i in range(n)}
+
+    start = time.time()
+    genotypes = {key: Genotype.parse(s) for key, s in strings.items()}
+    print('parsed {} strains in {:.2f} s'.format(n, time.time() - start))
+
+    path = os.path.join(tempfile.mkdtemp(), 'strains.gnomic')
+    start = time.time()
+    write_archive(path, genotypes)
+    print('wrote {:.1f} KiB archive in {:.2f} s'.format(os.path.getsize(path) / 1024., time.time() - start))
+
+    start = time.time()
+    archive = GenotypeArchive(path)
+    print('opened archive in {:.4f} s'.format(time.time() - start))
+
+    sample = rng.sample(sorted(strings), min(n, 100))
+    start = time.time()
+    for key in sample:
+        archive[key]
+    print('decoded {} strains in {:.4f} s'.format(len(sample), time.time() - start))
+
+    start = time.time()
+    for _ in archive.items():
+        pass
+    print('decoded all {} strains in {:.2f} s'.format(n, time.time() - start))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,74 @@
+"""
+Micro-benchmark of type dispatch in :meth:`Formatter.format_annotation` and :func:`gnomic.index.walk` on deeply
+nested annotations, compared with the ``isinstance`` chains they replaced::
+
+    python benchmarks/bench_dispatch.py [depth]
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+from gnomic.formatters import HTMLFormatter, TextFormatter
+from gnomic.index import walk
+from gnomic.types import AtLocus, CompositeAnnotation, CompositeAnnotationBase, Feature, Fusion, Plasmid
+
+
+class LadderMixin(object):
+    def _format_annotation(self, annotation):
+        if isinstance(annotation, Feature):
+            return self.format_feature(annotation)
+        elif isinstance(annotation, Fusion):
+            return self.format_fusion(annotation)
+        elif isinstance(annotation, Plasmid):
+            return self.format_plasmid(annotation)
+        elif isinstance(annotation, AtLocus):
+            return self.format_at_locus(annotation)
+        elif isinstance(annotation, CompositeAnnotation):
+            return self.format_composite_annotation(annotation)
+        raise NotImplementedError
+
+
+class LadderTextFormatter(LadderMixin, TextFormatter):
+    pass
+
+
+class LadderHTMLFormatter(LadderMixin, HTMLFormatter):
+    pass
+
+
+def ladder_walk(annotation):
+    yield annotation
+    if isinstance(annotation, CompositeAnnotationBase):
+        for member in annotation.annotations:
+            for nested in ladder_walk(member):
+                yield nested
+
+
+def nested(depth, width=3):
+    """
+    Build composite annotations of fusions of composite annotations, ``depth`` levels deep, ending in a plasmid.
+    """
+    if depth == 0:
+        return Plasmid('pX', tuple(Feature('gene{}'.format(i), organism='Ec', variant=('x',)) for i in range(width)))
+    features = [Feature('gene{}'.format(i), type='promoter') for i in range(width)]
+    return CompositeAnnotation(Fusion(*(features + [nested(depth - 1, width)])), AtLocus(features[0], features[1]))
+
+
+def main(depth=6):
+    annotation = nested(depth)
+    print('{} annotations, {} levels deep'.format(sum(1 for _ in walk(annotation)), depth))
+
+    for label, function in (
+            ('text ladder', lambda: LadderTextFormatter().format_annotation(annotation)),
+            ('text dispatch', lambda: TextFormatter().format_annotation(annotation)),
+            ('html ladder', lambda: LadderHTMLFormatter().format_annotation(annotation)),
+            ('html dispatch', lambda: HTMLFormatter().format_annotation(annotation)),
+            ('walk ladder', lambda: sum(1 for _ in ladder_walk(annotation))),
+            ('walk dispatch', lambda: sum(1 for _ in walk(annotation)))):
+        best = min(timeit.repeat(function, number=200, repeat=5)) / 200
+        print('{:<14} {:8.1f} us'.format(label, best * 1e6))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
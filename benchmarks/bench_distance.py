@@ -0,0 +1,44 @@
+"""
+Time :func:`gnomic.distance.pairwise_distances` and :func:`gnomic.distance.nearest_neighbours` on synthetic
+strains that share most of their changes::
+
+    python benchmarks/bench_distance.py [strains] [workers]
+"""
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+from gnomic import Genotype
+from gnomic.distance import ChangeBitsets, nearest_neighbours, pairwise_distances
+from gnomic.types import Feature
+
+
+def strains(n, seed=0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        changes = [-Feature('gene{}'.format(i)) for i in rng.sample(range(400), 20)]
+        changes += [+Feature('gene{}'.format(i), variant=('v{}'.format(rng.randrange(3)),))
+                    for i in rng.sample(range(400, 800), 20)]
+        yield Genotype(changes)
+
+
+def main(n=2000, workers=None):
+    genotypes = list(strains(n))
+
+    start = time.time()
+    bitsets = ChangeBitsets(genotypes)
+    print('interned {} strains in {:.2f} s'.format(n, time.time() - start))
+
+    start = time.time()
+    distances = pairwise_distances(bitsets, workers=workers)
+    print('{} pairwise distances in {:.2f} s'.format(len(distances), time.time() - start))
+
+    start = time.time()
+    nearest_neighbours(bitsets, k=10, workers=workers)
+    print('10 nearest neighbours of {} strains in {:.2f} s'.format(n, time.time() - start))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
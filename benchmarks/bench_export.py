@@ -0,0 +1,44 @@
+"""
+Compare exporting genotypes in the gnomic, text and HTML formats with three calls per genotype against a single call
+to :func:`gnomic.utils.genotype_to_formats`::
+
+    python benchmarks/bench_export.py [strains]
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+from bench_formatters import strains
+
+from gnomic.utils import genotype_to_formats, genotype_to_html, genotype_to_string, genotype_to_text
+
+
+def best_of(function, repeat=3):
+    elapsed = float('inf')
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        elapsed = min(elapsed, time.time() - start)
+    return elapsed
+
+
+def main(n=20000):
+    genotypes = list(strains(n))
+
+    def separately():
+        for genotype in genotypes:
+            genotype_to_string(genotype), genotype_to_text(genotype), genotype_to_html(genotype)
+
+    def together():
+        for genotype in genotypes:
+            genotype_to_formats(genotype)
+
+    separate = best_of(separately)
+    single = best_of(together)
+    print('three calls          {:.2f} s'.format(separate))
+    print('genotype_to_formats  {:.2f} s  ({:.2f}x)'.format(single, separate / single))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
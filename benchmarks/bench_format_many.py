@@ -0,0 +1,40 @@
+"""
+Compare formatting a collection of genotypes one at a time with :func:`gnomic.formatters.format_many`, with and
+without worker processes, on a collection where every genotype appears twice::
+
+    python benchmarks/bench_format_many.py [strains] [workers]
+"""
+from __future__ import print_function
+
+import multiprocessing
+import sys
+import time
+
+from bench_formatters import strains
+
+from gnomic.formatters import BUILTIN_FORMATTERS, format_many
+
+
+def timed(function):
+    start = time.time()
+    result = function()
+    return result, time.time() - start
+
+
+def main(n=20000, workers=multiprocessing.cpu_count()):
+    genotypes = list(strains(n // 2)) * 2
+    formatter = BUILTIN_FORMATTERS['html']
+
+    serial, elapsed = timed(lambda: [formatter.format_genotype(genotype) for genotype in genotypes])
+    print('one at a time                   {:.2f} s'.format(elapsed))
+
+    # the first call formats the strings of the annotations, which are cached on them for the following calls
+    runs = [('format_many', None), ('format_many, cached', None), ('format_many, {} workers'.format(workers), workers)]
+    for label, w in runs:
+        result, took = timed(lambda: format_many(genotypes, 'html', workers=w))
+        assert result == serial
+        print('{:<31} {:.2f} s  ({:.2f}x)'.format(label, took, elapsed / took))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,96 @@
+"""
+Compare the throughput and peak memory of formatting a large collection of genotypes into one string with
+:meth:`Formatter.format_genotype` and writing it to a buffered file with :meth:`Formatter.write_many`, and the
+throughput of formatters with and without an annotation cache on genotypes that share their annotation objects::
+
+    python benchmarks/bench_formatters.py [strains]
+"""
+from __future__ import print_function
+
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from gnomic import Genotype
+from gnomic.formatters import BUILTIN_FORMATTERS, GnomicFormatter, HTMLFormatter, TextFormatter
+from gnomic.types import Change, Feature, Fusion, Plasmid
+
+
+def strains(n, seed=0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        changes = [-Feature('gene{}'.format(i)) for i in rng.sample(range(500), 5)]
+        changes += [+Feature('gene{}'.format(i), organism='Ec', variant=('v{}'.format(rng.randrange(3)),))
+                    for i in rng.sample(range(500, 1000), 5)]
+        changes.append(Feature('site{}'.format(rng.randrange(50))) >
+                       Fusion(Feature('promoter{}'.format(rng.randrange(10)), type='promoter'),
+                              Feature('gene{}'.format(rng.randrange(1000)))))
+        changes.append(+Plasmid('p{}'.format(rng.randrange(20))))
+        yield Genotype(changes)
+
+
+def interned(genotypes):
+    """
+    Rebuild genotypes so that equal annotations are the same object, as they are when loaded from a store that
+    interns them.
+    """
+    annotations = {}
+
+    def intern(annotation):
+        if annotation is None:
+            return None
+        return annotations.setdefault((type(annotation), str(annotation)), annotation)
+
+    for genotype in genotypes:
+        yield Genotype([Change(intern(change.before), intern(change.after), multiple=change.multiple)
+                        for change in genotype.changes()])
+
+
+def measure(function):
+    tracemalloc.start()
+    start = time.time()
+    function()
+    elapsed = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024. / 1024.
+
+
+def main(n=20000):
+    genotypes = list(strains(n))
+    path = os.path.join(tempfile.mkdtemp(), 'genotypes.txt')
+
+    for name, formatter in sorted(BUILTIN_FORMATTERS.items()):
+        def join():
+            with io.open(path, 'w', encoding='utf-8') as fp:
+                fp.write('\n'.join(formatter.format_genotype(genotype) for genotype in genotypes))
+
+        def write():
+            with io.open(path, 'w', encoding='utf-8') as fp:
+                formatter.write_many(genotypes, fp)
+
+        for label, function in (('join', join), ('write_many', write)):
+            elapsed, peak = measure(function)
+            print('{:<7} {:<11} {:8.0f} genotypes/s  peak {:6.1f} MiB'.format(name, label, n / elapsed, peak))
+
+    genotypes = list(interned(genotypes))
+    for formatter_class in (GnomicFormatter, TextFormatter, HTMLFormatter):
+        for cache_size in (0, 4096):
+            formatter = formatter_class(cache_size=cache_size)
+            elapsed = float('inf')
+            for _ in range(3):
+                start = time.time()
+                for genotype in genotypes:
+                    formatter.format_genotype(genotype)
+                elapsed = min(elapsed, time.time() - start)
+            info = formatter.cache_info()
+            print('{:<7} cache {:<5} {:8.0f} genotypes/s  hit rate {:.0%}'.format(
+                formatter.format, cache_size, n / elapsed, info.hits / float(info.hits + info.misses or 1)))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
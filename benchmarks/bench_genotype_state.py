@@ -0,0 +1,42 @@
+"""
+Time applying batches of changes to a :class:`gnomic.genotype.GenotypeState`.
+
+The time per change should stay roughly constant as the batch size grows::
+
+    python benchmarks/bench_genotype_state.py
+"""
+from __future__ import print_function
+
+import timeit
+
+from gnomic.genotype import GenotypeState
+from gnomic.types import Feature
+
+SIZES = (1000, 2000, 4000, 8000)
+
+
+def redesign(size):
+    changes = []
+    for i in range(size):
+        feature = Feature('gene{}'.format(i), organism='Ec')
+        if i % 3 == 0:
+            changes.append(-feature)
+        elif i % 3 == 1:
+            changes.append(+feature)
+        else:
+            changes.append(feature > Feature('gene{}'.format(i), variant=('mut',)))
+    # revisit some earlier sites so that the batch also merges changes
+    changes.extend(-Feature('gene{}'.format(i), organism='Ec') for i in range(1, size, 6))
+    return changes
+
+
+def main():
+    for size in SIZES:
+        changes = redesign(size)
+        seconds = min(timeit.repeat(lambda: GenotypeState().apply(changes), number=1, repeat=3))
+        print('{:>6} changes: {:8.3f} s, {:6.2f} us/change'.format(
+            len(changes), seconds, seconds / len(changes) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Compare :class:`gnomic.formatters.HTMLFormatter` with the previous implementation, which escaped strings with
+chained ``str.replace`` calls and built markup with ``str.format``, on a genotype with 10000 features::
+
+    python benchmarks/bench_html.py [features]
+"""
+from __future__ import print_function
+
+import random
+import sys
+import timeit
+
+from gnomic import Genotype
+from gnomic.formatters import HTMLFormatter
+from gnomic.types import Accession, Feature, Fusion, Plasmid
+
+
+def escape_html(s, quote=False):
+    s = s.replace('&', '&amp;')
+    s = s.replace('<', '&lt;')
+    s = s.replace('>', '&gt;')
+    if quote:
+        s = s.replace('"', '&quot;')
+    return s
+
+
+class PreviousHTMLFormatter(HTMLFormatter):
+    def format_variant(self, variant):
+        return '<sup>{}</sup>'.format('; '.join(escape_html(v) for v in variant))
+
+    def format_feature(self, feature):
+        parts = ['<span class="gnomic-feature">']
+        if feature.organism:
+            parts += (escape_html(feature.organism), '/')
+        if feature.type:
+            parts += (escape_html(feature.type), '.')
+        if feature.name:
+            parts.append(escape_html(feature.name))
+        if feature.accession:
+            parts.append(escape_html(self.format_accession(feature.accession)))
+        if feature.variant:
+            parts.append(self.format_variant(feature.variant))
+        parts.append('</span>')
+        return ''.join(parts)
+
+    def format_fusion(self, fusion):
+        return '<span class="gnomic-fusion">{}</span>'.format(':'.join(map(self.format_annotation, fusion.annotations)))
+
+    def format_plasmid(self, plasmid):
+        if plasmid.annotations:
+            s = '(<span class="gnomic-plasmid-name">{}</span> {})' \
+                .format(escape_html(plasmid.name), ' '.join(map(self.format_annotation, plasmid.annotations)))
+        else:
+            s = '(<span class="gnomic-plasmid-name">{}</span>)'.format(escape_html(plasmid.name))
+        return '<span class="gnomic-plasmid">{}</span>'.format(s)
+
+
+def feature(rng, i):
+    return Feature('gene{}'.format(i),
+                   type=rng.choice([None, None, 'promoter', 'terminator']),
+                   organism=rng.choice([None, 'Ec', 'Sc']),
+                   accession=Accession(str(i), 'UniProt') if rng.random() < .1 else None,
+                   variant=(rng.choice(['x', 'K12R', 'A<B&C']),) if rng.random() < .2 else None)
+
+
+def genotype(n, seed=0):
+    rng = random.Random(seed)
+    changes, i = [], 0
+    while i < n:
+        roll = rng.random()
+        if roll < .6:
+            changes.append(+feature(rng, i))
+            i += 1
+        elif roll < .8:
+            changes.append(-feature(rng, i))
+            i += 1
+        elif roll < .95:
+            changes.append(feature(rng, i) > Fusion(feature(rng, i + 1), feature(rng, i + 2)))
+            i += 3
+        else:
+            changes.append(+Plasmid('p{}'.format(i), tuple(feature(rng, i + j) for j in range(1, 4))))
+            i += 4
+    return Genotype(changes)
+
+
+def main(n=10000):
+    g = genotype(n)
+    previous, current = PreviousHTMLFormatter(), HTMLFormatter()
+    assert current.format_genotype(g) == previous.format_genotype(g)
+
+    # alternate between the formatters so that both see the same load on a noisy machine
+    before = after = float('inf')
+    for _ in range(20):
+        before = min(before, timeit.timeit(lambda: previous.format_genotype(g), number=5) / 5)
+        after = min(after, timeit.timeit(lambda: current.format_genotype(g), number=5) / 5)
+    print('{} features, {} changes'.format(n, len(g.changes())))
+    print('previous  {:6.1f} ms'.format(before * 1e3))
+    print('current   {:6.1f} ms  ({:.2f}x)'.format(after * 1e3, before / after))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
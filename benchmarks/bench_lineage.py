@@ -0,0 +1,40 @@
+"""
+Measure the memory retained by the leaf of a long lineage built with :func:`gnomic.utils.chain`, with and without
+detaching each genotype from its parent::
+
+    python benchmarks/bench_lineage.py [generations]
+"""
+from __future__ import print_function
+
+import gc
+import sys
+import tracemalloc
+
+from gnomic.utils import chain
+
+
+def lineage(generations):
+    return ['+gene{}(v{})'.format(i % 100, i % 7) for i in range(generations)]
+
+
+def retained(gnomic_strings, **kwargs):
+    gc.collect()
+    tracemalloc.start()
+    genotype = chain(*gnomic_strings, **kwargs)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return genotype, size
+
+
+def main(generations=10000):
+    gnomic_strings = lineage(generations)
+    for detach in (False, True):
+        genotype, size = retained(gnomic_strings, detach=detach)
+        print('{:>6} generations, detach={!s:<5}: {:8.1f} MiB retained, {} changes in leaf'.format(
+            generations, detach, size / 2. ** 20, len(genotype.changes())))
+        del genotype
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
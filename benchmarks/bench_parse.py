@@ -0,0 +1,52 @@
+"""
+Compare parsing genotypes with a new :class:`gnomic.grammar.GnomicParser` per string, recording parse info, with
+:func:`gnomic.semantics.parse`, which reuses a :class:`gnomic.semantics.LeanParser` without parse info::
+
+    python benchmarks/bench_parse.py [repeat]
+
+The corpus mixes the kinds of strain designs found in strain banks: knock-outs, insertions of expression cassettes
+with promoters and terminators, point mutations, plasmids, and changes at loci.
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+from gnomic.grammar import GnomicParser
+from gnomic.semantics import DefaultSemantics, parse
+
+CORPUS = [
+    '-Sc/ura3 -Sc/leu2 -Sc/his3 -Sc/trp1',
+    '+P.pTEF1:Sc/ERG20(K197E):T.tCYC1 -Sc/gal80',
+    'gal1>P.pGAL1:Sc/HMG1:T.tADH1 gal10>P.pGAL10:Sc/ERG10:T.tTEF1',
+    '-Ec/lacZ -Ec/lacY +Ec/lacI(q) (pUC19 P.pLac:Ec/gfp(S65T) T.rrnB)',
+    'Ec/adhE>Ec/adhE(A267T; E568K) -Ec/ldhA -Ec/pta@locusA -Ec/frdBC',
+    '+{Sc/ERG9#UniProt:P29704, Sc/ERG1} site17>>P.pPDA1:Sc/ILV2(W586L)',
+    '-(pSC101) (pACYC P.pTrc:Ec/aroG(D146N) P.pTrc:Ec/tyrA(M53I; A354V)) -Ec/tyrR',
+    'Sc/pdc1>P.pTDH3:Kl/ldh:T.tENO2 -Sc/pdc5 -Sc/pdc6 Sc/adh1@chrXV>Sc/adh1(x)',
+    '+Bs/sacB -Ec/recA -Ec/endA1 +Ec/hsdR(mutant) +#GB:AAC73113(wild-type)',
+    'XI-2>P.pPGK1:Sc/CrtE:T.tTDH2 XII-5>P.pTEF1:Sc/CrtYB:T.tCYC1 X-3>P.pTDH3:Sc/CrtI:T.tADH1',
+]
+
+
+def grako_parse(text):
+    return GnomicParser().parse(text, whitespace='', semantics=DefaultSemantics(), rule_name='start')
+
+
+def main(repeat=3):
+    assert [grako_parse(text) for text in CORPUS] == [parse(text) for text in CORPUS]
+
+    # alternate between the parsers so that both see the same load on a noisy machine
+    before = after = float('inf')
+    for _ in range(5):
+        before = min(before, timeit.timeit(lambda: [grako_parse(text) for text in CORPUS], number=repeat))
+        after = min(after, timeit.timeit(lambda: [parse(text) for text in CORPUS], number=repeat))
+
+    n = repeat * len(CORPUS)
+    print('{} genotypes'.format(n))
+    print('GnomicParser     {:6.1f} us per genotype'.format(before / n * 1e6))
+    print('semantics.parse  {:6.1f} us per genotype  ({:.2f}x)'.format(after / n * 1e6, before / after))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""
+Time converting the changes of a genotype to strings the first time, when the strings of the changes and their
+annotations are computed, and the following times, when they are cached. Also compares formatting features with
+:class:`GnomicFormatter`, which reuses their cached strings, to building them with :meth:`Formatter.format_feature`::
+
+    python benchmarks/bench_strings.py [changes]
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+from gnomic.formatters import Formatter, GnomicFormatter
+from gnomic.index import walk
+from gnomic.types import Feature, Fusion, Plasmid
+
+
+def changes(n):
+    result = []
+    for i in range(n):
+        feature = Feature('gene{}'.format(i), organism='Ec', variant=('K{}R'.format(i % 7),) if i % 2 else None)
+        if i % 4 == 0:
+            result.append(-feature)
+        elif i % 4 == 1:
+            result.append(+feature)
+        elif i % 4 == 2:
+            result.append(Feature('site{}'.format(i)) > Fusion(Feature('p{}'.format(i), type='promoter'), feature))
+        else:
+            result.append(+Plasmid('p{}'.format(i), (feature,)))
+    return result
+
+
+def clear(changes):
+    for change in changes:
+        change.__dict__.pop('_str', None)
+        for annotation in (change.before, change.after):
+            for member in walk(annotation) if annotation is not None else ():
+                member.__dict__.pop('_str', None)
+
+
+def main(n=10000):
+    items = changes(n)
+    formatter = GnomicFormatter()
+
+    def cold():
+        clear(items)
+        return [str(change) for change in items]
+
+    overhead = min(timeit.repeat(lambda: clear(items), number=1, repeat=10))
+    uncached = min(timeit.repeat(cold, number=1, repeat=10)) - overhead
+    cached = min(timeit.repeat(lambda: [str(change) for change in items], number=1, repeat=10))
+    features = [member for change in items for annotation in (change.before, change.after) if annotation is not None
+                for member in walk(annotation) if isinstance(member, Feature)]
+    built = min(timeit.repeat(lambda: [Formatter.format_feature(formatter, feature) for feature in features],
+                              number=1, repeat=10))
+    reused = min(timeit.repeat(lambda: [formatter.format_feature(feature) for feature in features],
+                               number=1, repeat=10))
+
+    print('{} changes'.format(n))
+    print('str(), computed               {:6.2f} ms'.format(uncached * 1e3))
+    print('str(), cached                 {:6.2f} ms  ({:.0f}x)'.format(cached * 1e3, uncached / cached))
+    print('Formatter.format_feature      {:6.2f} ms'.format(built * 1e3))
+    print('GnomicFormatter.format_feature {:5.2f} ms  ({:.1f}x)'.format(reused * 1e3, built / reused))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
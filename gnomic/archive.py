@@ -0,0 +1,353 @@
+"""
+Read-only, memory-mapped files of parsed genotypes with random access by strain id.
+
+An archive is written once with :class:`ArchiveWriter` from a stream of genotypes and opened with
+:class:`GenotypeArchive`, which maps the file into memory and decodes only the genotypes that are accessed. Since the
+file is never modified once written, any number of processes can open the same archive and share its pages through
+the operating system's page cache.
+
+File layout (all integers little-endian)::
+
+    header     magic, version, and the offset and size of the string table and the strain index
+    records    the changes of each genotype's state, one record per strain
+    strings    uint32 count, (count + 1) uint32 offsets, UTF-8 data
+    index      (string id, record offset, record size) entries sorted by the UTF-8 encoded strain id
+
+A record is a uint32 change count followed by the changes. A change is a flags byte (``before``, ``after``,
+``multiple``) followed by the ``before`` and ``after`` annotations that are present. An annotation is a tag byte
+followed by:
+
+- feature: the string ids of name, type, accession and organism (or :data:`NONE`), a variant count and string ids,
+- fusion and composite annotation: a count and the annotations,
+- plasmid: the string id of the name, a count and the annotations,
+- annotation at a locus: the annotation and the locus.
+"""
+import mmap
+import os
+import struct
+from bisect import bisect_left
+
+import six
+
+from gnomic.genotype import Genotype
+from gnomic.types import Accession, AtLocus, Change, CompositeAnnotation, Feature, Fusion, Plasmid
+
+MAGIC = b'GNOMICAR'
+
+VERSION = 1
+
+NONE = 0xFFFFFFFF
+
+_HEADER = struct.Struct('<8sIQQQQ')
+
+_INDEX_ENTRY = struct.Struct('<IQI')
+
+_UINT32 = struct.Struct('<I')
+
+_FEATURE_FIELDS = struct.Struct('<IIIII')
+
+_FEATURE, _FUSION, _COMPOSITE, _PLASMID, _AT_LOCUS = range(5)
+
+_BEFORE, _AFTER, _MULTIPLE = 1, 2, 4
+
+
+class ArchiveError(Exception):
+    pass
+
+
+class ArchiveWriter(object):
+    """
+    Writes genotypes to an archive file.
+
+    Records are streamed to the file as genotypes are added; the string table and the index are written by
+    :meth:`close`. Use the writer as a context manager to make sure the archive is complete::
+
+        with ArchiveWriter('strains.gnomic') as writer:
+            for strain, genotype in genotypes:
+                writer.add(strain, genotype)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(b'\0' * _HEADER.size)
+        self._offset = _HEADER.size
+        self._strings = {}
+        self._index = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def __len__(self):
+        return len(self._index)
+
+    def _string(self, value):
+        if value is None:
+            return NONE
+        value = six.text_type(value)
+        try:
+            return self._strings[value]
+        except KeyError:
+            id = self._strings[value] = len(self._strings)
+            return id
+
+    def _annotation(self, annotation, out):
+        if isinstance(annotation, Feature):
+            variant = annotation.variant or ()
+            out.append(struct.pack('<B', _FEATURE))
+            out.append(_FEATURE_FIELDS.pack(self._string(annotation.name),
+                                            self._string(annotation.type),
+                                            self._string(annotation.accession),
+                                            self._string(annotation.organism),
+                                            len(variant)))
+            out.extend(_UINT32.pack(self._string(value)) for value in variant)
+        elif isinstance(annotation, AtLocus):
+            out.append(struct.pack('<B', _AT_LOCUS))
+            self._annotation(annotation.annotation, out)
+            self._annotation(annotation.locus, out)
+        else:
+            if isinstance(annotation, Plasmid):
+                out.append(struct.pack('<BI', _PLASMID, self._string(annotation.name)))
+            elif isinstance(annotation, Fusion):
+                out.append(struct.pack('<B', _FUSION))
+            elif isinstance(annotation, CompositeAnnotation):
+                out.append(struct.pack('<B', _COMPOSITE))
+            else:
+                raise ValueError('Cannot write {!r}'.format(annotation))
+
+            out.append(_UINT32.pack(len(annotation.annotations)))
+            for member in annotation.annotations:
+                self._annotation(member, out)
+
+    def add(self, strain, genotype):
+        """
+        Add the genotype of ``strain``.
+
+        :raises ValueError: if a genotype has already been added for ``strain``
+        """
+        key = six.text_type(strain).encode('utf-8')
+        if key in self._index:
+            raise ValueError('Duplicate strain {!r}'.format(strain))
+
+        changes = genotype.changes()
+        out = [_UINT32.pack(len(changes))]
+        for change in changes:
+            flags = (_BEFORE if change.before is not None else 0) | \
+                    (_AFTER if change.after is not None else 0) | \
+                    (_MULTIPLE if change.multiple else 0)
+            out.append(struct.pack('<B', flags))
+            if change.before is not None:
+                self._annotation(change.before, out)
+            if change.after is not None:
+                self._annotation(change.after, out)
+
+        record = b''.join(out)
+        self._file.write(record)
+        self._index[key] = (self._string(strain), self._offset, len(record))
+        self._offset += len(record)
+
+    def add_many(self, genotypes):
+        """
+        Add a dictionary or iterable of ``(strain, genotype)`` pairs.
+        """
+        for strain, genotype in (genotypes.items() if hasattr(genotypes, 'items') else genotypes):
+            self.add(strain, genotype)
+
+    def close(self):
+        if self._file.closed:
+            return
+
+        strings = [None] * len(self._strings)
+        for value, id in self._strings.items():
+            strings[id] = value.encode('utf-8')
+
+        offsets = [0]
+        for value in strings:
+            offsets.append(offsets[-1] + len(value))
+
+        strings_offset = self._offset
+        table = struct.pack('<I{}I'.format(len(offsets)), len(strings), *offsets) + b''.join(strings)
+        self._file.write(table)
+
+        index_offset = strings_offset + len(table)
+        index = b''.join(_INDEX_ENTRY.pack(*self._index[key]) for key in sorted(self._index))
+        self._file.write(index)
+
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, strings_offset, len(table), index_offset, len(self._index)))
+        self._file.close()
+
+
+class GenotypeArchive(object):
+    """
+    A read-only archive of genotypes, memory-mapped from a file written by :class:`ArchiveWriter`.
+
+    Behaves like a read-only dictionary from strain ids (as strings) to :class:`gnomic.Genotype` objects. Genotypes
+    are decoded on every access and not cached; decoded strings are cached.
+
+    :raises ArchiveError: if the file is not an archive or was written by an incompatible version
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            # empty files cannot be memory-mapped
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ArchiveError('{} is not a gnomic archive'.format(path))
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._strings_offset, _, self._index_offset, self._size = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            if magic != MAGIC:
+                raise ArchiveError('{} is not a gnomic archive'.format(path))
+            raise ArchiveError('Unsupported archive version {}'.format(version))
+
+        self._string_count, = _UINT32.unpack_from(self._mmap, self._strings_offset)
+        self._strings_data = self._strings_offset + 4 * (self._string_count + 2)
+        self._cache = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+
+    def __len__(self):
+        return self._size
+
+    def _string(self, id):
+        if id == NONE:
+            return None
+        try:
+            return self._cache[id]
+        except KeyError:
+            start, end = struct.unpack_from('<II', self._mmap, self._strings_offset + 4 * (id + 1))
+            value = self._cache[id] = self._mmap[self._strings_data + start:self._strings_data + end].decode('utf-8')
+            return value
+
+    def _entry(self, position):
+        return _INDEX_ENTRY.unpack_from(self._mmap, self._index_offset + _INDEX_ENTRY.size * position)
+
+    def _find(self, strain):
+        key = six.text_type(strain)
+        keys = _IndexKeys(self)
+        position = bisect_left(keys, key.encode('utf-8'))
+        if position < self._size and keys[position] == key.encode('utf-8'):
+            return self._entry(position)
+        raise KeyError(strain)
+
+    def __contains__(self, strain):
+        try:
+            self._find(strain)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        for position in range(self._size):
+            yield self._string(self._entry(position)[0])
+
+    def keys(self):
+        return list(self)
+
+    def __getitem__(self, strain):
+        _, offset, _ = self._find(strain)
+        return Genotype.from_changes(self._changes(offset))
+
+    def get(self, strain, default=None):
+        try:
+            return self[strain]
+        except KeyError:
+            return default
+
+    def items(self):
+        for position in range(self._size):
+            id, offset, _ = self._entry(position)
+            yield self._string(id), Genotype.from_changes(self._changes(offset))
+
+    def _changes(self, offset):
+        count, = _UINT32.unpack_from(self._mmap, offset)
+        offset += 4
+        changes = []
+        for _ in range(count):
+            flags = six.indexbytes(self._mmap[offset:offset + 1], 0)
+            offset += 1
+            before = after = None
+            if flags & _BEFORE:
+                before, offset = self._annotation(offset)
+            if flags & _AFTER:
+                after, offset = self._annotation(offset)
+            changes.append(Change(before, after, multiple=bool(flags & _MULTIPLE)))
+        return changes
+
+    def _annotation(self, offset):
+        tag = six.indexbytes(self._mmap[offset:offset + 1], 0)
+        offset += 1
+        if tag == _FEATURE:
+            name, type, accession, organism, variants = _FEATURE_FIELDS.unpack_from(self._mmap, offset)
+            offset += _FEATURE_FIELDS.size
+            variant = struct.unpack_from('<{}I'.format(variants), self._mmap, offset)
+            offset += 4 * variants
+            accession = self._string(accession)
+            return Feature(self._string(name),
+                           self._string(type),
+                           accession=Accession.parse(accession) if accession is not None else None,
+                           organism=self._string(organism),
+                           variant=tuple(self._string(id) for id in variant) or None), offset
+        elif tag == _AT_LOCUS:
+            annotation, offset = self._annotation(offset)
+            locus, offset = self._annotation(offset)
+            return AtLocus(annotation, locus), offset
+
+        name = None
+        if tag == _PLASMID:
+            name, = _UINT32.unpack_from(self._mmap, offset)
+            offset += 4
+        count, = _UINT32.unpack_from(self._mmap, offset)
+        offset += 4
+
+        members = []
+        for _ in range(count):
+            member, offset = self._annotation(offset)
+            members.append(member)
+
+        if tag == _PLASMID:
+            return Plasmid(self._string(name), tuple(members)), offset
+        elif tag == _FUSION:
+            return Fusion(*members), offset
+        elif tag == _COMPOSITE:
+            return CompositeAnnotation(*members), offset
+        raise ArchiveError('Unknown annotation tag {} at offset {}'.format(tag, offset - 1))
+
+
+class _IndexKeys(object):
+    """
+    A sequence view of the UTF-8 encoded strain ids of an archive's index, for use with :func:`bisect.bisect_left`.
+    """
+
+    def __init__(self, archive):
+        self._archive = archive
+
+    def __len__(self):
+        return self._archive._size
+
+    def __getitem__(self, position):
+        return self._archive._string(self._archive._entry(position)[0]).encode('utf-8')
+
+
+def write_archive(path, genotypes):
+    """
+    Write a dictionary or iterable of ``(strain, genotype)`` pairs to an archive at ``path``.
+    """
+    with ArchiveWriter(path) as writer:
+        writer.add_many(genotypes)
@@ -0,0 +1,58 @@
+from typing import Any, Hashable, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from gnomic.genotype import Genotype
+
+MAGIC: bytes
+VERSION: int
+NONE: int
+
+
+class ArchiveError(Exception): ...
+
+
+class ArchiveWriter(object):
+    path: str
+
+    def __init__(self, path: str) -> None: ...
+
+    def __enter__(self) -> 'ArchiveWriter': ...
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def add(self, strain: Hashable, genotype: Genotype) -> None: ...
+
+    def add_many(self, genotypes: Union[Mapping[Hashable, Genotype], Iterable[Tuple[Hashable, Genotype]]]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class GenotypeArchive(object):
+    path: str
+
+    def __init__(self, path: str) -> None: ...
+
+    def __enter__(self) -> 'GenotypeArchive': ...
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None: ...
+
+    def close(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, strain: Hashable) -> bool: ...
+
+    def __iter__(self) -> Iterator[str]: ...
+
+    def keys(self) -> List[str]: ...
+
+    def __getitem__(self, strain: Hashable) -> Genotype: ...
+
+    def get(self, strain: Hashable, default: Optional[Genotype] = None) -> Optional[Genotype]: ...
+
+    def items(self) -> Iterator[Tuple[str, Genotype]]: ...
+
+
+def write_archive(path: str,
+                  genotypes: Union[Mapping[Hashable, Genotype], Iterable[Tuple[Hashable, Genotype]]]) -> None: ...
@@ -0,0 +1,329 @@
+"""
+Columnar representation of a collection of genotypes, laid out like Apache Arrow arrays so that the changes can be
+scanned without creating Python objects. Requires NumPy (``pip install gnomic[numpy]``).
+
+A :class:`GenotypeTable` consists of two tables:
+
+- a change table with one row per change of each genotype's state, with the columns ``strain``, ``kind``,
+  ``multiple``, ``before`` and ``after``,
+- an annotation table with one row per annotation, with the columns ``node`` (one of :data:`NODE_TYPES`), ``name``,
+  ``type``, ``organism``, ``accession`` and ``variant``, and the children of fusions, composite annotations,
+  plasmids and annotations at a locus as a list column.
+
+``before`` and ``after`` are annotation rows, or -1. String columns are dictionary-encoded: they contain codes into a
+:class:`StringDictionary`, or -1 for missing values. List columns (``variant`` and ``children``) are stored as an
+``<name>_offsets`` array with the start of the values of each row and a ``<name>_values`` array, so that the values of
+row ``i`` are ``values[offsets[i]:offsets[i + 1]]``.
+"""
+import os
+
+import six
+
+from gnomic.distance import KINDS, change_kind
+from gnomic.genotype import Genotype
+from gnomic.matrix import Vocabulary, _require_numpy, np
+from gnomic.types import Accession, AtLocus, Change, CompositeAnnotation, Feature, Fusion, Plasmid
+
+FEATURE = 'feature'
+
+FUSION = 'fusion'
+
+COMPOSITE = 'composite'
+
+PLASMID = 'plasmid'
+
+AT_LOCUS = 'at_locus'
+
+NODE_TYPES = (FEATURE, FUSION, COMPOSITE, PLASMID, AT_LOCUS)
+
+STRING_COLUMNS = ('strain', 'name', 'type', 'organism', 'accession', 'variant')
+
+ARRAYS = ('change_strain', 'change_kind', 'change_multiple', 'change_before', 'change_after',
+          'node', 'name', 'type', 'organism', 'accession',
+          'variant_offsets', 'variant_values', 'children_offsets', 'children_values')
+
+
+def _identity(value):
+    return value
+
+
+class StringDictionary(object):
+    """
+    A dictionary of UTF-8 strings stored as a byte array and an array of offsets. Strings are decoded on access.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+        self._cache = {}
+        self._codes = None
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [six.text_type(s).encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(s) for s in encoded])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, code):
+        try:
+            return self._cache[code]
+        except KeyError:
+            value = self._cache[code] = bytes(self.data[self.offsets[code]:self.offsets[code + 1]]).decode('utf-8')
+            return value
+
+    def __iter__(self):
+        for code in range(len(self)):
+            yield self[code]
+
+    def code(self, value):
+        """
+        Return the code of ``value``, or -1 if it is not part of the dictionary.
+        """
+        if self._codes is None:
+            self._codes = {string: code for code, string in enumerate(self)}
+        return self._codes.get(value, -1)
+
+    def get(self, code):
+        """
+        Return the string with ``code``, or ``None`` if ``code`` is -1.
+        """
+        return None if code < 0 else self[code]
+
+
+class _Encoder(object):
+    def __init__(self):
+        self.dictionaries = {column: Vocabulary(key=_identity) for column in STRING_COLUMNS}
+        self.columns = {name: [] for name in ARRAYS if not name.endswith('_offsets')}
+        self.offsets = {'variant_offsets': [0], 'children_offsets': [0]}
+
+    def code(self, column, value):
+        return -1 if value is None else self.dictionaries[column].add(six.text_type(value))
+
+    def node(self, annotation):
+        if isinstance(annotation, Feature):
+            node, strings, variant, children = FEATURE, annotation, annotation.variant or (), ()
+        elif isinstance(annotation, AtLocus):
+            node, strings, variant, children = AT_LOCUS, None, (), (annotation.annotation, annotation.locus)
+        elif isinstance(annotation, Plasmid):
+            node, strings, variant, children = PLASMID, None, (), annotation.annotations
+        elif isinstance(annotation, Fusion):
+            node, strings, variant, children = FUSION, None, (), annotation.annotations
+        elif isinstance(annotation, CompositeAnnotation):
+            node, strings, variant, children = COMPOSITE, None, (), annotation.annotations
+        else:
+            raise ValueError('Cannot encode {!r}'.format(annotation))
+
+        children = [self.node(child) for child in children]
+
+        columns = self.columns
+        row = len(columns['node'])
+        columns['node'].append(NODE_TYPES.index(node))
+        for column in ('name', 'type', 'organism', 'accession'):
+            columns[column].append(self.code(column, getattr(strings, column, None)))
+        if node == PLASMID:
+            columns['name'][row] = self.code('name', annotation.name)
+
+        columns['variant_values'].extend(self.code('variant', value) for value in variant)
+        self.offsets['variant_offsets'].append(len(columns['variant_values']))
+        columns['children_values'].extend(children)
+        self.offsets['children_offsets'].append(len(columns['children_values']))
+        return row
+
+    def change(self, strain, change):
+        columns = self.columns
+        columns['change_strain'].append(self.code('strain', strain))
+        columns['change_kind'].append(KINDS.index(change_kind(change)))
+        columns['change_multiple'].append(change.multiple)
+        columns['change_before'].append(-1 if change.before is None else self.node(change.before))
+        columns['change_after'].append(-1 if change.after is None else self.node(change.after))
+
+    def arrays(self):
+        dtypes = {'change_kind': np.int8, 'change_multiple': np.bool_, 'node': np.int8}
+        arrays = {name: np.array(values, dtype=dtypes.get(name, np.int32)) for name, values in self.columns.items()}
+        arrays.update((name, np.array(offsets, dtype=np.int64)) for name, offsets in self.offsets.items())
+        return arrays
+
+
+class GenotypeTable(object):
+    """
+    The changes of a collection of genotypes as columnar arrays.
+
+    Rows are decoded into :class:`gnomic.types.Change` and annotation objects only when they are accessed, so a
+    table loaded from memory-mapped files can be sliced and filtered with NumPy and only the rows of interest turned
+    back into objects.
+
+    Example::
+
+        table = GenotypeTable.from_genotypes({'strain-1': Genotype.parse('-geneA'),
+                                              'strain-2': Genotype.parse('+geneB')})
+        table.save('strains')
+        table = GenotypeTable.load('strains')
+        deletions = np.flatnonzero(table.change_kind == table.kind_code(DELETION))
+        table.change(deletions[0])  # Change(before=Feature(name='geneA'))
+    """
+
+    def __init__(self, arrays, dictionaries):
+        self.arrays = arrays
+        self.dictionaries = dictionaries
+        self._annotations = {}
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['arrays'][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.arrays['change_strain'])
+
+    @classmethod
+    def from_genotypes(cls, genotypes):
+        """
+        Encode genotypes in a table.
+
+        :param genotypes: a dictionary or iterable of ``(strain, genotype)`` pairs; strains are converted to strings
+        :raises ValueError: if a strain occurs more than once
+        """
+        _require_numpy()
+        encoder = _Encoder()
+        for strain, genotype in (genotypes.items() if hasattr(genotypes, 'items') else genotypes):
+            strain = six.text_type(strain)
+            # the changes of each strain are kept in one run of rows
+            if encoder.code('strain', strain) < len(encoder.dictionaries['strain']) - 1:
+                raise ValueError('Duplicate strain {!r}'.format(strain))
+            for change in genotype.changes():
+                encoder.change(strain, change)
+
+        return cls(encoder.arrays(), {column: StringDictionary.from_strings(vocabulary)
+                                      for column, vocabulary in encoder.dictionaries.items()})
+
+    def save(self, directory):
+        """
+        Save the table to ``directory`` as one ``.npy`` file per array, creating the directory if necessary.
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        arrays = dict(self.arrays)
+        for column, dictionary in self.dictionaries.items():
+            arrays['{}_dictionary_data'.format(column)] = dictionary.data
+            arrays['{}_dictionary_offsets'.format(column)] = dictionary.offsets
+
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, name + '.npy'), np.asarray(array))
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Load a table saved with :meth:`save`. By default, the arrays are memory-mapped read-only rather than read
+        into memory.
+        """
+        _require_numpy()
+
+        def load(name):
+            return np.load(os.path.join(directory, name + '.npy'), mmap_mode='r' if mmap else None)
+
+        return cls({name: load(name) for name in ARRAYS},
+                   {column: StringDictionary(load('{}_dictionary_data'.format(column)),
+                                             load('{}_dictionary_offsets'.format(column)))
+                    for column in STRING_COLUMNS})
+
+    @property
+    def strains(self):
+        return list(self.dictionaries['strain'])
+
+    def kind_code(self, kind):
+        return KINDS.index(kind)
+
+    def code(self, column, value):
+        """
+        Return the code of ``value`` in the dictionary of a string column, or -1 if it does not occur.
+        """
+        return self.dictionaries[column].code(value)
+
+    def rows(self, strain):
+        """
+        Return the rows of the changes of ``strain``.
+
+        :raises KeyError: if the table has no genotype for ``strain``
+        """
+        code = self.code('strain', six.text_type(strain))
+        if code == -1:
+            raise KeyError(strain)
+        return np.flatnonzero(self.arrays['change_strain'] == code)
+
+    def _list(self, name, row):
+        offsets = self.arrays[name + '_offsets']
+        return self.arrays[name + '_values'][offsets[row]:offsets[row + 1]]
+
+    def annotation(self, row):
+        """
+        Decode the annotation in a row of the annotation table.
+        """
+        row = int(row)
+        try:
+            return self._annotations[row]
+        except KeyError:
+            pass
+
+        arrays, dictionaries = self.arrays, self.dictionaries
+        node = NODE_TYPES[arrays['node'][row]]
+        if node == FEATURE:
+            variant = tuple(dictionaries['variant'][code] for code in self._list('variant', row)) or None
+            accession = dictionaries['accession'].get(arrays['accession'][row])
+            annotation = Feature(dictionaries['name'].get(arrays['name'][row]),
+                                 dictionaries['type'].get(arrays['type'][row]),
+                                 accession=Accession.parse(accession) if accession is not None else None,
+                                 organism=dictionaries['organism'].get(arrays['organism'][row]),
+                                 variant=variant)
+        else:
+            children = [self.annotation(child) for child in self._list('children', row)]
+            if node == AT_LOCUS:
+                annotation = AtLocus(*children)
+            elif node == PLASMID:
+                annotation = Plasmid(dictionaries['name'].get(arrays['name'][row]), tuple(children))
+            elif node == FUSION:
+                annotation = Fusion(*children)
+            else:
+                annotation = CompositeAnnotation(*children)
+
+        self._annotations[row] = annotation
+        return annotation
+
+    def change(self, row):
+        """
+        Decode a row of the change table.
+        """
+        before, after = self.arrays['change_before'][row], self.arrays['change_after'][row]
+        return Change(self.annotation(before) if before >= 0 else None,
+                      self.annotation(after) if after >= 0 else None,
+                      multiple=bool(self.arrays['change_multiple'][row]))
+
+    def changes(self, rows=None):
+        """
+        Iterate over the decoded changes of ``rows``, or of every row.
+        """
+        for row in (range(len(self)) if rows is None else rows):
+            yield self.change(row)
+
+    def genotype(self, strain):
+        """
+        Rebuild the genotype of ``strain``.
+
+        :raises KeyError: if the table has no genotype for ``strain``
+        """
+        return Genotype.from_changes(self.changes(self.rows(strain)))
+
+    def genotypes(self):
+        """
+        Iterate over ``(strain, genotype)`` pairs of every genotype in the table.
+        """
+        strains = self.arrays['change_strain']
+        boundaries = np.flatnonzero(np.diff(strains)) + 1
+        by_strain = {int(strains[rows[0]]): rows for rows in np.split(np.arange(len(self)), boundaries) if len(rows)}
+        for code, strain in enumerate(self.dictionaries['strain']):
+            yield strain, Genotype.from_changes(self.changes(by_strain.get(code, ())))
@@ -0,0 +1,75 @@
+from typing import Dict, Hashable, Iterable, Iterator, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from gnomic.genotype import Genotype
+from gnomic.types import Annotation, Change
+
+FEATURE: str
+FUSION: str
+COMPOSITE: str
+PLASMID: str
+AT_LOCUS: str
+NODE_TYPES: Tuple[str, ...]
+STRING_COLUMNS: Tuple[str, ...]
+ARRAYS: Tuple[str, ...]
+
+
+class StringDictionary(object):
+    data: np.ndarray
+    offsets: np.ndarray
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None: ...
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> 'StringDictionary': ...
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, code: int) -> str: ...
+
+    def __iter__(self) -> Iterator[str]: ...
+
+    def code(self, value: str) -> int: ...
+
+    def get(self, code: int) -> Optional[str]: ...
+
+
+class GenotypeTable(object):
+    arrays: Dict[str, np.ndarray]
+    dictionaries: Dict[str, StringDictionary]
+
+    def __init__(self, arrays: Dict[str, np.ndarray], dictionaries: Dict[str, StringDictionary]) -> None: ...
+
+    def __getattr__(self, name: str) -> np.ndarray: ...
+
+    def __len__(self) -> int: ...
+
+    @classmethod
+    def from_genotypes(cls,
+                       genotypes: Union[Mapping[Hashable, Genotype],
+                                        Iterable[Tuple[Hashable, Genotype]]]) -> 'GenotypeTable': ...
+
+    def save(self, directory: str) -> None: ...
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'GenotypeTable': ...
+
+    @property
+    def strains(self) -> Sequence[str]: ...
+
+    def kind_code(self, kind: str) -> int: ...
+
+    def code(self, column: str, value: str) -> int: ...
+
+    def rows(self, strain: Hashable) -> np.ndarray: ...
+
+    def annotation(self, row: int) -> Annotation: ...
+
+    def change(self, row: int) -> Change: ...
+
+    def changes(self, rows: Optional[Iterable[int]] = None) -> Iterator[Change]: ...
+
+    def genotype(self, strain: Hashable) -> Genotype: ...
+
+    def genotypes(self) -> Iterator[Tuple[str, Genotype]]: ...
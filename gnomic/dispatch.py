@@ -0,0 +1,65 @@
+"""
+Dispatch on the type of an annotation.
+"""
+
+
+class TypeDispatch(object):
+    """
+    A table of handlers keyed by type, similar to :func:`functools.singledispatch`.
+
+    A lookup first tries the exact type, then falls back to the nearest registered base class in the method
+    resolution order. Results are cached per type, so repeated lookups cost a single dictionary access.
+
+    Example::
+
+        describe = TypeDispatch()
+        describe.register(Feature, lambda feature: 'feature')
+        describe.register(CompositeAnnotationBase, lambda composite: 'composite')
+        describe.dispatch(Fusion)  # the handler of CompositeAnnotationBase
+    """
+
+    def __init__(self, handlers=None):
+        self._handlers = dict(handlers or {})
+        self._cache = {}
+
+    def register(self, cls, handler=None):
+        """
+        Register ``handler`` for ``cls`` and its subclasses. Can be used as a decorator if ``handler`` is omitted.
+        """
+        if handler is None:
+            return lambda handler: self.register(cls, handler)
+        self._handlers[cls] = handler
+        self._cache.clear()
+        return handler
+
+    def unregister(self, cls):
+        """
+        Remove the handler registered for ``cls``.
+
+        :raises KeyError: if no handler is registered for ``cls`` itself
+        """
+        del self._handlers[cls]
+        self._cache.clear()
+
+    def dispatch(self, cls):
+        """
+        Return the handler for ``cls``, or ``None`` if no handler is registered for it or any of its bases.
+        """
+        try:
+            return self._cache[cls]
+        except KeyError:
+            pass
+
+        handler = None
+        for base in getattr(cls, '__mro__', (cls,)):
+            if base in self._handlers:
+                handler = self._handlers[base]
+                break
+        self._cache[cls] = handler
+        return handler
+
+    def __contains__(self, cls):
+        return self.dispatch(cls) is not None
+
+    def copy(self):
+        return TypeDispatch(self._handlers)
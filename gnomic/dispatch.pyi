@@ -0,0 +1,17 @@
+from typing import Any, Callable, Dict, Generic, Optional, Type, TypeVar
+
+H = TypeVar('H')
+
+
+class TypeDispatch(Generic[H]):
+    def __init__(self, handlers: Optional[Dict[type, H]] = None) -> None: ...
+
+    def register(self, cls: type, handler: Optional[H] = None) -> Any: ...
+
+    def unregister(self, cls: type) -> None: ...
+
+    def dispatch(self, cls: type) -> Optional[H]: ...
+
+    def __contains__(self, cls: type) -> bool: ...
+
+    def copy(self) -> 'TypeDispatch[H]': ...
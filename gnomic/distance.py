@@ -0,0 +1,157 @@
+"""
+Bulk edit distances between genotypes. Requires NumPy (``pip install gnomic[numpy]``).
+
+The distance between two genotypes is the size of the symmetric difference of their canonical changes (see
+:meth:`gnomic.Genotype.canonical_changes`), optionally weighted by the kind of each change.
+"""
+from multiprocessing import Pool
+
+import six
+
+from gnomic.matrix import Vocabulary, _popcount, _require_numpy, np
+
+INSERTION = 'insertion'
+
+DELETION = 'deletion'
+
+REPLACEMENT = 'replacement'
+
+KINDS = (INSERTION, DELETION, REPLACEMENT)
+
+_WORD_BITS = 64
+
+# upper bound on the number of distances computed at once by each worker
+_BLOCK_CELLS = 1 << 22
+
+
+def change_kind(change):
+    if change.before is None:
+        return INSERTION
+    elif change.after is None:
+        return DELETION
+    return REPLACEMENT
+
+
+class ChangeBitsets(object):
+    """
+    The canonical changes of a list of genotypes, interned once and encoded as one bitset per genotype and kind of
+    change.
+    """
+
+    def __init__(self, genotypes):
+        _require_numpy()
+        self.vocabularies = {kind: Vocabulary(key=six.text_type) for kind in KINDS}
+
+        rows = []
+        for genotype in genotypes:
+            ids = {kind: [] for kind in KINDS}
+            for change in genotype.canonical_changes():
+                kind = change_kind(change)
+                ids[kind].append(self.vocabularies[kind].add(change))
+            rows.append(ids)
+
+        self.bits = {}
+        for kind in KINDS:
+            bits = np.zeros((len(rows), len(self.vocabularies[kind]) // _WORD_BITS + 1), dtype=np.uint64)
+            for row, ids in enumerate(rows):
+                ids = np.array(ids[kind], dtype=np.int64)
+                np.bitwise_or.at(bits[row], ids // _WORD_BITS,
+                                 np.left_shift(np.uint64(1), (ids % _WORD_BITS).astype(np.uint64)))
+            self.bits[kind] = bits
+
+    def __len__(self):
+        return len(next(iter(self.bits.values())))
+
+    def distances(self, start, stop, weights=None):
+        """
+        Return the ``(stop - start, genotypes)`` array of distances from genotypes ``start`` to ``stop``.
+        """
+        distances = np.zeros((stop - start, len(self)), dtype=np.float64 if weights else np.int64)
+        for kind, bits in self.bits.items():
+            weight = weights.get(kind, 1) if weights else 1
+            if not weight:
+                continue
+            for row in range(start, stop):
+                distances[row - start] += weight * _popcount(bits ^ bits[row])
+        return distances
+
+
+_shared = None
+
+
+def _init_worker(bitsets, weights):
+    global _shared
+    _shared = bitsets, weights
+
+
+def _distances(bounds):
+    bitsets, weights = _shared
+    return bounds, bitsets.distances(bounds[0], bounds[1], weights)
+
+
+def _blocks(n, workers):
+    size = max(1, min(-(-n // (4 * workers)) if workers else n, _BLOCK_CELLS // max(1, n)))
+    return [(start, min(start + size, n)) for start in range(0, n, size)]
+
+
+def _iter_distances(bitsets, weights, workers):
+    """
+    Iterate over ``((start, stop), distances)`` blocks of rows of the full distance matrix.
+    """
+    blocks = _blocks(len(bitsets), workers)
+    if not workers or workers < 2 or len(blocks) < 2:
+        for bounds in blocks:
+            yield bounds, bitsets.distances(bounds[0], bounds[1], weights)
+        return
+
+    pool = Pool(workers, initializer=_init_worker, initargs=(bitsets, weights))
+    try:
+        for result in pool.imap_unordered(_distances, blocks):
+            yield result
+    finally:
+        pool.terminate()
+
+
+def pairwise_distances(genotypes, weights=None, workers=None):
+    """
+    Compute the distances between every pair of genotypes.
+
+    :param genotypes: a sequence of :class:`gnomic.Genotype` objects
+    :param weights: an optional dictionary mapping :data:`INSERTION`, :data:`DELETION` and :data:`REPLACEMENT` to
+        the weight of each kind of change; kinds that are not given have a weight of 1
+    :param workers: the number of worker processes to compute blocks of rows with
+    :return: the condensed distance matrix in the order used by :func:`scipy.spatial.distance.squareform`
+    """
+    bitsets = genotypes if isinstance(genotypes, ChangeBitsets) else ChangeBitsets(genotypes)
+    n = len(bitsets)
+    condensed = np.zeros(n * (n - 1) // 2, dtype=np.float64 if weights else np.int64)
+    for (start, stop), distances in _iter_distances(bitsets, weights, workers):
+        for row in range(start, stop):
+            offset = n * row - row * (row + 1) // 2
+            condensed[offset:offset + n - row - 1] = distances[row - start, row + 1:]
+    return condensed
+
+
+def nearest_neighbours(genotypes, k=5, weights=None, workers=None):
+    """
+    Find the ``k`` nearest neighbours of every genotype without materializing the full distance matrix.
+
+    :return: a tuple of ``(genotypes, k)`` arrays with the indices of the neighbours of each genotype and their
+        distances, nearest first
+    """
+    bitsets = genotypes if isinstance(genotypes, ChangeBitsets) else ChangeBitsets(genotypes)
+    n = len(bitsets)
+    k = min(k, n - 1)
+    indices = np.zeros((n, k), dtype=np.int64)
+    nearest = np.zeros((n, k), dtype=np.float64 if weights else np.int64)
+    if k < 1:
+        return indices, nearest
+
+    for (start, stop), distances in _iter_distances(bitsets, weights, workers):
+        distances = distances.astype(np.float64)
+        distances[np.arange(stop - start), np.arange(start, stop)] = np.inf  # exclude each genotype itself
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(distances, candidates, axis=1), axis=1, kind='stable')
+        indices[start:stop] = np.take_along_axis(candidates, order, axis=1)
+        nearest[start:stop] = np.take_along_axis(distances, indices[start:stop], axis=1)
+    return indices, nearest
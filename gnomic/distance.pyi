@@ -0,0 +1,37 @@
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from gnomic.genotype import Genotype
+from gnomic.matrix import Vocabulary
+from gnomic.types import Change
+
+INSERTION: str
+DELETION: str
+REPLACEMENT: str
+KINDS: Tuple[str, ...]
+
+
+def change_kind(change: Change) -> str: ...
+
+
+class ChangeBitsets(object):
+    vocabularies: Dict[str, Vocabulary[Change]]
+    bits: Dict[str, np.ndarray]
+
+    def __init__(self, genotypes: Iterable[Genotype]) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def distances(self, start: int, stop: int, weights: Optional[Dict[str, float]] = None) -> np.ndarray: ...
+
+
+def pairwise_distances(genotypes: Union[Iterable[Genotype], ChangeBitsets],
+                       weights: Optional[Dict[str, float]] = None,
+                       workers: Optional[int] = None) -> np.ndarray: ...
+
+
+def nearest_neighbours(genotypes: Union[Iterable[Genotype], ChangeBitsets],
+                       k: int = 5,
+                       weights: Optional[Dict[str, float]] = None,
+                       workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]: ...
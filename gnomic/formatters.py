@@ -1,10 +1,20 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import re
 from abc import abstractmethod, ABCMeta
+from collections import OrderedDict, namedtuple
+from importlib import import_module
 
 import six
 
+try:
+    from collections.abc import MutableMapping
+except ImportError:  # pragma: no cover
+    from collections import MutableMapping
+
+from gnomic.dispatch import TypeDispatch
+from gnomic.index import walk
 from gnomic.types import Feature, Fusion, Plasmid, AtLocus, CompositeAnnotation
 
 DELTA = '\u0394'
@@ -14,35 +24,151 @@ RIGHTWARDS_ARROW = '\u2192'
 RIGHTWARDS_PAIRED_ARROW = '\u21c9'
 
 
+_ESCAPE_TABLE = {ord('&'): '&amp;', ord('<'): '&lt;', ord('>'): '&gt;'}
+
+_ESCAPE_QUOTE_TABLE = dict(_ESCAPE_TABLE)
+_ESCAPE_QUOTE_TABLE[ord('"')] = '&quot;'
+
+
 def escape_html(s, quote=False):
-    s = s.replace('&', '&amp;')
-    s = s.replace('<', '&lt;')
-    s = s.replace('>', '&gt;')
-    if quote:
-        s = s.replace('"', '&quot;')
+    # most strings have nothing to escape and are returned as they are, which is faster than translating them
+    if '&' in s or '<' in s or '>' in s:
+        return six.text_type(s).translate(_ESCAPE_QUOTE_TABLE if quote else _ESCAPE_TABLE)
+    elif quote and '"' in s:
+        return six.text_type(s).translate(_ESCAPE_QUOTE_TABLE)
     return s
 
 
+# the number of distinct genotypes that a worker of format_many() formats at a time
+_CHUNK_SIZE = 256
+
+# the handlers of each formatter class, resolved to functions of the formatter and the annotation
+_resolved_handlers = {}
+
+# whether each formatter class formats features like Formatter.format_feature does
+_feature_strings = {}
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
 class Formatter(six.with_metaclass(ABCMeta)):
+    """
+    :param cache_size: the number of formatted annotations to keep in a least-recently-used cache, or 0 to disable
+        caching. Annotations are cached by identity, so the cache is most effective when the same annotation objects
+        are formatted repeatedly, e.g. genotypes that share interned annotations. Annotations must not be modified
+        while they are in the cache.
+    """
+    _cache = None
+    _hits = _misses = 0
+
+    annotation_handlers = TypeDispatch({
+        Feature: 'format_feature',
+        Fusion: 'format_fusion',
+        Plasmid: 'format_plasmid',
+        AtLocus: 'format_at_locus',
+        CompositeAnnotation: 'format_composite_annotation',
+    })
+
+    def __init__(self, cache_size=0):
+        self.cache_size = cache_size
+        if cache_size:
+            self._cache = OrderedDict()
+
+    def cache_info(self):
+        """
+        Return the hits, misses, maximum and current size of the annotation cache.
+        """
+        return CacheInfo(self._hits, self._misses, getattr(self, 'cache_size', 0), len(self._cache or ()))
+
+    def cache_clear(self):
+        if self._cache is not None:
+            self._cache.clear()
+        self._hits = self._misses = 0
+
     def format_genotype(self, genotype):
-        return ' '.join(self.format_change(change) for change in genotype.changes())
+        return self.format_changes(genotype.changes())
+
+    def format_changes(self, changes):
+        return ' '.join(self.format_change(change) for change in changes)
+
+    def write_genotype(self, genotype, fp):
+        """
+        Write the formatted genotype to a text stream, one change at a time, without building the full string.
+        Formatters that override ``format_genotype`` or ``format_changes`` write the genotype as a whole.
+        """
+        if _overrides(self, 'format_genotype') or _overrides(self, 'format_changes'):
+            fp.write(self.format_genotype(genotype))
+            return
+        write = fp.write
+        for i, change in enumerate(genotype.changes()):
+            if i:
+                write(' ')
+            write(self.format_change(change))
+
+    def write_many(self, genotypes, fp, separator='\n'):
+        """
+        Write each formatted genotype to a text stream, followed by ``separator``.
+        """
+        write = fp.write
+        for genotype in genotypes:
+            self.write_genotype(genotype, fp)
+            write(separator)
 
     @abstractmethod
     def format_change(self, change):
         pass
 
     def format_annotation(self, annotation):
-        if isinstance(annotation, Feature):
-            return self.format_feature(annotation)
-        elif isinstance(annotation, Fusion):
-            return self.format_fusion(annotation)
-        elif isinstance(annotation, Plasmid):
-            return self.format_plasmid(annotation)
-        elif isinstance(annotation, AtLocus):
-            return self.format_at_locus(annotation)
-        elif isinstance(annotation, CompositeAnnotation):
-            return self.format_composite_annotation(annotation)
-        raise NotImplementedError
+        cache = self._cache
+        if cache is None:
+            return self._format_annotation(annotation)
+
+        key = id(annotation)
+        entry = cache.pop(key, None)
+        if entry is not None:
+            self._hits += 1
+        else:
+            self._misses += 1
+            # keep a reference to the annotation so that its id cannot be reused while it is in the cache
+            entry = annotation, self._format_annotation(annotation)
+            if len(cache) >= self.cache_size:
+                cache.popitem(last=False)
+        cache[key] = entry
+        return entry[1]
+
+    def _format_annotation(self, annotation):
+        try:
+            handler = _resolved_handlers[type(self)][type(annotation)]
+        except KeyError:
+            handler = self._resolve_handler(type(annotation))
+        return handler(self, annotation)
+
+    @classmethod
+    def _resolve_handler(cls, annotation_type):
+        """
+        Look up the handler for ``annotation_type`` as a function of the formatter and the annotation, and cache it.
+        """
+        handler = cls.annotation_handlers.dispatch(annotation_type)
+        if handler is None:
+            raise NotImplementedError
+        if isinstance(handler, six.string_types):
+            handler = six.get_unbound_function(getattr(cls, handler))
+        _resolved_handlers.setdefault(cls, {})[annotation_type] = handler
+        return handler
+
+    @classmethod
+    def register(cls, annotation_type, handler):
+        """
+        Register how this formatter class and its subclasses format annotations of ``annotation_type`` and its
+        subclasses.
+
+        :param handler: the name of a method of the formatter, or a function that is passed the formatter and the
+            annotation and returns the formatted annotation
+        """
+        if 'annotation_handlers' not in cls.__dict__:
+            cls.annotation_handlers = cls.annotation_handlers.copy()
+        cls.annotation_handlers.register(annotation_type, handler)
+        _resolved_handlers.clear()
 
     @staticmethod
     def format_accession(accession):
@@ -55,18 +181,18 @@ class Formatter(six.with_metaclass(ABCMeta)):
         return '({})'.format('; '.join(v for v in variant))
 
     def format_feature(self, feature):
-        s = ''
+        parts = []
         if feature.organism:
-            s += '{}/'.format(feature.organism)
+            parts += (feature.organism, '/')
         if feature.type:
-            s += '{}.'.format(feature.type)
+            parts += (feature.type, '.')
         if feature.name:
-            s += feature.name
+            parts.append(feature.name)
         if feature.accession:
-            s += self.format_accession(feature.accession)
+            parts.append(self.format_accession(feature.accession))
         if feature.variant:
-            s += self.format_variant(feature.variant)
-        return s
+            parts.append(self.format_variant(feature.variant))
+        return ''.join(parts)
 
     def format_fusion(self, fusion):
         return ':'.join(map(self.format_annotation, fusion.annotations))
@@ -86,10 +212,22 @@ class Formatter(six.with_metaclass(ABCMeta)):
 class GnomicFormatter(Formatter):
     format = 'string'
 
+    def format_feature(self, feature):
+        # the string of a feature is its gnomic representation, and is cached on the feature, unless a subclass
+        # formats accessions or variants differently
+        if _string_features(self):
+            return six.text_type(feature)
+        return super(GnomicFormatter, self).format_feature(feature)
+
     def format_change(self, change):
         after = self.format_annotation(change.after) if change.after is not None else None
         before = self.format_annotation(change.before) if change.before is not None else None
+        return self.join_change(change, before, after)
 
+    def join_change(self, change, before, after):
+        """
+        Format a change from its ``before`` and ``after`` annotations, already formatted with this formatter.
+        """
         if change.is_presence():
             return after
         elif after is None:
@@ -108,6 +246,12 @@ class TextFormatter(Formatter):
     def format_change(self, change):
         after = self.format_annotation(change.after) if change.after is not None else None
         before = self.format_annotation(change.before) if change.before is not None else None
+        return self.join_change(change, before, after)
+
+    def join_change(self, change, before, after):
+        """
+        Format a change from its ``before`` and ``after`` annotations, already formatted with this formatter.
+        """
         if after is None:
             return '{}{}'.format(DELTA, before)
         elif before is None:
@@ -121,37 +265,525 @@ class TextFormatter(Formatter):
 class HTMLFormatter(TextFormatter):
     format = 'html'
 
+    # markup fragments, concatenated rather than rendered with str.format
+    FEATURE_START = '<span class="gnomic-feature">'
+    FUSION_START = '<span class="gnomic-fusion">'
+    PLASMID_START = '<span class="gnomic-plasmid">(<span class="gnomic-plasmid-name">'
+    PLASMID_NAME_END = '</span>'
+    PLASMID_END = ')</span>'
+    END = '</span>'
+
     def format_variant(self, variant):
-        return '<sup>{}</sup>'.format('; '.join(escape_html(v) for v in variant))
+        # the separator does not need escaping, so the joined variant is escaped at once
+        return '<sup>' + escape_html('; '.join(variant)) + '</sup>'
 
     def format_feature(self, feature):
-        s = ''
+        s = self.FEATURE_START
         if feature.organism:
-            s += '{}/'.format(escape_html(feature.organism))
+            s += escape_html(feature.organism) + '/'
         if feature.type:
-            s += '{}.'.format(escape_html(feature.type))
+            s += escape_html(feature.type) + '.'
         if feature.name:
             s += escape_html(feature.name)
         if feature.accession:
             s += escape_html(self.format_accession(feature.accession))
         if feature.variant:
             s += self.format_variant(feature.variant)
-        return '<span class="gnomic-feature">{}</span>'.format(s)
+        return s + self.END
 
     def format_fusion(self, fusion):
-        return '<span class="gnomic-fusion">{}</span>'.format(':'.join(map(self.format_annotation, fusion.annotations)))
+        return self.FUSION_START + ':'.join(map(self.format_annotation, fusion.annotations)) + self.END
 
     def format_plasmid(self, plasmid):
+        s = self.PLASMID_START + escape_html(plasmid.name) + self.PLASMID_NAME_END
         if plasmid.annotations:
-            s = '(<span class="gnomic-plasmid-name">{}</span> {})' \
-                .format(escape_html(plasmid.name), ' '.join(map(self.format_annotation, plasmid.annotations)))
-        else:
-            s = '(<span class="gnomic-plasmid-name">{}</span>)'.format(escape_html(plasmid.name))
-        return '<span class="gnomic-plasmid">{}</span>'.format(s)
+            s += ' ' + ' '.join(map(self.format_annotation, plasmid.annotations))
+        return s + self.PLASMID_END
+
 
+INSERTION = 'insertion'
 
-BUILTIN_FORMATTERS = {
-    'gnomic': GnomicFormatter(),
-    'text': TextFormatter(),
-    'html': HTMLFormatter()
-}
+DELETION = 'deletion'
+
+REPLACEMENT = 'replacement'
+
+ChangeGroup = namedtuple('ChangeGroup', ['kind', 'organism', 'count', 'entries'])
+
+_NUMBERED_NAME = re.compile(r'^(.*?)(\d+)$')
+
+
+def _organism(annotation):
+    """
+    Return the organism shared by all features of an annotation, or ``None``.
+    """
+    # the organism of an annotation at a locus is the one of the annotation, not of the locus
+    if isinstance(annotation, AtLocus):
+        annotation = annotation.annotation
+    organisms = set(member.organism for member in walk(annotation) if isinstance(member, Feature))
+    return organisms.pop() if len(organisms) == 1 else None
+
+
+class SummaryFormatter(HTMLFormatter):
+    """
+    Summarizes genotypes with many changes as HTML. Changes are grouped by kind (insertion, deletion or
+    replacement) and organism, and each group is rendered with its count and its changes in an expandable
+    ``<details>`` section. Runs of deleted features that differ only in a trailing number, such as ``-geneA1 -geneA2
+    -geneA3``, are collapsed into one entry.
+
+    :param details: whether to render the changes of each group; without them, only the counts are rendered and the
+        changes of a group can be fetched separately with :meth:`format_details`
+    :param min_run: the smallest number of deletions that are collapsed
+    """
+    format = 'summary'
+
+    def __init__(self, cache_size=0, details=True, min_run=3):
+        super(SummaryFormatter, self).__init__(cache_size)
+        self.details = details
+        self.min_run = min_run
+
+    @staticmethod
+    def change_kind(change):
+        if change.before is None:
+            return INSERTION
+        elif change.after is None:
+            return DELETION
+        return REPLACEMENT
+
+    @staticmethod
+    def _run_key(change):
+        feature = change.before
+        if type(feature) is not Feature or feature.accession or feature.variant or not feature.name:
+            return None
+        match = _NUMBERED_NAME.match(feature.name)
+        if match is None:
+            return None
+        return (match.group(1), feature.type, feature.organism, change.multiple), int(match.group(2))
+
+    def summarize(self, changes, details=True):
+        """
+        Group changes by kind and organism in a single pass.
+
+        :param details: whether to format the changes of each group
+        :return: a list of :class:`ChangeGroup` tuples in order of first appearance, with the formatted changes of
+            each group as ``entries``, or ``None`` if ``details`` is false
+        """
+        groups = OrderedDict()
+        for change in changes:
+            kind = self.change_kind(change)
+            key = kind, _organism(change.before if kind == DELETION else change.after)
+            try:
+                group = groups[key]
+            except KeyError:
+                group = groups[key] = [0, [], {}]
+            group[0] += 1
+            if not details:
+                continue
+
+            count, entries, runs = group
+            run = self._run_key(change) if kind == DELETION else None
+            if run is None:
+                entries.append(self.format_change(change))
+            else:
+                run_key, number = run
+                if run_key not in runs:
+                    runs[run_key] = []
+                    entries.append(runs[run_key])
+                runs[run_key].append((number, change))
+
+        return [ChangeGroup(kind, organism, count, self._entries(entries) if details else None)
+                for (kind, organism), (count, entries, _) in groups.items()]
+
+    def _entries(self, entries):
+        formatted = []
+        for entry in entries:
+            if not isinstance(entry, list):
+                formatted.append(entry)
+                continue
+
+            entry.sort(key=lambda item: item[0])
+            start = 0
+            for end in range(1, len(entry) + 1):
+                if end < len(entry) and entry[end][0] == entry[end - 1][0] + 1:
+                    continue
+                run = [change for _, change in entry[start:end]]
+                if len(run) >= self.min_run:
+                    formatted.append(self.format_run(run))
+                else:
+                    formatted.extend(self.format_change(change) for change in run)
+                start = end
+        return formatted
+
+    def format_run(self, changes):
+        """
+        Format a run of deletions of consecutively numbered features as one entry.
+        """
+        before = '{}\u2026{}'.format(self.format_annotation(changes[0].before),
+                                     self.format_annotation(changes[-1].before))
+        return '<span class="gnomic-run">{} ({})</span>'.format(self.join_change(changes[0], before, None),
+                                                                len(changes))
+
+    def format_group_label(self, group):
+        label = '{} {}{}'.format(group.count, group.kind, 's' if group.count != 1 else '')
+        if group.organism:
+            label += ' in <span class="gnomic-organism">{}</span>'.format(escape_html(group.organism))
+        return label
+
+    def format_changes(self, changes):
+        groups = self.summarize(changes, self.details)
+        parts = ['<div class="gnomic-summary">',
+                 '<span class="gnomic-summary-total">{} changes</span>'.format(sum(group.count for group in groups))]
+        for group in groups:
+            attributes = 'class="gnomic-summary-group" data-kind="{}"'.format(group.kind)
+            if group.organism:
+                attributes += ' data-organism="{}"'.format(escape_html(group.organism, quote=True))
+            if group.entries is None:
+                parts.append('<span {}>{}</span>'.format(attributes, self.format_group_label(group)))
+            else:
+                parts.append('<details {}><summary>{}</summary>{}</details>'.format(
+                    attributes, self.format_group_label(group), ' '.join(group.entries)))
+        parts.append('</div>')
+        return ''.join(parts)
+
+    def write_genotype(self, genotype, fp):
+        fp.write(self.format_genotype(genotype))
+
+    def format_details(self, genotype, kind, organism=None):
+        """
+        Format the changes of one group of a genotype's summary, e.g. when the group is expanded.
+        """
+        changes = (change for change in genotype.changes()
+                   if self.change_kind(change) == kind and
+                   _organism(change.before if kind == DELETION else change.after) == organism)
+        return ' '.join(entry for group in self.summarize(changes) for entry in group.entries)
+
+
+ANNOTATION_METHODS = ('format_annotation', '_format_annotation', 'format_accession', 'format_variant',
+                      'format_feature', 'format_fusion', 'format_plasmid', 'format_at_locus',
+                      'format_composite_annotation')
+
+
+def _annotation_renderer(formatter):
+    """
+    Return a key that is equal for formatters that format every annotation the same way.
+    """
+    if formatter._cache is not None:
+        return id(formatter)
+    methods = [getattr(type(formatter), name, None) for name in ANNOTATION_METHODS]
+    # features formatted as their string are formatted like Formatter.format_feature formats them
+    if six.get_unbound_function(type(formatter).format_feature) is \
+            six.get_unbound_function(GnomicFormatter.format_feature) and _string_features(formatter):
+        methods[ANNOTATION_METHODS.index('format_feature')] = Formatter.format_feature
+    return (type(formatter).annotation_handlers,) + tuple(methods)
+
+
+def _overrides(formatter, name):
+    """
+    Test whether the class of a formatter overrides the :class:`Formatter` method ``name``.
+    """
+    for cls in type(formatter).__mro__:
+        if name in cls.__dict__:
+            return cls is not Formatter
+    return False
+
+
+def _string_features(formatter):
+    """
+    Test whether the string of a feature is formatted the way :meth:`Formatter.format_feature` formats it with the
+    ``format_accession`` and ``format_variant`` methods of a formatter.
+    """
+    cls = type(formatter)
+    try:
+        return _feature_strings[cls]
+    except KeyError:
+        result = _feature_strings[cls] = not (_overrides(formatter, 'format_accession') or
+                                              _overrides(formatter, 'format_variant'))
+        return result
+
+
+def _join_change(formatter):
+    """
+    Return the ``join_change`` method of a formatter if its ``format_change`` is implemented with it.
+    """
+    format_change = six.get_unbound_function(type(formatter).format_change)
+    if format_change in (six.get_unbound_function(GnomicFormatter.format_change),
+                         six.get_unbound_function(TextFormatter.format_change)):
+        return formatter.join_change
+    return None
+
+
+class MultiFormatter(object):
+    """
+    Formats genotypes with several formatters in a single pass over their changes.
+
+    Formatters that format annotations the same way, such as :class:`GnomicFormatter` and :class:`TextFormatter`,
+    share the formatted annotations of each change. Formatters whose ``format_change`` is implemented with
+    ``join_change`` only combine these; other formatters format each change themselves, and formatters that
+    override ``format_genotype`` or ``format_changes``, such as :class:`SummaryFormatter`, format the genotype as a
+    whole.
+
+    :param formatters: a dictionary of formatters
+    """
+
+    def __init__(self, formatters):
+        self.formatters = formatters
+
+        groups = OrderedDict()
+        self._separate = []
+        self._whole = []
+        for key, formatter in formatters.items():
+            join_change = _join_change(formatter)
+            if _overrides(formatter, 'format_genotype') or _overrides(formatter, 'format_changes'):
+                self._whole.append((key, formatter.format_genotype))
+            elif join_change is None:
+                self._separate.append((key, formatter.format_change))
+            else:
+                groups.setdefault(_annotation_renderer(formatter), []).append((key, join_change))
+        self._groups = [(formatters[group[0][0]].format_annotation, group) for group in groups.values()]
+
+    def format_genotype(self, genotype):
+        """
+        :return: a dictionary with the formatted genotype for each key of :attr:`formatters`
+        """
+        parts = {key: [] for key in self.formatters}
+        for change in genotype.changes():
+            for format_annotation, group in self._groups:
+                before = format_annotation(change.before) if change.before is not None else None
+                after = format_annotation(change.after) if change.after is not None else None
+                for key, join_change in group:
+                    parts[key].append(join_change(change, before, after))
+            for key, format_change in self._separate:
+                parts[key].append(format_change(change))
+        formatted = {key: ' '.join(values) for key, values in parts.items()}
+        for key, format_genotype in self._whole:
+            formatted[key] = format_genotype(genotype)
+        return formatted
+
+
+def format_multiple(genotype, formatters):
+    """
+    Format a genotype with several formatters in a single pass over its changes (see :class:`MultiFormatter`).
+
+    :param formatters: a dictionary of formatters
+    :return: a dictionary with the formatted genotype for each key of ``formatters``
+    """
+    return MultiFormatter(formatters).format_genotype(genotype)
+
+
+ENTRY_POINT_GROUP = 'gnomic.formatters'
+
+
+def _entry_points(group):
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # pragma: no cover
+        try:
+            from pkg_resources import iter_entry_points
+        except ImportError:
+            return []
+        return list(iter_entry_points(group))
+
+    entry_points = entry_points()
+    if hasattr(entry_points, 'select'):
+        return list(entry_points.select(group=group))
+    return list(entry_points.get(group, ()))
+
+
+class FormatterRegistry(MutableMapping):
+    """
+    A mapping from output format names to formatter instances, which are created on first use.
+
+    Formatters are registered as a :class:`Formatter` subclass, an instance, or a ``'module:attribute'`` string
+    naming a subclass that is imported when the format is first used. Packages can also provide formatters through
+    entry points in the ``gnomic.formatters`` group, which are only looked up when a format is not registered or the
+    registry is iterated::
+
+        [options.entry_points]
+        gnomic.formatters =
+            sbol = gnomic_sbol:SBOLFormatter
+
+    Formatters registered with :meth:`register`, or by assigning to a name, take precedence over entry points of the
+    same name. :attr:`generation` is incremented whenever a formatter is registered or removed, so that objects
+    derived from the formatters of the registry can tell when they are outdated.
+    """
+
+    def __init__(self, formatters=None, group=ENTRY_POINT_GROUP):
+        self.group = group
+        self.generation = 0
+        self._factories = OrderedDict()
+        self._entry_points = None if group else OrderedDict()
+        self._instances = {}
+        for name, formatter in (formatters or {}).items():
+            self.register(name, formatter)
+
+    def register(self, name, formatter):
+        """
+        Register ``formatter`` for the output format ``name``, replacing any formatter registered before.
+        """
+        self._factories[name] = formatter
+        self._instances.pop(name, None)
+        self.generation += 1
+
+    def __setitem__(self, name, formatter):
+        self.register(name, formatter)
+
+    def __delitem__(self, name):
+        """
+        Remove the formatter registered for ``name``. Formatters provided by entry points cannot be removed.
+        """
+        del self._factories[name]
+        self._instances.pop(name, None)
+        self.generation += 1
+
+    def _load_entry_points(self):
+        if self._entry_points is None:
+            self._entry_points = OrderedDict((entry_point.name, entry_point)
+                                             for entry_point in _entry_points(self.group))
+        return self._entry_points
+
+    def _create(self, name):
+        if name in self._factories:
+            formatter = self._factories[name]
+        else:
+            formatter = self._load_entry_points()[name].load()
+
+        if isinstance(formatter, six.string_types):
+            module, _, attribute = formatter.partition(':')
+            formatter = getattr(import_module(module), attribute)
+        if isinstance(formatter, type):
+            formatter = formatter()
+        return formatter
+
+    def __getitem__(self, name):
+        try:
+            return self._instances[name]
+        except KeyError:
+            formatter = self._instances[name] = self._create(name)
+            return formatter
+
+    def __contains__(self, name):
+        return name in self._factories or name in self._load_entry_points()
+
+    def __iter__(self):
+        names = list(self._factories)
+        return iter(names + [name for name in self._load_entry_points() if name not in self._factories])
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+BUILTIN_FORMATTERS = FormatterRegistry(OrderedDict([
+    ('gnomic', GnomicFormatter),
+    ('text', TextFormatter),
+    ('html', HTMLFormatter),
+    ('summary', SummaryFormatter)
+]))
+
+
+def _get_formatter(output):
+    if isinstance(output, Formatter):
+        return output
+    try:
+        return BUILTIN_FORMATTERS[output]
+    except KeyError:
+        raise ValueError('Unknown output format {!r}; choose one of {}'.format(output, ', '.join(BUILTIN_FORMATTERS)))
+
+
+_worker_formatter = None
+
+
+def _init_worker(formatter):
+    global _worker_formatter
+    _worker_formatter = formatter
+
+
+def _format_chunk(chunk):
+    start, changes = chunk
+    return start, [_worker_formatter.format_changes(c) for c in changes]
+
+
+def _iter_chunks(formatter, genotypes, workers, ordered, chunk_size):
+    """
+    Iterate over ``(start, formatted)`` chunks of ``genotypes``, formatted in worker processes if there is more than
+    one chunk.
+    """
+    if _overrides(formatter, 'format_genotype'):
+        # the formatter needs the genotypes themselves, which are not sent to the workers
+        for start in range(0, len(genotypes), chunk_size):
+            yield start, [formatter.format_genotype(genotype) for genotype in genotypes[start:start + chunk_size]]
+        return
+
+    chunks = [(start, [genotype.changes() for genotype in genotypes[start:start + chunk_size]])
+              for start in range(0, len(genotypes), chunk_size)]
+    if not workers or workers < 2 or len(chunks) < 2:
+        for start, changes in chunks:
+            yield start, [formatter.format_changes(c) for c in changes]
+        return
+
+    # imported here, as multiprocessing adds noticeably to the time it takes to import gnomic
+    from multiprocessing import Pool
+
+    pool = Pool(workers, initializer=_init_worker, initargs=(formatter,))
+    try:
+        for result in (pool.imap if ordered else pool.imap_unordered)(_format_chunk, chunks):
+            yield result
+    finally:
+        pool.terminate()
+
+
+def iter_format_many(genotypes, output='html', workers=None, ordered=True, chunk_size=_CHUNK_SIZE):
+    """
+    Format a collection of genotypes, yielding ``(index, formatted)`` pairs as soon as they are ready.
+
+    Genotypes with the same changes, in the same order, are formatted only once. Large collections are
+    formatted in chunks of ``chunk_size`` distinct genotypes by a pool of ``workers`` processes; the changes of each
+    genotype are sent to the workers, so the formatter must be picklable. Formatters that override
+    ``format_genotype`` are used in this process, and format every genotype, as they may format equal genotypes
+    differently.
+
+    :param output: the name of a format in :data:`BUILTIN_FORMATTERS`, or a :class:`Formatter`
+    :param workers: the number of worker processes; genotypes are formatted in this process if not given
+    :param ordered: whether to yield the genotypes in input order, or in the order their chunks complete
+    """
+    formatter = _get_formatter(output)
+
+    whole = _overrides(formatter, 'format_genotype')
+    distinct, positions, unique = [], [], {}
+    for index, genotype in enumerate(genotypes):
+        # the fingerprint ignores the order of changes, which is part of the formatted genotype; the strings of
+        # annotations are cached, unlike the ones of the changes
+        key = index if whole else tuple((None if change.before is None else six.text_type(change.before),
+                                         None if change.after is None else six.text_type(change.after))
+                                        for change in genotype.changes())
+        if key in unique:
+            position = unique[key]
+        else:
+            position = unique[key] = len(distinct)
+            distinct.append(genotype)
+        positions.append(position)
+
+    if not ordered:
+        indices = [[] for _ in distinct]
+        for index, position in enumerate(positions):
+            indices[position].append(index)
+        for start, formatted in _iter_chunks(formatter, distinct, workers, False, chunk_size):
+            for position, value in enumerate(formatted, start):
+                for index in indices[position]:
+                    yield index, value
+        return
+
+    # chunks complete in order, so every genotype up to the first one whose chunk is still pending is ready
+    results, index = [], 0
+    for _, formatted in _iter_chunks(formatter, distinct, workers, True, chunk_size):
+        results.extend(formatted)
+        while index < len(positions) and positions[index] < len(results):
+            yield index, results[positions[index]]
+            index += 1
+
+
+def format_many(genotypes, output='html', workers=None, chunk_size=_CHUNK_SIZE):
+    """
+    Format a collection of genotypes (see :func:`iter_format_many`).
+
+    :return: a list of the formatted genotypes in input order
+    """
+    return [value for _, value in iter_format_many(genotypes, output, workers, chunk_size=chunk_size)]
@@ -1,17 +1,44 @@
 from abc import abstractmethod, ABCMeta
-from typing import Dict, Tuple
+from typing import (Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, MutableMapping, NamedTuple,
+                    Optional, TextIO, Tuple, Type, Union)
+
+from gnomic.dispatch import TypeDispatch
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
 
 
 class Formatter(metaclass=ABCMeta):
     format: str
+    cache_size: int
+    annotation_handlers: TypeDispatch[Union[str, Callable[['Formatter', Any], str]]]
+
+    def __init__(self, cache_size: int = 0) -> None: ...
+
+    def cache_info(self) -> CacheInfo: ...
+
+    def cache_clear(self) -> None: ...
 
     def format_genotype(self, genotype: 'gnomic.Genotype') -> str: ...
 
+    def format_changes(self, changes: Iterable['gnomic.types.Change']) -> str: ...
+
+    def write_genotype(self, genotype: 'gnomic.Genotype', fp: TextIO) -> None: ...
+
+    def write_many(self, genotypes: Iterable['gnomic.Genotype'], fp: TextIO, separator: str = '\n') -> None: ...
+
     @abstractmethod
     def format_change(self, change: 'gnomic.types.Change') -> str: ...
 
     def format_annotation(self, annotation: 'gnomic.types.Annotation') -> str: ...
 
+    @classmethod
+    def register(cls, annotation_type: type, handler: Union[str, Callable[['Formatter', Any], str]]) -> None: ...
+
     @staticmethod
     def format_accession(accession: 'gnomic.types.Accession') -> str: ...
 
@@ -29,14 +56,27 @@ class Formatter(metaclass=ABCMeta):
 
 
 class GnomicFormatter(Formatter):
+    def format_feature(self, feature: 'gnomic.types.Feature') -> str: ...
+
     def format_change(self, change: 'gnomic.types.Change') -> str: ...
 
+    def join_change(self, change: 'gnomic.types.Change', before: Optional[str], after: Optional[str]) -> str: ...
+
 
 class TextFormatter(Formatter):
     def format_change(self, change: 'gnomic.types.Change') -> str: ...
 
+    def join_change(self, change: 'gnomic.types.Change', before: Optional[str], after: Optional[str]) -> str: ...
+
 
 class HTMLFormatter(TextFormatter):
+    FEATURE_START: str
+    FUSION_START: str
+    PLASMID_START: str
+    PLASMID_NAME_END: str
+    PLASMID_END: str
+    END: str
+
     def format_variant(self, variant: Tuple[str]) -> str: ...
 
     def format_feature(self, feature: 'gnomic.types.Feature') -> str: ...
@@ -46,4 +86,84 @@ class HTMLFormatter(TextFormatter):
     def format_plasmid(self, plasmid: 'gnomic.types.Plasmid') -> str: ...
 
 
-BUILTIN_FORMATTERS: Dict[str, Formatter]
\ No newline at end of file
+INSERTION: str
+DELETION: str
+REPLACEMENT: str
+
+
+class ChangeGroup(NamedTuple):
+    kind: str
+    organism: Optional[str]
+    count: int
+    entries: Optional[List[str]]
+
+
+class SummaryFormatter(HTMLFormatter):
+    details: bool
+    min_run: int
+
+    def __init__(self, cache_size: int = 0, details: bool = True, min_run: int = 3) -> None: ...
+
+    @staticmethod
+    def change_kind(change: 'gnomic.types.Change') -> str: ...
+
+    def summarize(self, changes: Iterable['gnomic.types.Change'], details: bool = True) -> List[ChangeGroup]: ...
+
+    def format_run(self, changes: List['gnomic.types.Change']) -> str: ...
+
+    def format_group_label(self, group: ChangeGroup) -> str: ...
+
+    def format_details(self, genotype: 'gnomic.Genotype', kind: str, organism: Optional[str] = None) -> str: ...
+
+ANNOTATION_METHODS: Tuple[str, ...]
+
+
+class MultiFormatter(object):
+    formatters: Mapping[Hashable, Formatter]
+
+    def __init__(self, formatters: Mapping[Hashable, Formatter]) -> None: ...
+
+    def format_genotype(self, genotype: 'gnomic.Genotype') -> Dict[Hashable, str]: ...
+
+
+def format_multiple(genotype: 'gnomic.Genotype', formatters: Mapping[Hashable, Formatter]) -> Dict[Hashable, str]: ...
+
+
+ENTRY_POINT_GROUP: str
+
+
+class FormatterRegistry(MutableMapping[str, Formatter]):
+    group: Optional[str]
+    generation: int
+
+    def __init__(self,
+                 formatters: Optional[Mapping[str, Union[Formatter, Type[Formatter], str]]] = None,
+                 group: Optional[str] = ENTRY_POINT_GROUP) -> None: ...
+
+    def register(self, name: str, formatter: Union[Formatter, Type[Formatter], str]) -> None: ...
+
+    def __getitem__(self, name: str) -> Formatter: ...
+
+    def __setitem__(self, name: str, formatter: Union[Formatter, Type[Formatter], str]) -> None: ...
+
+    def __delitem__(self, name: str) -> None: ...
+
+    def __iter__(self) -> Iterator[str]: ...
+
+    def __len__(self) -> int: ...
+
+
+BUILTIN_FORMATTERS: FormatterRegistry
+
+
+def iter_format_many(genotypes: Iterable['gnomic.Genotype'],
+                     output: Union[str, Formatter] = 'html',
+                     workers: Optional[int] = None,
+                     ordered: bool = True,
+                     chunk_size: int = ...) -> Iterator[Tuple[int, str]]: ...
+
+
+def format_many(genotypes: Iterable['gnomic.Genotype'],
+                output: Union[str, Formatter] = 'html',
+                workers: Optional[int] = None,
+                chunk_size: int = ...) -> List[str]: ...
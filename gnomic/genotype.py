@@ -1,12 +1,16 @@
+import hashlib
 import itertools
+import weakref
+from collections import OrderedDict, defaultdict, namedtuple
 
 import six
 from grako.exceptions import GrakoException
 
 from gnomic.grammar import GnomicParser
-from gnomic.semantics import DefaultSemantics
+from gnomic.semantics import DefaultSemantics, parse as _parse
 from gnomic.types import Plasmid, Change, Fusion, CompositeAnnotation, AtLocus, Feature, CompositeAnnotationBase
 from gnomic.formatters import BUILTIN_FORMATTERS
+from gnomic.index import FeatureIndex, INSERTED, REMOVED, REPLACED, REPLACEMENT, annotation_keys, lookup_keys
 
 
 def partial_match(search, target):
@@ -79,165 +83,253 @@ def change_annotation(annotation, site=None, replacement=None):
         raise NotImplementedError()
 
 
+def canonicalize(annotation):
+    """
+    Return ``annotation`` with the contents of composite annotations and plasmids sorted, since their order has no
+    meaning. The order of the parts of a fusion is kept.
+    """
+    if isinstance(annotation, AtLocus):
+        return AtLocus(canonicalize(annotation.annotation), canonicalize(annotation.locus))
+    elif isinstance(annotation, Fusion):
+        return Fusion(*(canonicalize(a) for a in annotation.annotations))
+    elif isinstance(annotation, CompositeAnnotation):
+        return CompositeAnnotation(*sorted((canonicalize(a) for a in annotation.annotations), key=six.text_type))
+    elif isinstance(annotation, Plasmid):
+        return Plasmid(annotation.name, sorted((canonicalize(a) for a in annotation.annotations), key=six.text_type))
+    return annotation
+
+
+ADDED = 'added'
+
+MERGED = 'merged'
+
+UNCHANGED = 'unchanged'
+
+ApplyReport = namedtuple('ApplyReport', ['added', 'merged', 'unchanged'])
+
+
 class GenotypeState(object):
+    """
+    The net changes of a genotype.
+
+    Changes are kept in order of application. Each one is also filed under the :func:`gnomic.index.annotation_keys`
+    of its ``before`` and ``after`` annotations so that the changes a new change interacts with are found without
+    scanning the whole state.
+    """
+
     def __init__(self, changes=()):
-        self._changes = [(change.before, change.after) for change in changes]
+        self._changes = OrderedDict()
+        self._by_before = defaultdict(set)
+        self._by_after = defaultdict(set)
+        self._counter = itertools.count()
+        self._index = None
+        self._fingerprint = None
+
+        for change in changes:
+            self._append(change.before, change.after)
+
+    def _append(self, before, after):
+        key = next(self._counter)
+        self._changes[key] = (before, after)
+        if before is not None:
+            for k in annotation_keys(before, nested=True):
+                self._by_before[k].add(key)
+        if after is not None:
+            for k in annotation_keys(after, nested=True):
+                self._by_after[k].add(key)
+
+    def _discard(self, key):
+        before, after = self._changes.pop(key)
+        for annotation, index in ((before, self._by_before), (after, self._by_after)):
+            if annotation is not None:
+                for k in annotation_keys(annotation, nested=True):
+                    keys = index[k]
+                    keys.discard(key)
+                    if not keys:
+                        del index[k]
+
+    def _reset(self):
+        self._index = None
+        self._fingerprint = None
+
+    def _find(self, index, annotation, predicate):
+        keys = set()
+        for k in lookup_keys(annotation):
+            keys.update(index.get(k, ()))
+        return [key for key in sorted(keys) if predicate(*self._changes[key])]
 
     def insert(self, annotation, multiple=False):
+        self._reset()
+
         # skip repeated insertions
         # e.g. +annotation
-        for before, after in self._changes:
-            if before is None and after == annotation:
-                return
+        if self._find(self._by_after, annotation,
+                      lambda before, after: before is None and after == annotation):
+            return UNCHANGED
 
         # e.g. -annotation
-        matches = [(before, after) for before, after in self._changes
-                   if after is None and annotation.match(before)]
+        matches = self._find(self._by_before, annotation,
+                             lambda before, after: after is None and annotation.match(before))
 
         if len(matches) == 1 or len(matches) > 1 and multiple:
             for match in matches:
-                self._changes.remove(match)
-            return
+                self._discard(match)
+            return MERGED
 
         # e.g. +annotation(foo)
-        matches = [(before, after) for before, after in self._changes
-                   if before is None and annotation.match(after, match_variants=False)]
-
-        # if len(matches) == 0:
-        #     matches = [(before, after) for before, after in self._changes
-        #                if before is None and annotation.match(after)]
-        #
-        # else:
-        if len(matches) <= 1 or multiple:
+        matches = self._find(self._by_after, annotation,
+                             lambda before, after: before is None and annotation.match(after, match_variants=False))
+
+        merged = len(matches) <= 1 or multiple
+        if merged:
             for match in matches:
-                self._changes.remove(match)
+                self._discard(match)
 
-        self._changes.append((None, annotation))
+        self._append(None, annotation)
+        return MERGED if merged and matches else ADDED
 
     def remove(self, site, multiple=False):
+        self._reset()
+
         # skip repeated deletions
-        for before, after in self._changes:
-            if before == site and after is None:
-                return  # e.g. -gene.A, -gene.A
+        if self._find(self._by_before, site,
+                      lambda before, after: before == site and after is None):
+            return UNCHANGED  # e.g. -gene.A, -gene.A
 
         if isinstance(site, AtLocus):
             # e.g. gene.A>gene.X -gene.X@gene.A
-            matches = [(before, after) for before, after in self._changes
-                       if before and after
-                       and (isinstance(before, AtLocus) and site.locus == before.locus
-                            or site.locus == before)]
+            matches = self._find(self._by_before, site.locus,
+                                 lambda before, after: before and after and (
+                                     isinstance(before, AtLocus) and site.locus == before.locus
+                                     or site.locus == before))
 
             if len(matches) == 0:
-                self._changes.append((site, None))
+                self._append(site, None)
+                return ADDED
             elif len(matches) == 1:
-                before, after = matches[0]
+                before, after = self._changes[matches[0]]
 
                 after = change_annotation(after, site.annotation, None)
 
-                self._changes.remove(matches[0])
+                self._discard(matches[0])
 
                 if isinstance(before, AtLocus):
                     if before.annotation != after:
-                        self._changes.append((before, after))
+                        self._append(before, after)
                 elif before != after:
-                    self._changes.append((before, after))
+                    self._append(before, after)
+                return MERGED
             else:
                 raise NotImplementedError
         else:
             # e.g. +site, foo>site
-            matches = [(before, after) for before, after in self._changes
-                       if site == after]
+            matches = self._find(self._by_after, site,
+                                 lambda before, after: site == after)
 
             if len(matches) == 1 or len(matches) > 1 and multiple:
-                for (before, after) in matches:
-                    self._changes.remove((before, after))
+                for match in matches:
+                    before, after = self._changes[match]
+                    self._discard(match)
                     # recursive?
                     if before:
-                        self._changes.append((before, None))
-                return
+                        self._append(before, None)
+                return MERGED
 
             # e.g. -site
-            matches = [(before, after) for before, after in self._changes
-                       if after is None and site.match(before, match_variants=False)]
+            matches = self._find(self._by_before, site,
+                                 lambda before, after: after is None and site.match(before, match_variants=False))
 
             if len(matches) == 1 or len(matches) > 1 and multiple:
                 for match in matches:
-                    self._changes.remove(match)
-                return
+                    self._discard(match)
+                return MERGED
 
             # e.g. +site
-            matches = [(before, after) for before, after in self._changes
-                       if before is None and site.match(after)]
+            matches = self._find(self._by_after, site,
+                                 lambda before, after: before is None and site.match(after))
 
             if len(matches) <= 1 or multiple:
                 for match in matches:
-                    self._changes.remove(match)
+                    self._discard(match)
+                if matches:
+                    return MERGED
 
             if len(matches) == 0:
-                self._changes.append((site, None))
+                self._append(site, None)
+                return ADDED
+            return UNCHANGED
 
     def replace(self, site, replacement, multiple=False):
         # e.g. gene.A>gene.B
         assert site and replacement
+        self._reset()
 
         # skip repeated replacements
         # XXX possibility of different behavior with multiple=True
-        for before, after in self._changes:
-            if site == before and replacement == after:
-                return
+        if self._find(self._by_before, site,
+                      lambda before, after: site == before and replacement == after):
+            return UNCHANGED
 
         # skip changes without effect
         # e.g. gene.A>gene.A or gene.A@foo>gene.A
         if site == replacement \
                 or isinstance(site, AtLocus) and site.annotation == replacement:
-            return
+            return UNCHANGED
 
         # e.g. gene.A>gene.X gene.A>gene.Y or
         #      gene.X@gene.A>gene.Y gene.X@gene.A>gene.Y
-        matches = [(before, after) for before, after in self._changes
-                   if before and site == before]
+        matches = self._find(self._by_before, site,
+                             lambda before, after: before and site == before)
 
         if len(matches) == 0:
             if isinstance(site, AtLocus):
                 # e.g. gene.A>gene.X gene.X@gene.A>gene.Y
-                matches = [(before, after) for before, after in self._changes
-                           if before and (isinstance(before, AtLocus) and site.locus == before.locus
-                                          or site.locus == before)]
+                matches = self._find(self._by_before, site.locus,
+                                     lambda before, after: before and (
+                                         isinstance(before, AtLocus) and site.locus == before.locus
+                                         or site.locus == before))
             else:
                 # e.g. gene.A>gene.X gene.X>gene.Y
-                matches = [(before, after) for before, after in self._changes
-                           if after and partial_match(site, after)]
+                matches = self._find(self._by_after, site,
+                                     lambda before, after: after and partial_match(site, after))
 
             if len(matches) == 0:
-                self._changes.append((site, replacement))
+                self._append(site, replacement)
+                return ADDED
             elif len(matches) == 1:
 
-                before, after = matches[0]
+                before, after = self._changes[matches[0]]
 
                 if isinstance(site, AtLocus):
                     after = change_annotation(after, site.annotation, replacement)
                 else:
                     after = change_annotation(after, site, replacement)
 
-                self._changes.remove(matches[0])
+                self._discard(matches[0])
 
                 if isinstance(before, AtLocus):
                     if before.annotation != after:
-                        self._changes.append((before, after))
+                        self._append(before, after)
                 elif before != after:
-                    self._changes.append((before, after))
+                    self._append(before, after)
+                return MERGED
             else:
                 # TODO
                 raise NotImplementedError()
 
         elif len(matches) == 1:
-            self._changes.remove(matches[0])
-            self._changes.append((site, replacement))
+            self._discard(matches[0])
+            self._append(site, replacement)
+            return MERGED
         else:
             # TODO
             raise NotImplementedError()
 
     def change(self, change):
+        """
+        Apply a single change and return whether it was :data:`ADDED`, :data:`MERGED` with existing changes or left
+        the state :data:`UNCHANGED`.
+        """
         # XXX consider not simplifying (foo@foo>... and -foo@foo) if there is a logical use
         # simplify change at locus where annotation and locus are the same (e.g. foo@foo>... or -foo@foo)
         if change.before and isinstance(change.before, AtLocus) and change.before.annotation == change.before.locus:
@@ -245,35 +337,235 @@ class GenotypeState(object):
 
         if change.before is None:
             # e.g. +gene.A
-            self.insert(change.after, multiple=change.multiple)
+            return self.insert(change.after, multiple=change.multiple)
         elif change.after is None:
             # e.g. -gene.A
-            self.remove(change.before, multiple=change.multiple)
+            return self.remove(change.before, multiple=change.multiple)
         else:
             # e.g. gene.A>gene.B
             assert change.before and change.after
-            self.replace(change.before, change.after, multiple=change.multiple)
+            return self.replace(change.before, change.after, multiple=change.multiple)
+
+    def apply(self, changes):
+        """
+        Apply a sequence of changes in order.
+
+        The result is the same as calling :meth:`change` for each change, but each change is only compared against the
+        changes that share a feature, plasmid or locus with it, so that applying a batch scales with its size rather
+        than with the square of the size of the state.
+
+        :param changes: an iterable of :class:`Change` objects
+        :return: an :class:`ApplyReport` with the number of changes that were added, merged with existing changes
+            or had no effect
+        """
+        counts = {ADDED: 0, MERGED: 0, UNCHANGED: 0}
+        for change in changes:
+            counts[self.change(change)] += 1
+        return ApplyReport(counts[ADDED], counts[MERGED], counts[UNCHANGED])
 
     @property
     def changes(self):
-        return tuple(Change(before, after) for before, after in self._changes)
+        return tuple(Change(before, after) for before, after in self._changes.values())
+
+    @property
+    def index(self):
+        """
+        A :class:`gnomic.index.FeatureIndex` of the current changes, built on first access and discarded whenever the
+        state changes.
+        """
+        if self._index is None:
+            self._index = FeatureIndex(self.changes)
+        return self._index
+
+    @property
+    def canonical_changes(self):
+        """
+        The changes in canonical form (see :func:`canonicalize`), sorted by their gnomic representation.
+
+        Two states with the same net changes have the same canonical changes, regardless of the order the changes
+        were applied in.
+        """
+        changes = (Change(canonicalize(before) if before is not None else None,
+                          canonicalize(after) if after is not None else None)
+                   for before, after in self._changes.values())
+        return tuple(sorted(changes, key=six.text_type))
+
+    @property
+    def fingerprint(self):
+        """
+        A hex digest of the canonical changes that is stable across processes and Python versions. It is computed on
+        first access and discarded whenever the state changes.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            for change in self.canonical_changes:
+                digest.update(six.text_type(change).encode('utf-8'))
+                digest.update(b'\n')
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+
+class DiffIndex(object):
+    """
+    The changes of a :class:`GenotypeState` hashed for :meth:`Genotype.diff`.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        # changes are keyed by their canonical string, since equality of some annotations is not structural, e.g.
+        # plasmids compare by name only
+        self.changes = OrderedDict((six.text_type(change), change) for change in state.changes)
+        self.sites = defaultdict(list)
+        for key, change in self.changes.items():
+            if change.before is not None:
+                self.sites[six.text_type(change.before)].append(key)
+
+    def revert(self, change):
+        """
+        Return the changes that undo ``change`` in the indexed state.
+
+        :raises ValueError: if the change cannot be undone using gnomic changes, e.g. a deletion at a locus
+        """
+        before, after = change.before, change.after
+        if before is None:
+            # e.g. +gene.A -> -gene.A
+            return [Change(after, None)]
+        elif isinstance(before, AtLocus):
+            # e.g. gene.A@locus>gene.B -> gene.B>gene.A
+            if isinstance(after, (Feature, Fusion)) and six.text_type(after) not in self.sites:
+                return [Change(after, before.annotation)]
+        elif isinstance(before, (Feature, Fusion, Plasmid, CompositeAnnotationBase)):
+            if after is None:
+                # e.g. -gene.A -> +gene.A
+                return [Change(None, before)]
+            elif isinstance(after, (Feature, Fusion)) and six.text_type(after) not in self.sites:
+                # e.g. gene.A>gene.B -> gene.B>gene.A
+                return [Change(after, before)]
+            else:
+                # e.g. gene.A>(pA) -> -(pA) +gene.A
+                return [Change(after, None), Change(None, before)]
+        raise ValueError('{} cannot be reverted'.format(change))
+
+    def diff(self, other):
+        """
+        Return the changes that turn the state indexed by this object into the state indexed by ``other``.
+
+        :raises ValueError: if the difference cannot be expressed using gnomic changes
+        """
+        removed = [key for key in self.changes if key not in other.changes]
+        added = [key for key in other.changes if key not in self.changes]
+
+        # changes at the same site that can be updated with a single change, e.g. gene.A>gene.B to gene.A>gene.C
+        updates = OrderedDict()
+        for key in added:
+            change = other.changes[key]
+            if change.before is not None:
+                site = six.text_type(change.before)
+                sources = [source for source in self.sites.get(site, ()) if source not in other.changes]
+                targets = [target for target in other.sites[site] if target not in self.changes]
+                if len(sources) == 1 and len(targets) == 1:
+                    updates[sources[0]] = key
+
+        changes = []
+        for key in removed:
+            if key not in updates:
+                changes.extend(self.revert(self.changes[key]))
+
+        for source, target in updates.items():
+            if other.changes[target].after is None:
+                # e.g. gene.A>gene.B to -gene.A
+                changes.append(Change(self.changes[source].after, None))
+            else:
+                changes.append(other.changes[target])
+
+        updated = set(updates.values())
+        changes.extend(other.changes[key] for key in added if key not in updated)
+
+        # changes that interact with more than one site of the state are not always reversible, so check the result
+        state = GenotypeState(self.state.changes)
+        try:
+            state.apply(changes)
+        except NotImplementedError:
+            raise ValueError('The difference between the genotypes cannot be expressed using gnomic changes')
+        if set(six.text_type(change) for change in state.changes) != set(other.changes):
+            raise ValueError('The difference between the genotypes cannot be expressed using gnomic changes')
+        return changes
 
 
 class Genotype(object):
-    def __init__(self, changes, parent=None):
+    def __init__(self, changes, parent=None, detach=False):
         if parent:
             state = GenotypeState(parent.state.changes)
         else:
             state = GenotypeState()
 
-        for change in changes:
-            state.change(change)
+        state.apply(changes)
 
         self.parent = parent
         self.state = state
 
+        if detach:
+            self.detach()
+
+    @property
+    def parent(self):
+        """
+        The parent genotype. Once the genotype has been detached from its parent (see :meth:`detach`), this is the
+        parent if it is still alive elsewhere or can be reloaded, and ``None`` otherwise.
+        """
+        if self._parent is not None:
+            return self._parent
+        if self._parent_ref is not None:
+            parent = self._parent_ref()
+            if parent is not None:
+                return parent
+        if self._loader is not None and self._parent_fingerprint is not None:
+            return self._loader(self._parent_fingerprint)
+        return None
+
+    @parent.setter
+    def parent(self, parent):
+        self._parent = parent
+        self._parent_ref = None
+        self._parent_fingerprint = None
+        self._loader = None
+
+    @property
+    def parent_fingerprint(self):
+        """
+        The fingerprint of the parent genotype, also available after the genotype has been detached.
+        """
+        if self._parent is not None:
+            return self._parent.fingerprint()
+        return self._parent_fingerprint
+
+    def detach(self, loader=None):
+        """
+        Release the reference to the parent genotype so that holding on to this genotype no longer keeps its
+        ancestors and their states alive. The changes of the genotype are unaffected, as the state of a genotype
+        already includes the changes of its ancestors.
+
+        The fingerprint of the parent is kept as :attr:`parent_fingerprint`, and :attr:`parent` remains available
+        for as long as the parent is referenced elsewhere.
+
+        :param loader: an optional callable that is passed the fingerprint of the parent and returns the parent
+            genotype, used by :attr:`parent` once the parent is no longer alive
+        :return: this genotype
+        """
+        parent = self._parent
+        if parent is not None:
+            self._parent_fingerprint = parent.fingerprint()
+            self._parent_ref = weakref.ref(parent)
+            self._parent = None
+        if loader is not None:
+            self._loader = loader
+        return self
+
     @classmethod
     def _parse_gnomic_string(cls, gnomic_string, *args, **kwargs):
+        if not args and not kwargs:
+            return _parse(gnomic_string)
+
         parser = GnomicParser()
         semantics = DefaultSemantics(*args, **kwargs)
         return parser.parse(gnomic_string,
@@ -282,12 +574,23 @@ class Genotype(object):
                             rule_name='start')
 
     @classmethod
-    def parse(cls, gnomic_string, parent=None, **kwargs):
+    def parse(cls, gnomic_string, parent=None, detach=False, **kwargs):
         if not isinstance(gnomic_string, six.string_types):
             raise ValueError('"gnomic_string" must a string, got {}'.format(repr(gnomic_string)))
 
         changes = Genotype._parse_gnomic_string(gnomic_string, **kwargs)
-        return Genotype(changes, parent=parent, **kwargs)
+        return Genotype(changes, parent=parent, detach=detach, **kwargs)
+
+    @classmethod
+    def from_changes(cls, changes, parent=None):
+        """
+        Create a genotype from its net changes, as returned by :meth:`changes`, without applying them again. Use this
+        to restore a genotype that has been stored; the changes of ``parent`` are not applied either.
+        """
+        genotype = cls.__new__(cls)
+        genotype.parent = parent
+        genotype.state = GenotypeState(changes)
+        return genotype
 
     @classmethod
     def is_valid(cls, gnomic_string, **kwargs):
@@ -348,8 +651,103 @@ class Genotype(object):
                 for change in self.state.changes
                 if change.after is None and isinstance(change.before, (Feature, Fusion, CompositeAnnotation))}
 
+    def is_inserted(self, annotation, match_variants=True):
+        """
+        Tests whether ``annotation`` matches an inserted annotation, including features nested inside inserted
+        fusions and plasmids.
+
+        Matching follows :meth:`Feature.match`, e.g. ``geneA`` matches an inserted ``geneA(x)`` but ``geneA(x)`` does
+        not match an inserted ``geneA(y)`` unless ``match_variants`` is ``False``.
+        """
+        return self.state.index.contains(INSERTED, annotation, match_variants)
+
+    def is_deleted(self, annotation, match_variants=True):
+        """
+        Tests whether ``annotation`` matches a deleted annotation, e.g. ``-geneA`` or ``-geneA@locus``.
+        """
+        return self.state.index.contains(REMOVED, annotation, match_variants)
+
+    def is_replaced(self, annotation, match_variants=True):
+        """
+        Tests whether ``annotation`` matches the site of a replacement, e.g. ``geneA>geneB``.
+        """
+        return self.state.index.contains(REPLACED, annotation, match_variants)
+
+    def is_present(self, annotation, match_variants=True):
+        """
+        Tests whether ``annotation`` matches an annotation that has been inserted or is part of a replacement.
+        """
+        index = self.state.index
+        return index.contains(INSERTED, annotation, match_variants) or \
+            index.contains(REPLACEMENT, annotation, match_variants)
+
+    def variant_of(self, feature):
+        """
+        Returns the set of present features that match ``feature`` regardless of variant, e.g. ``{geneA(x)}`` for
+        ``geneA`` if ``+geneA(x)`` is part of the genotype.
+        """
+        index = self.state.index
+        return set(index.find(INSERTED, feature, match_variants=False)) | \
+            set(index.find(REPLACEMENT, feature, match_variants=False))
+
     def changes(self):
         return self.state.changes
 
+    def extend(self, changes):
+        """
+        Apply further changes to this genotype in place.
+
+        :param changes: an iterable of :class:`Change` objects
+        :return: an :class:`ApplyReport` with the number of changes that were added, merged or had no effect
+        """
+        return self.state.apply(changes)
+
+    def canonical_changes(self):
+        return self.state.canonical_changes
+
+    def fingerprint(self):
+        """
+        Return a digest of the net changes of this genotype, independent of the order they were made in and of the
+        lineage of the genotype. Genotypes with the same fingerprint are equal.
+
+        Genotypes hash by their fingerprint, so equal genotypes can be used interchangeably in sets and as dictionary
+        keys. The fingerprint changes when a genotype is extended with :meth:`extend`, so a genotype should not be
+        extended while it is held in a set or dictionary.
+        """
+        return self.state.fingerprint
+
+    def __eq__(self, other):
+        return isinstance(other, Genotype) and self.fingerprint() == other.fingerprint()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.fingerprint())
+
+    def diff(self, other):
+        """
+        Return the changes that turn this genotype into ``other``, so that ``Genotype(self.diff(other), parent=self)``
+        has the same changes as ``other``.
+
+        Both states are hashed, so the diff is computed in time linear in the number of changes.
+
+        :raises ValueError: if a change of this genotype cannot be undone using gnomic changes
+        """
+        return DiffIndex(self.state).diff(DiffIndex(other.state))
+
+    def diff_many(self, others):
+        """
+        Diff this genotype against each of ``others``, hashing this genotype only once.
+
+        :return: a list with the result of :meth:`diff` for each genotype in ``others``
+        """
+        index = DiffIndex(self.state)
+        return [index.diff(DiffIndex(other.state)) for other in others]
+
     def format(self, output='text'):
+        """
+        :param output: the name of an output format in :data:`gnomic.formatters.BUILTIN_FORMATTERS`, which includes
+            formatters provided by other packages through entry points
+        """
         return BUILTIN_FORMATTERS[output].format_genotype(self)
@@ -1,5 +1,6 @@
-from typing import Iterable, Tuple, Optional, Sequence, List, Union, Set
+from typing import Callable, Dict, Hashable, Iterable, NamedTuple, Tuple, Optional, Sequence, List, Union, Set
 
+from gnomic.index import FeatureIndex
 from gnomic.types import Change, Annotation, AtLocus, Plasmid, Feature, CompositeAnnotation, Fusion
 
 
@@ -12,45 +13,115 @@ def change_annotation(annotation: Annotation,
     ...
 
 
+def canonicalize(annotation: Union[Annotation, AtLocus]) -> Union[Annotation, AtLocus]: ...
+
+
+ADDED: str
+MERGED: str
+UNCHANGED: str
+
+
+class ApplyReport(NamedTuple):
+    added: int
+    merged: int
+    unchanged: int
+
+
 class GenotypeState(object):
-    _changes: List[Tuple[Union[Annotation, AtLocus, None], Union[Annotation, None]]]
+    _changes: Dict[int, Tuple[Union[Annotation, AtLocus, None], Union[Annotation, None]]]
+    _by_before: Dict[Hashable, Set[int]]
+    _by_after: Dict[Hashable, Set[int]]
+    _index: Optional[FeatureIndex]
+    _fingerprint: Optional[str]
 
     def __init__(self, changes: Sequence[Change] = ()) -> None:
         ...
 
-    def insert(self, annotation: Annotation, multiple: bool = False) -> None:
+    def insert(self, annotation: Annotation, multiple: bool = False) -> str:
+        ...
+
+    def remove(self, site: Union[Annotation, AtLocus], multiple: bool = False) -> str:
         ...
 
-    def remove(self, site: Union[Annotation, AtLocus], multiple: bool = False) -> None:
+    def replace(self, site: Union[Annotation, AtLocus], replacement: Annotation, multiple: bool = False) -> str:
         ...
 
-    def replace(self, site: Union[Annotation, AtLocus], replacement: Annotation, multiple: bool = False) -> None:
+    def change(self, change: Change) -> str:
         ...
 
-    def change(self, change: Change) -> None:
+    def apply(self, changes: Iterable[Change]) -> ApplyReport:
         ...
 
     @property
     def changes(self) -> Tuple[Change]: ...
 
+    @property
+    def index(self) -> FeatureIndex: ...
+
+    @property
+    def canonical_changes(self) -> Tuple[Change]: ...
+
+    @property
+    def fingerprint(self) -> str: ...
+
+
+class DiffIndex(object):
+    state: GenotypeState
+    changes: Dict[str, Change]
+    sites: Dict[str, List[str]]
+
+    def __init__(self, state: GenotypeState) -> None: ...
+
+    def revert(self, change: Change) -> List[Change]: ...
+
+    def diff(self, other: 'DiffIndex') -> List[Change]: ...
+
 
 class Genotype(object):
     parent: Optional['Genotype']
     state: GenotypeState
 
-    def __init__(self, changes: Iterable[Change], parent: 'Genotype' = None) -> None: ...
+    def __init__(self, changes: Iterable[Change], parent: 'Genotype' = None, detach: bool = False) -> None: ...
+
+    @property
+    def parent_fingerprint(self) -> Optional[str]: ...
+
+    def detach(self, loader: Callable[[str], Optional['Genotype']] = None) -> 'Genotype': ...
 
     @classmethod
     def _parse_gnomic_string(cls, gnomic_string: str, *args, **kwargs) -> List[Change]: ...
 
     @classmethod
-    def parse(cls, gnomic_string: str, parent: 'Genotype' = None) -> 'Genotype': ...
+    def parse(cls, gnomic_string: str, parent: 'Genotype' = None, detach: bool = False) -> 'Genotype': ...
+
+    @classmethod
+    def from_changes(cls, changes: Iterable[Change], parent: 'Genotype' = None) -> 'Genotype': ...
 
     @classmethod
     def is_valid(cls, gnomic_string: str) -> bool: ...
 
     def changes(self) -> Tuple[Change]: ...
 
+    def extend(self, changes: Iterable[Change]) -> ApplyReport: ...
+
+    def canonical_changes(self) -> Tuple[Change]: ...
+
+    def fingerprint(self) -> str: ...
+
+    def diff(self, other: 'Genotype') -> List[Change]: ...
+
+    def diff_many(self, others: Iterable['Genotype']) -> List[List[Change]]: ...
+
+    def is_inserted(self, annotation: Annotation, match_variants: bool = True) -> bool: ...
+
+    def is_deleted(self, annotation: Annotation, match_variants: bool = True) -> bool: ...
+
+    def is_replaced(self, annotation: Annotation, match_variants: bool = True) -> bool: ...
+
+    def is_present(self, annotation: Annotation, match_variants: bool = True) -> bool: ...
+
+    def variant_of(self, feature: Feature) -> Set[Feature]: ...
+
     @property
     def added_features(self) -> Set[Feature]: ...
 
@@ -0,0 +1,315 @@
+from collections import defaultdict
+
+import six
+
+from gnomic.dispatch import TypeDispatch
+from gnomic.types import Feature, Plasmid, AtLocus, CompositeAnnotationBase
+
+INSERTED = 'inserted'
+
+REMOVED = 'removed'
+
+REPLACED = 'replaced'
+
+REPLACEMENT = 'replacement'
+
+LOCUS = 'locus'
+
+ROLES = (INSERTED, REMOVED, REPLACED, REPLACEMENT, LOCUS)
+
+
+def annotation_keys(annotation, nested=False):
+    """
+    Return the hashable keys an annotation is indexed under.
+
+    Any annotation that is equal to or matches ``annotation`` has at least one of its :func:`lookup_keys` in this set.
+
+    :param annotation:
+    :param nested: also include the keys of every annotation contained in ``annotation``, so that it can be found
+        through any of its parts.
+    :return:
+    """
+    keys = set()
+    if isinstance(annotation, Feature):
+        if annotation.accession:
+            keys.add(('accession', annotation.accession))
+        if annotation.name:
+            keys.add(('name', annotation.name))
+            if annotation.organism:
+                keys.add(('organism', annotation.organism, annotation.name))
+    elif isinstance(annotation, AtLocus):
+        keys |= annotation_keys(annotation.annotation, nested)
+        if nested:
+            keys |= annotation_keys(annotation.locus, nested)
+    elif isinstance(annotation, CompositeAnnotationBase):
+        if isinstance(annotation, Plasmid):
+            keys.add(('plasmid', annotation.name))
+            members = annotation.annotations if nested else ()
+        else:
+            members = annotation.annotations if nested else annotation.annotations[:1]
+
+        for member in members:
+            keys |= annotation_keys(member, nested)
+
+        if not annotation.annotations:
+            keys.add(('empty', type(annotation)))
+    return keys
+
+
+def lookup_keys(annotation):
+    """
+    Return the keys to look up in order to find every indexed annotation equal to or matched by ``annotation``.
+    """
+    if isinstance(annotation, Feature):
+        keys = set()
+        if annotation.accession:
+            keys.add(('accession', annotation.accession))
+        if annotation.name:
+            if annotation.organism:
+                keys.add(('organism', annotation.organism, annotation.name))
+            else:
+                keys.add(('name', annotation.name))
+        return keys
+    elif isinstance(annotation, AtLocus):
+        return lookup_keys(annotation.annotation)
+    elif isinstance(annotation, Plasmid):
+        return {('plasmid', annotation.name)}
+    elif isinstance(annotation, CompositeAnnotationBase):
+        if annotation.annotations:
+            return lookup_keys(annotation.annotations[0])
+        return {('empty', type(annotation))}
+    return set()
+
+
+# functions that return the members of an annotation, by annotation type; register a function for custom annotation
+# types that contain other annotations so that they are walked and indexed
+annotation_members = TypeDispatch({CompositeAnnotationBase: lambda annotation: annotation.annotations})
+
+
+def walk(annotation):
+    """
+    Iterate over ``annotation`` and every annotation nested inside it (see :data:`annotation_members`).
+    """
+    yield annotation
+    members = annotation_members.dispatch(type(annotation))
+    if members is not None:
+        for member in members(annotation):
+            for nested in walk(member):
+                yield nested
+
+
+def change_entries(before, after):
+    """
+    Iterate over the ``(role, annotation)`` pairs a change from ``before`` to ``after`` is indexed with.
+
+    - ``+a`` indexes ``a`` and its parts as :data:`INSERTED`.
+    - ``-a`` indexes ``a`` and its parts as :data:`REMOVED`.
+    - ``a>b`` indexes ``a`` and its parts as :data:`REPLACED` and ``b`` and its parts as :data:`REPLACEMENT`.
+    - In ``a@locus``, ``locus`` is indexed as :data:`LOCUS`.
+    """
+    if before is not None:
+        role = REMOVED if after is None else REPLACED
+        if isinstance(before, AtLocus):
+            yield role, before
+            yield LOCUS, before.locus
+            before = before.annotation
+
+        for annotation in walk(before):
+            yield role, annotation
+
+    if after is not None:
+        role = INSERTED if before is None else REPLACEMENT
+        for annotation in walk(after):
+            yield role, annotation
+
+
+def matches(search, target, match_variants=True):
+    """
+    Test ``search`` against ``target`` with :meth:`Annotation.match` semantics, falling back to equality for
+    annotations that do not implement matching.
+    """
+    return search.match(target, match_variants=match_variants) or search == target
+
+
+class FeatureIndex(object):
+    """
+    Hash index over the changes of a genotype state, keyed by feature name, organism, accession, plasmid name and
+    locus, and separated by the role an annotation plays in a change.
+    """
+
+    def __init__(self, changes=()):
+        self._entries = {role: defaultdict(list) for role in ROLES}
+
+        for change in changes:
+            self.add(change.before, change.after)
+
+    def add(self, before, after):
+        for role, annotation in change_entries(before, after):
+            entries = self._entries[role]
+            for key in annotation_keys(annotation):
+                entries[key].append(annotation)
+
+    def find(self, role, annotation, match_variants=True):
+        """
+        Return the annotations indexed with ``role`` that ``annotation`` matches.
+
+        :param role: one of :data:`INSERTED`, :data:`REMOVED`, :data:`REPLACED`, :data:`REPLACEMENT` or :data:`LOCUS`
+        :param annotation:
+        :param match_variants: passed on to :meth:`Annotation.match`
+        :return:
+        """
+        entries = self._entries[role]
+        found = []
+        for key in lookup_keys(annotation):
+            for candidate in entries.get(key, ()):
+                if not any(candidate is f for f in found) and matches(annotation, candidate, match_variants):
+                    found.append(candidate)
+        return found
+
+    def contains(self, role, annotation, match_variants=True):
+        entries = self._entries[role]
+        return any(matches(annotation, candidate, match_variants)
+                   for key in lookup_keys(annotation)
+                   for candidate in entries.get(key, ()))
+
+
+def intern_key(annotation):
+    """
+    Return a hashable key that identifies ``annotation`` by its type and full contents.
+    """
+    return type(annotation), six.text_type(annotation)
+
+
+class GenotypeIndex(object):
+    """
+    Inverted index over a collection of genotypes.
+
+    Each annotation of a genotype's changes, including the features nested inside fusions and plasmids, is interned
+    and mapped to a posting set with the ids of the genotypes it occurs in, separately for each role the annotation
+    plays in a change (see :func:`change_entries`).
+
+    Example::
+
+        index = GenotypeIndex({'strain-1': Genotype.parse('-geneA (pX)'), 'strain-2': Genotype.parse('-geneA')})
+        index.search(all_of=[(REMOVED, Feature('geneA')), (INSERTED, Plasmid('pX'))])  # {'strain-1'}
+    """
+
+    def __init__(self, genotypes=None):
+        self._postings = {role: {} for role in ROLES}
+        self._annotations = {role: defaultdict(set) for role in ROLES}
+        self._interned = {}
+        self._entries = {}
+
+        if genotypes is not None:
+            for genotype_id, genotype in (genotypes.items() if hasattr(genotypes, 'items') else genotypes):
+                self.add(genotype_id, genotype)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, genotype_id):
+        return genotype_id in self._entries
+
+    @property
+    def ids(self):
+        return set(self._entries)
+
+    def add(self, genotype_id, genotype):
+        """
+        Add a genotype to the index, replacing any genotype previously added with the same id.
+        """
+        if genotype_id in self._entries:
+            self.remove(genotype_id)
+
+        entries = set()
+        for change in genotype.changes():
+            for role, annotation in change_entries(change.before, change.after):
+                key = intern_key(annotation)
+                if key not in self._interned:
+                    self._interned[key] = annotation
+                entries.add((role, key))
+
+        for role, key in entries:
+            postings = self._postings[role]
+            if key not in postings:
+                postings[key] = set()
+                for k in annotation_keys(self._interned[key]):
+                    self._annotations[role][k].add(key)
+            postings[key].add(genotype_id)
+
+        self._entries[genotype_id] = entries
+
+    def remove(self, genotype_id):
+        """
+        Remove a genotype from the index.
+
+        :raises KeyError: if no genotype with this id has been added
+        """
+        for role, key in self._entries.pop(genotype_id):
+            postings = self._postings[role]
+            postings[key].discard(genotype_id)
+            if postings[key]:
+                continue
+
+            del postings[key]
+            annotation = self._interned[key]
+            for k in annotation_keys(annotation):
+                keys = self._annotations[role][k]
+                keys.discard(key)
+                if not keys:
+                    del self._annotations[role][k]
+
+            if not any(key in self._postings[r] for r in ROLES):
+                del self._interned[key]
+
+    def find(self, role, annotation, match_variants=True):
+        """
+        Return the ids of the genotypes with an annotation in ``role`` that ``annotation`` matches.
+
+        :param role: one of :data:`INSERTED`, :data:`REMOVED`, :data:`REPLACED`, :data:`REPLACEMENT` or :data:`LOCUS`
+        :param annotation:
+        :param match_variants: passed on to :meth:`Annotation.match`
+        :return: a set of genotype ids
+        """
+        postings = self._postings[role]
+        candidates = set()
+        for k in lookup_keys(annotation):
+            candidates.update(self._annotations[role].get(k, ()))
+
+        ids = set()
+        for key in candidates:
+            if matches(annotation, self._interned[key], match_variants):
+                ids |= postings[key]
+        return ids
+
+    def search(self, all_of=(), any_of=(), none_of=(), match_variants=True):
+        """
+        Evaluate a boolean query over the index.
+
+        Each term is a ``(role, annotation)`` pair evaluated with :meth:`find`.
+
+        :param all_of: terms that must all match
+        :param any_of: terms of which at least one must match, if any are given
+        :param none_of: terms that must not match
+        :param match_variants: passed on to :meth:`Annotation.match`
+        :return: a set of genotype ids
+        """
+        if all_of:
+            # intersect the smallest posting sets first
+            results = sorted((self.find(role, annotation, match_variants) for role, annotation in all_of), key=len)
+            ids = results[0]
+            for result in results[1:]:
+                if not ids:
+                    break
+                ids = ids & result
+        else:
+            ids = self.ids
+
+        if any_of and ids:
+            ids = ids & set().union(*(self.find(role, annotation, match_variants) for role, annotation in any_of))
+
+        for role, annotation in none_of:
+            if not ids:
+                break
+            ids = ids - self.find(role, annotation, match_variants)
+        return ids
@@ -0,0 +1,75 @@
+from typing import Any, Callable, Dict, Iterable, Mapping, Hashable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from gnomic.dispatch import TypeDispatch
+from gnomic.types import Annotation, AtLocus, Change
+
+INSERTED: str
+REMOVED: str
+REPLACED: str
+REPLACEMENT: str
+LOCUS: str
+ROLES: Tuple[str, ...]
+
+
+def annotation_keys(annotation: Annotation, nested: bool = False) -> Set[Hashable]: ...
+
+
+def lookup_keys(annotation: Annotation) -> Set[Hashable]: ...
+
+
+annotation_members: TypeDispatch[Callable[[Annotation], Sequence[Annotation]]]
+
+
+def walk(annotation: Annotation) -> Iterator[Annotation]: ...
+
+
+def change_entries(before: Optional[Union[Annotation, AtLocus]],
+                   after: Optional[Annotation]) -> Iterator[Tuple[str, Annotation]]: ...
+
+
+def matches(search: Annotation, target: Annotation, match_variants: bool = True) -> bool: ...
+
+
+class FeatureIndex(object):
+    _entries: Dict[str, Dict[Hashable, List[Annotation]]]
+
+    def __init__(self, changes: Iterator[Change] = ()) -> None: ...
+
+    def add(self, before: Optional[Union[Annotation, AtLocus]], after: Optional[Annotation]) -> None: ...
+
+    def find(self, role: str, annotation: Annotation, match_variants: bool = True) -> List[Annotation]: ...
+
+    def contains(self, role: str, annotation: Annotation, match_variants: bool = True) -> bool: ...
+
+
+def intern_key(annotation: Annotation) -> Tuple[type, str]: ...
+
+
+class GenotypeIndex(object):
+    _postings: Dict[str, Dict[Tuple[type, str], Set[Hashable]]]
+    _annotations: Dict[str, Dict[Hashable, Set[Tuple[type, str]]]]
+    _interned: Dict[Tuple[type, str], Annotation]
+    _entries: Dict[Hashable, Set[Tuple[str, Tuple[type, str]]]]
+
+    def __init__(self,
+                 genotypes: Union[Mapping[Hashable, 'gnomic.Genotype'],
+                                  Iterable[Tuple[Hashable, 'gnomic.Genotype']]] = None) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, genotype_id: Any) -> bool: ...
+
+    @property
+    def ids(self) -> Set[Hashable]: ...
+
+    def add(self, genotype_id: Hashable, genotype: 'gnomic.Genotype') -> None: ...
+
+    def remove(self, genotype_id: Hashable) -> None: ...
+
+    def find(self, role: str, annotation: Annotation, match_variants: bool = True) -> Set[Hashable]: ...
+
+    def search(self,
+               all_of: Iterable[Tuple[str, Annotation]] = (),
+               any_of: Iterable[Tuple[str, Annotation]] = (),
+               none_of: Iterable[Tuple[str, Annotation]] = (),
+               match_variants: bool = True) -> Set[Hashable]: ...
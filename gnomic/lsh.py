@@ -0,0 +1,251 @@
+"""
+Near-duplicate detection for large collections of genotypes, using MinHash signatures and locality-sensitive
+hashing. Requires NumPy (``pip install gnomic[numpy]``).
+
+Each genotype is reduced to a set of shingles, the canonical changes of its state (see
+:meth:`gnomic.Genotype.canonical_changes`) and optionally the keys of the features in each role (see
+:func:`gnomic.index.change_entries`). The fraction of equal values in the MinHash signatures of two genotypes
+estimates the Jaccard similarity of their shingles.
+"""
+import hashlib
+
+import six
+
+from gnomic.index import annotation_keys, change_entries
+from gnomic.matrix import _require_numpy, np
+
+# Mersenne prime 2 ** 61 - 1 used for the universal hash family
+_PRIME = (1 << 61) - 1
+
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(genotype, features=False):
+    """
+    Return the set of strings that represent ``genotype`` for MinHash.
+
+    :param genotype: a :class:`gnomic.Genotype`
+    :param features: also include the role and key of every annotation involved in a change, so that genotypes that
+        change the same features in different ways are considered similar too
+    """
+    changes = genotype.canonical_changes()
+    result = {six.text_type(change) for change in changes}
+    if features:
+        for change in changes:
+            for role, annotation in change_entries(change.before, change.after):
+                for key in annotation_keys(annotation):
+                    result.add(u'{}:{}'.format(role, u':'.join(map(six.text_type, key))))
+    return result
+
+
+def _hash(shingle):
+    return int(hashlib.sha1(shingle.encode('utf-8')).hexdigest()[:8], 16)
+
+
+class MinHash(object):
+    """
+    Computes MinHash signatures with ``num_perm`` hash functions. Signatures are only comparable if they were
+    computed with the same ``num_perm`` and ``seed``.
+    """
+
+    def __init__(self, num_perm=128, seed=1):
+        _require_numpy()
+        self.num_perm = num_perm
+        self.seed = seed
+
+        random = np.random.RandomState(seed)
+        self._a = random.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = random.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles):
+        """
+        Return the ``uint32`` signature of a set of shingles. The signature of an empty set has the maximum value
+        in every position.
+        """
+        hashes = np.fromiter((_hash(shingle) for shingle in shingles), dtype=np.uint64)
+        if not len(hashes):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+
+        # products wrap around at 2 ** 64, which is fine for the purpose of hashing
+        with np.errstate(over='ignore'):
+            values = (np.outer(hashes, self._a) + self._b) % np.uint64(_PRIME)
+        return (values & np.uint64(_MAX_HASH)).min(axis=0).astype(np.uint32)
+
+
+def similarity(a, b):
+    """
+    Estimate the Jaccard similarity of two sets from their MinHash signatures.
+    """
+    return float(np.mean(np.asarray(a) == np.asarray(b)))
+
+
+class LSHIndex(object):
+    """
+    Locality-sensitive hashing index over the MinHash signatures of genotypes.
+
+    Signatures are split into ``bands`` bands of ``num_perm // bands`` rows. Two genotypes become candidates for each
+    other when all rows of at least one band are equal, which happens with probability ``1 - (1 - s ** rows) **
+    bands`` for genotypes with a Jaccard similarity of ``s``. More bands find less similar genotypes at the cost of
+    more false positives.
+
+    Example::
+
+        index = LSHIndex()
+        index.add('strain-1', Genotype.parse('-geneA +geneB'))
+        index.query(Genotype.parse('-geneA +geneB +geneC'), threshold=0.5)  # [('strain-1', 0.67...)]
+
+    :param num_perm: the number of hash functions of the signatures
+    :param bands: the number of bands; must divide ``num_perm``
+    :param seed: the seed of the hash functions
+    :param features: passed on to :func:`shingles`
+    """
+
+    def __init__(self, num_perm=128, bands=32, seed=1, features=False):
+        if num_perm % bands:
+            raise ValueError('"bands" must divide "num_perm", got {} and {}'.format(bands, num_perm))
+
+        self.minhash = MinHash(num_perm, seed)
+        self.bands = bands
+        self.features = features
+        self._rows = {}
+        self._ids = []
+        self._free = []  # rows of removed genotypes, reused by add()
+        self._signatures = np.zeros((16, num_perm), dtype=np.uint32)
+        self._buckets = [{} for _ in range(bands)]
+
+    @property
+    def num_perm(self):
+        return self.minhash.num_perm
+
+    @property
+    def seed(self):
+        return self.minhash.seed
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, genotype_id):
+        return genotype_id in self._rows
+
+    @property
+    def ids(self):
+        return set(self._rows)
+
+    def signature(self, genotype):
+        """
+        Return the MinHash signature of a genotype.
+        """
+        return self.minhash.signature(shingles(genotype, self.features))
+
+    def _band_keys(self, signature):
+        return [band.tobytes() for band in np.asarray(signature, dtype=np.uint32).reshape(self.bands, -1)]
+
+    def add(self, genotype_id, genotype=None, signature=None):
+        """
+        Add a genotype, or its precomputed signature, to the index, replacing any genotype previously added with the
+        same id.
+        """
+        if signature is None:
+            signature = self.signature(genotype)
+        if genotype_id in self._rows:
+            self.remove(genotype_id)
+
+        if self._free:
+            row = self._free.pop()
+            self._ids[row] = genotype_id
+        else:
+            row = len(self._ids)
+            if row == len(self._signatures):
+                self._signatures = np.vstack([self._signatures, np.zeros_like(self._signatures)])
+            self._ids.append(genotype_id)
+        self._signatures[row] = signature
+        self._rows[genotype_id] = row
+
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(key, set()).add(row)
+
+    def remove(self, genotype_id):
+        """
+        Remove a genotype from the index.
+
+        :raises KeyError: if no genotype with this id has been added
+        """
+        row = self._rows.pop(genotype_id)
+        self._ids[row] = None
+        self._free.append(row)
+        for buckets, key in zip(self._buckets, self._band_keys(self._signatures[row])):
+            bucket = buckets[key]
+            bucket.discard(row)
+            if not bucket:
+                del buckets[key]
+
+    def get_signature(self, genotype_id):
+        return self._signatures[self._rows[genotype_id]].copy()
+
+    def _candidates(self, signature):
+        rows = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            rows.update(buckets.get(key, ()))
+        return rows
+
+    def query(self, genotype=None, signature=None, threshold=None):
+        """
+        Find genotypes that are likely to be similar to ``genotype`` or to the genotype with ``signature``.
+
+        :param threshold: the minimum estimated Jaccard similarity of the returned genotypes
+        :return: a list of ``(genotype_id, similarity)`` tuples, most similar first
+        """
+        if signature is None:
+            signature = self.signature(genotype)
+
+        rows = sorted(self._candidates(signature))
+        if not rows:
+            return []
+
+        similarities = (self._signatures[rows] == signature).mean(axis=1)
+        results = [(self._ids[row], float(s)) for row, s in zip(rows, similarities)
+                   if threshold is None or s >= threshold]
+        results.sort(key=lambda result: -result[1])
+        return results
+
+    def near_duplicates(self, threshold=0.9):
+        """
+        Iterate over ``(genotype_id, genotype_id, similarity)`` tuples of every pair of indexed genotypes whose
+        estimated Jaccard similarity is at least ``threshold``. Each pair is reported once.
+        """
+        seen = set()
+        for buckets in self._buckets:
+            for bucket in buckets.values():
+                if len(bucket) < 2:
+                    continue
+                rows = sorted(bucket)
+                signatures = self._signatures[rows]
+                for i, row in enumerate(rows[:-1]):
+                    similarities = (signatures[i + 1:] == signatures[i]).mean(axis=1)
+                    for other, s in zip(rows[i + 1:], similarities):
+                        if s >= threshold and (row, other) not in seen:
+                            seen.add((row, other))
+                            yield self._ids[row], self._ids[other], float(s)
+
+    def save(self, file):
+        """
+        Save the signatures to ``file`` with :func:`numpy.savez`. Genotype ids are stored as a NumPy array, so they
+        should be strings or integers.
+        """
+        ids = [genotype_id for genotype_id in self._ids if genotype_id is not None]
+        np.savez(file,
+                 ids=np.array(ids),
+                 signatures=self._signatures[[self._rows[genotype_id] for genotype_id in ids]],
+                 params=np.array([self.num_perm, self.bands, self.seed, self.features], dtype=np.int64))
+
+    @classmethod
+    def load(cls, file):
+        """
+        Load an index saved with :meth:`save`, rebuilding its buckets.
+        """
+        with np.load(file) as data:
+            num_perm, bands, seed, features = (int(value) for value in data['params'])
+            index = cls(num_perm, bands, seed, bool(features))
+            for genotype_id, signature in zip(data['ids'].tolist(), data['signatures']):
+                index.add(genotype_id, signature=signature)
+        return index
@@ -0,0 +1,64 @@
+from typing import Any, BinaryIO, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from gnomic.genotype import Genotype
+
+
+def shingles(genotype: Genotype, features: bool = False) -> Set[str]: ...
+
+
+class MinHash(object):
+    num_perm: int
+    seed: int
+
+    def __init__(self, num_perm: int = 128, seed: int = 1) -> None: ...
+
+    def signature(self, shingles: Iterable[str]) -> np.ndarray: ...
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float: ...
+
+
+class LSHIndex(object):
+    minhash: MinHash
+    bands: int
+    features: bool
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1, features: bool = False) -> None: ...
+
+    @property
+    def num_perm(self) -> int: ...
+
+    @property
+    def seed(self) -> int: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, genotype_id: Hashable) -> bool: ...
+
+    @property
+    def ids(self) -> Set[Hashable]: ...
+
+    def signature(self, genotype: Genotype) -> np.ndarray: ...
+
+    def add(self,
+            genotype_id: Hashable,
+            genotype: Optional[Genotype] = None,
+            signature: Optional[np.ndarray] = None) -> None: ...
+
+    def remove(self, genotype_id: Hashable) -> None: ...
+
+    def get_signature(self, genotype_id: Hashable) -> np.ndarray: ...
+
+    def query(self,
+              genotype: Optional[Genotype] = None,
+              signature: Optional[np.ndarray] = None,
+              threshold: Optional[float] = None) -> List[Tuple[Hashable, float]]: ...
+
+    def near_duplicates(self, threshold: float = 0.9) -> Iterator[Tuple[Hashable, Hashable, float]]: ...
+
+    def save(self, file: Union[str, BinaryIO]) -> None: ...
+
+    @classmethod
+    def load(cls, file: Union[str, BinaryIO]) -> 'LSHIndex': ...
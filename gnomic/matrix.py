@@ -0,0 +1,351 @@
+"""
+Numeric representations of genotypes for bulk analysis. Requires NumPy (``pip install gnomic[numpy]``).
+"""
+from collections import defaultdict
+
+from gnomic.index import intern_key, walk
+from gnomic.types import AtLocus, Feature, Fusion, Plasmid
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+_WORD_BITS = 64
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('NumPy is required for gnomic.matrix; install it with "pip install gnomic[numpy]"')
+
+
+class Vocabulary(object):
+    """
+    Assigns consecutive integer ids to items, in order of first appearance.
+
+    :param key: a function that returns the hashable identity of an item; by default, annotations are identified by
+        their type and gnomic representation (see :func:`gnomic.index.intern_key`)
+    """
+
+    def __init__(self, items=(), key=intern_key):
+        self._key = key
+        self._ids = {}
+        self._items = []
+
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, item):
+        return self._key(item) in self._ids
+
+    def __getitem__(self, id):
+        return self._items[id]
+
+    def add(self, item):
+        """
+        Return the id of ``item``, assigning a new id if it has not been seen before.
+        """
+        key = self._key(item)
+        try:
+            return self._ids[key]
+        except KeyError:
+            id = self._ids[key] = len(self._items)
+            self._items.append(item)
+            return id
+
+    def id(self, item):
+        """
+        Return the id of ``item``.
+
+        :raises KeyError: if ``item`` is not part of the vocabulary
+        """
+        return self._ids[self._key(item)]
+
+
+def _popcount(words):
+    words = np.ascontiguousarray(words)
+    return _POPCOUNT[words.view(np.uint8)].reshape(words.shape[:-1] + (-1,)).sum(axis=-1, dtype=np.int64)
+
+
+if np is not None:
+    _POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class FeatureBitsets(object):
+    """
+    The added and removed features of a collection of genotypes, encoded as bitsets over a shared
+    :class:`Vocabulary` of features.
+
+    Each genotype occupies a row of two ``uint64`` arrays, one for :attr:`Genotype.added_features` and one for
+    :attr:`Genotype.removed_features`, in which bit ``i`` is set if the genotype contains the feature with id ``i``.
+    Rows and columns are allocated in doubling steps so that adding genotypes and growing the vocabulary stays cheap.
+
+    Methods that take a ``removed`` argument operate on the added features by default and on the removed features
+    if ``removed`` is ``True``.
+    """
+
+    def __init__(self, genotypes=(), vocabulary=None):
+        _require_numpy()
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self._size = 0
+        self._added = np.zeros((16, 1), dtype=np.uint64)
+        self._removed = np.zeros((16, 1), dtype=np.uint64)
+
+        for genotype in genotypes:
+            self.add(genotype)
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self, rows, words):
+        capacity, width = self._added.shape
+        if rows <= capacity and words <= width:
+            return
+
+        while capacity < rows:
+            capacity *= 2
+        while width < words:
+            width *= 2
+
+        for name in ('_added', '_removed'):
+            bits = np.zeros((capacity, width), dtype=np.uint64)
+            old = getattr(self, name)
+            bits[:old.shape[0], :old.shape[1]] = old
+            setattr(self, name, bits)
+
+    def _encode(self, features):
+        ids = np.fromiter((self.vocabulary.add(feature) for feature in features), dtype=np.int64)
+        return ids // _WORD_BITS, np.left_shift(np.uint64(1), (ids % _WORD_BITS).astype(np.uint64))
+
+    def add(self, genotype):
+        """
+        Add a genotype and return its row.
+        """
+        added = self._encode(genotype.added_features)
+        removed = self._encode(genotype.removed_features)
+
+        row = self._size
+        self._grow(row + 1, len(self.vocabulary) // _WORD_BITS + 1)
+        np.bitwise_or.at(self._added[row], added[0], added[1])
+        np.bitwise_or.at(self._removed[row], removed[0], removed[1])
+        self._size += 1
+        return row
+
+    def bits(self, removed=False):
+        """
+        Return the bitsets of all genotypes as a ``(genotypes, words)`` array of ``uint64``.
+        """
+        words = len(self.vocabulary) // _WORD_BITS + 1
+        self._grow(self._size, words)  # the vocabulary may be shared and have grown elsewhere
+        bits = self._removed if removed else self._added
+        return bits[:self._size, :words]
+
+    def decode(self, words):
+        """
+        Return the set of features encoded in a bitset.
+        """
+        flags = np.unpackbits(np.asarray(words, dtype='<u8').view(np.uint8), bitorder='little')
+        return {self.vocabulary[int(id)] for id in np.flatnonzero(flags[:len(self.vocabulary)])}
+
+    def features(self, row, removed=False):
+        return self.decode(self.bits(removed)[row])
+
+    def union(self, rows=None, removed=False):
+        """
+        Return the features present in any of ``rows``, or in any genotype if ``rows`` is not given.
+        """
+        bits = self.bits(removed)
+        return self.decode(np.bitwise_or.reduce(bits if rows is None else bits[rows], axis=0))
+
+    def intersection(self, rows=None, removed=False):
+        """
+        Return the features present in all of ``rows``, or in every genotype if ``rows`` is not given.
+        """
+        bits = self.bits(removed)
+        if rows is not None:
+            bits = bits[rows]
+        if not len(bits):
+            return set()
+        return self.decode(np.bitwise_and.reduce(bits, axis=0))
+
+    def counts(self, removed=False):
+        """
+        Return an array with the number of genotypes that contain each feature of the vocabulary, indexed by id.
+        """
+        flags = np.unpackbits(self.bits(removed).astype('<u8').view(np.uint8), axis=1, bitorder='little')
+        return flags[:, :len(self.vocabulary)].sum(axis=0, dtype=np.int64)
+
+    def sizes(self, removed=False):
+        """
+        Return an array with the number of features of each genotype.
+        """
+        return _popcount(self.bits(removed))
+
+    def jaccard(self, row, removed=False):
+        """
+        Return the Jaccard similarity of the features of genotype ``row`` to those of every genotype. Two genotypes
+        without features have a similarity of 1.
+        """
+        bits = self.bits(removed)
+        intersection = _popcount(bits & bits[row])
+        union = _popcount(bits | bits[row])
+        return np.where(union > 0, intersection / np.maximum(union, 1).astype(np.float64), 1.0)
+
+    def pairwise_jaccard(self, removed=False):
+        """
+        Return the ``(genotypes, genotypes)`` matrix of Jaccard similarities.
+        """
+        return np.vstack([self.jaccard(row, removed) for row in range(self._size)]) \
+            if self._size else np.zeros((0, 0))
+
+
+FEATURE = 'feature'
+
+VARIANT = 'variant'
+
+FUSION = 'fusion'
+
+PLASMID = 'plasmid'
+
+
+def _column_key(column):
+    kind, annotation = column
+    return (kind,) + intern_key(annotation)
+
+
+def _columns(annotation):
+    """
+    Iterate over the design matrix columns of an annotation and of the annotations nested inside it.
+    """
+    for annotation in walk(annotation):
+        if isinstance(annotation, Feature):
+            if annotation.variant:
+                yield VARIANT, annotation
+                yield FEATURE, Feature(annotation.name, annotation.type,
+                                       accession=annotation.accession,
+                                       organism=annotation.organism)
+            else:
+                yield FEATURE, annotation
+        elif isinstance(annotation, Fusion):
+            yield FUSION, annotation
+        elif isinstance(annotation, Plasmid):
+            yield PLASMID, Plasmid(annotation.name)
+
+
+class DesignMatrixBuilder(object):
+    """
+    Builds a sparse genotype-by-column design matrix from a stream of genotypes.
+
+    Columns are ``(kind, annotation)`` pairs of the kinds :data:`FEATURE` (a feature regardless of variant),
+    :data:`VARIANT` (a feature with a specific variant), :data:`FUSION` and :data:`PLASMID`. An annotation that is
+    inserted or is part of a replacement counts +1, one that is deleted or replaced counts -1; features nested inside
+    fusions and plasmids count towards their own columns too.
+
+    Columns are numbered in order of first appearance, so the ids of existing columns never change. Passing the
+    :attr:`columns` of one builder to another with ``frozen=True`` encodes new genotypes with the same columns,
+    ignoring annotations that are not part of them.
+
+    Rows are collected into compact CSR arrays every ``chunk_size`` genotypes, which bounds the memory held in
+    Python objects regardless of the number of genotypes.
+    """
+
+    def __init__(self, columns=None, frozen=False, chunk_size=10000):
+        _require_numpy()
+        self.columns = columns if columns is not None else Vocabulary(key=_column_key)
+        self.frozen = frozen
+        self.chunk_size = chunk_size
+        self._chunks = []
+        self._rows = []
+
+    def __len__(self):
+        return sum(len(indptr) - 1 for indptr, _, _ in self._chunks) + len(self._rows)
+
+    def _column(self, column):
+        if self.frozen:
+            try:
+                return self.columns.id(column)
+            except KeyError:
+                return None
+        return self.columns.add(column)
+
+    def add(self, genotype):
+        """
+        Add a genotype as the next row of the matrix.
+        """
+        row = defaultdict(int)
+        for change in genotype.changes():
+            for annotation, value in ((change.before, -1), (change.after, 1)):
+                if isinstance(annotation, AtLocus):
+                    annotation = annotation.annotation
+                if annotation is None:
+                    continue
+                for column in _columns(annotation):
+                    id = self._column(column)
+                    if id is not None:
+                        row[id] += value
+
+        self._rows.append(sorted((id, value) for id, value in row.items() if value))
+        if len(self._rows) >= self.chunk_size:
+            self._flush()
+
+    def add_many(self, genotypes):
+        for genotype in genotypes:
+            self.add(genotype)
+
+    def _flush(self):
+        if not self._rows:
+            return
+        indptr = np.zeros(len(self._rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(row) for row in self._rows])
+        indices = np.fromiter((id for row in self._rows for id, _ in row), dtype=np.int32, count=indptr[-1])
+        data = np.fromiter((value for row in self._rows for _, value in row), dtype=np.int32, count=indptr[-1])
+        self._chunks.append((indptr, indices, data))
+        self._rows = []
+
+    def csr_arrays(self):
+        """
+        Return the ``(data, indices, indptr)`` arrays of the matrix in compressed sparse row format.
+        """
+        self._flush()
+        if not self._chunks:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int64)
+
+        offsets = np.cumsum([0] + [indptr[-1] for indptr, _, _ in self._chunks[:-1]])
+        indptr = np.concatenate([self._chunks[0][0][:1]] +
+                                [chunk[0][1:] + offset for chunk, offset in zip(self._chunks, offsets)])
+        indices = np.concatenate([indices for _, indices, _ in self._chunks])
+        data = np.concatenate([data for _, _, data in self._chunks])
+        self._chunks = [(indptr, indices, data)]
+        return data, indices, indptr
+
+    def coo_arrays(self):
+        """
+        Return the ``(rows, columns, values)`` triplets of the matrix.
+        """
+        data, indices, indptr = self.csr_arrays()
+        return np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr)), indices, data
+
+    def tocsr(self):
+        """
+        Return the matrix as a :class:`scipy.sparse.csr_matrix`. Requires SciPy.
+        """
+        from scipy.sparse import csr_matrix
+        data, indices, indptr = self.csr_arrays()
+        return csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.columns)))
+
+
+def design_matrix(genotypes, columns=None, frozen=False, chunk_size=10000):
+    """
+    Build a :class:`scipy.sparse.csr_matrix` with a row for each genotype, using a :class:`DesignMatrixBuilder`.
+
+    :return: a ``(matrix, columns)`` tuple
+    """
+    builder = DesignMatrixBuilder(columns, frozen=frozen, chunk_size=chunk_size)
+    builder.add_many(genotypes)
+    return builder.tocsr(), builder.columns
@@ -0,0 +1,87 @@
+from typing import Any, Callable, Generic, Hashable, Iterable, Iterator, Optional, Sequence, Set, Tuple, TypeVar
+
+import numpy as np
+
+from gnomic.genotype import Genotype
+from gnomic.types import Annotation, Feature
+
+T = TypeVar('T')
+
+
+class Vocabulary(Generic[T]):
+    def __init__(self, items: Iterable[T] = (), key: Callable[[T], Hashable] = ...) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator[T]: ...
+
+    def __contains__(self, item: T) -> bool: ...
+
+    def __getitem__(self, id: int) -> T: ...
+
+    def add(self, item: T) -> int: ...
+
+    def id(self, item: T) -> int: ...
+
+
+class FeatureBitsets(object):
+    vocabulary: Vocabulary[Feature]
+
+    def __init__(self, genotypes: Iterable[Genotype] = (), vocabulary: Vocabulary[Feature] = None) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def add(self, genotype: Genotype) -> int: ...
+
+    def bits(self, removed: bool = False) -> np.ndarray: ...
+
+    def decode(self, words: np.ndarray) -> Set[Feature]: ...
+
+    def features(self, row: int, removed: bool = False) -> Set[Feature]: ...
+
+    def union(self, rows: Optional[Sequence[int]] = None, removed: bool = False) -> Set[Feature]: ...
+
+    def intersection(self, rows: Optional[Sequence[int]] = None, removed: bool = False) -> Set[Feature]: ...
+
+    def counts(self, removed: bool = False) -> np.ndarray: ...
+
+    def sizes(self, removed: bool = False) -> np.ndarray: ...
+
+    def jaccard(self, row: int, removed: bool = False) -> np.ndarray: ...
+
+    def pairwise_jaccard(self, removed: bool = False) -> np.ndarray: ...
+
+
+FEATURE: str
+VARIANT: str
+FUSION: str
+PLASMID: str
+
+
+class DesignMatrixBuilder(object):
+    columns: Vocabulary[Tuple[str, Annotation]]
+    frozen: bool
+    chunk_size: int
+
+    def __init__(self,
+                 columns: Vocabulary[Tuple[str, Annotation]] = None,
+                 frozen: bool = False,
+                 chunk_size: int = 10000) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def add(self, genotype: Genotype) -> None: ...
+
+    def add_many(self, genotypes: Iterable[Genotype]) -> None: ...
+
+    def csr_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]: ...
+
+    def coo_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]: ...
+
+    def tocsr(self) -> Any: ...
+
+
+def design_matrix(genotypes: Iterable[Genotype],
+                  columns: Vocabulary[Tuple[str, Annotation]] = None,
+                  frozen: bool = False,
+                  chunk_size: int = 10000) -> Tuple[Any, Vocabulary[Tuple[str, Annotation]]]: ...
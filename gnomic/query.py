@@ -0,0 +1,164 @@
+import re
+
+import six
+
+from gnomic.genotype import Genotype
+from gnomic.index import INSERTED, REMOVED, REPLACED, REPLACEMENT, LOCUS
+from gnomic.types import Change, Feature, Fusion, Plasmid, AtLocus, CompositeAnnotation
+
+WILDCARD = '*'
+
+# stands in for the wildcard while the query is parsed with the genotype grammar
+_PLACEHOLDER = 'gnomicQueryWildcard0'
+
+# a hyphen before the wildcard is part of a name only if it follows a name character; otherwise it is a deletion
+_WILDCARD_RE = re.compile(r'(?<![A-Za-z0-9_])(?<![A-Za-z0-9_]-)\*(?![A-Za-z0-9_\-])')
+
+PRESENT = (INSERTED, REPLACEMENT)
+
+
+class FeaturePattern(Feature):
+    """
+    A feature used in a query. It matches features like :meth:`Feature.match`, except that a pattern with
+    ``any_variant`` only matches features that have some variant.
+    """
+
+    def __init__(self, name=None, type=None, accession=None, organism=None, variant=None, any_variant=False):
+        super(FeaturePattern, self).__init__(name, type, accession=accession, organism=organism, variant=variant)
+        self.any_variant = any_variant
+
+    def match(self, other, match_variants=True):
+        if self.any_variant and not (isinstance(other, Feature) and other.variant):
+            return False
+        return super(FeaturePattern, self).match(other, match_variants=match_variants)
+
+    def __eq__(self, other):
+        # annotations are also matched by equality, which must not let "geneB(*)" match a plain "geneB"
+        if self.any_variant != (isinstance(other, FeaturePattern) and other.any_variant):
+            return False
+        return super(FeaturePattern, self).__eq__(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = Feature.__hash__
+
+    def __str__(self):
+        s = super(FeaturePattern, self).__str__()
+        if self.any_variant:
+            s += '(*)'
+        return s
+
+
+def _pattern(annotation):
+    if getattr(annotation, 'name', None) == _PLACEHOLDER:
+        raise ValueError('"{}" can only be used in place of an organism, a type or a variant'.format(WILDCARD))
+
+    if isinstance(annotation, Feature):
+        variant = annotation.variant
+        any_variant = bool(variant) and _PLACEHOLDER in variant
+        if any_variant:
+            variant = tuple(v for v in variant if v != _PLACEHOLDER) or None
+
+        return FeaturePattern(annotation.name,
+                              annotation.type if annotation.type != _PLACEHOLDER else None,
+                              accession=annotation.accession,
+                              organism=annotation.organism if annotation.organism != _PLACEHOLDER else None,
+                              variant=variant,
+                              any_variant=any_variant)
+    elif isinstance(annotation, Fusion):
+        return Fusion(*(_pattern(a) for a in annotation.annotations))
+    elif isinstance(annotation, Plasmid):
+        return Plasmid(annotation.name, tuple(_pattern(a) for a in annotation.annotations))
+    elif isinstance(annotation, CompositeAnnotation):
+        return CompositeAnnotation(*(_pattern(a) for a in annotation.annotations))
+    elif isinstance(annotation, AtLocus):
+        return AtLocus(_pattern(annotation.annotation), _pattern(annotation.locus))
+    return annotation
+
+
+def _clauses(change):
+    """
+    Translate a change of a query into ``(roles, annotation)`` clauses that must all match.
+    """
+    clauses = []
+    before, after = change.before, change.after
+    if isinstance(before, AtLocus):
+        clauses.append(((LOCUS,), before.locus))
+        before = before.annotation
+
+    if before is None:
+        # e.g. +geneA or (pA)
+        clauses.append((PRESENT, after))
+    elif after is None:
+        # e.g. -geneA
+        clauses.append(((REMOVED,), before))
+    else:
+        # e.g. siteA>geneB
+        clauses.append(((REPLACED,), before))
+        clauses.append(((REPLACEMENT,), after))
+    return clauses
+
+
+class Query(object):
+    """
+    A search for genotypes written in gnomic syntax, e.g. ``-geneA +Ec/geneB(*) (pUC19)``.
+
+    Every change in the query must match a genotype:
+
+    - ``+feature``, ``(plasmid)`` and phenes match genotypes in which the annotation is present, whether inserted or
+      as part of a replacement,
+    - ``-feature`` matches genotypes in which it is deleted,
+    - ``site>feature`` matches genotypes in which ``site`` is replaced and ``feature`` is part of a replacement,
+    - ``annotation@locus`` additionally requires a change at ``locus``.
+
+    Annotations are matched with :meth:`Feature.match` semantics, so ``geneB`` matches any variant of ``geneB`` from
+    any organism. ``*`` can be used in place of an organism or type to make this explicit, and ``geneB(*)`` matches
+    only variants of ``geneB``. It cannot be used in place of a name.
+    """
+
+    def __init__(self, changes):
+        self.changes = tuple(changes)
+        self.clauses = [clause for change in self.changes for clause in _clauses(change)]
+
+    @classmethod
+    def parse(cls, query_string):
+        if not isinstance(query_string, six.string_types):
+            raise ValueError('"query_string" must a string, got {}'.format(repr(query_string)))
+
+        changes = Genotype._parse_gnomic_string(_WILDCARD_RE.sub(_PLACEHOLDER, query_string))
+        return cls(Change(_pattern(change.before) if change.before is not None else None,
+                          _pattern(change.after) if change.after is not None else None,
+                          multiple=change.multiple)
+                   for change in changes)
+
+    def evaluate(self, index, match_variants=True):
+        """
+        Return the ids of the genotypes in a :class:`gnomic.index.GenotypeIndex` that match this query.
+        """
+        ids = None
+        for roles, annotation in self.clauses:
+            found = set().union(*(index.find(role, annotation, match_variants) for role in roles))
+            ids = found if ids is None else ids & found
+            if not ids:
+                return set()
+        return index.ids if ids is None else ids
+
+    def match(self, genotype, match_variants=True):
+        """
+        Tests whether a single :class:`gnomic.Genotype` matches this query.
+        """
+        index = genotype.state.index
+        return all(any(index.contains(role, annotation, match_variants) for role in roles)
+                   for roles, annotation in self.clauses)
+
+    def __str__(self):
+        return ' '.join(six.text_type(change.after) if change.before is None and isinstance(change.after, Plasmid)
+                        else six.text_type(change) for change in self.changes)
+
+
+def search(index, query_string, match_variants=True):
+    """
+    Return the ids of the genotypes in a :class:`gnomic.index.GenotypeIndex` that match a gnomic query string.
+    """
+    return Query.parse(query_string).evaluate(index, match_variants=match_variants)
@@ -0,0 +1,37 @@
+from typing import Iterable, Hashable, List, Set, Tuple
+
+from gnomic.genotype import Genotype
+from gnomic.index import GenotypeIndex
+from gnomic.types import Accession, Annotation, Change, Feature
+
+WILDCARD: str
+PRESENT: Tuple[str, ...]
+
+
+class FeaturePattern(Feature):
+    any_variant: bool
+
+    def __init__(self,
+                 name: str = None,
+                 type: str = None,
+                 accession: Accession = None,
+                 organism: str = None,
+                 variant: Tuple[str] = None,
+                 any_variant: bool = False) -> None: ...
+
+
+class Query(object):
+    changes: Tuple[Change, ...]
+    clauses: List[Tuple[Tuple[str, ...], Annotation]]
+
+    def __init__(self, changes: Iterable[Change]) -> None: ...
+
+    @classmethod
+    def parse(cls, query_string: str) -> 'Query': ...
+
+    def evaluate(self, index: GenotypeIndex, match_variants: bool = True) -> Set[Hashable]: ...
+
+    def match(self, genotype: Genotype, match_variants: bool = True) -> bool: ...
+
+
+def search(index: GenotypeIndex, query_string: str, match_variants: bool = True) -> Set[Hashable]: ...
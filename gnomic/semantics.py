@@ -1,4 +1,8 @@
-from gnomic.grammar import GnomicSemantics
+import threading
+
+from grako.ast import AST
+
+from gnomic.grammar import GnomicParser, GnomicSemantics
 from gnomic.types import Fusion, Feature, Plasmid, Change, Accession, AtLocus, CompositeAnnotation
 
 
@@ -25,13 +29,13 @@ class DefaultSemantics(GnomicSemantics):
         return ''.join(ast)
 
     def INSERTION(self, ast):
-        return Change(after=ast.after)
+        return Change(after=ast.get('after'))
 
     def REPLACEMENT(self, ast):
-        return Change(before=ast.before, after=ast.after, multiple=ast.op == '>>')
+        return Change(before=ast.get('before'), after=ast.get('after'), multiple=ast.get('op') == '>>')
 
     def DELETION(self, ast):
-        return Change(before=ast.before)
+        return Change(before=ast.get('before'))
 
     def INTEGER(self, ast):
         return int(ast)
@@ -42,17 +46,18 @@ class DefaultSemantics(GnomicSemantics):
         return ast
 
     def PLASMID(self, ast):
-        return Plasmid(ast.name, ast.annotations or ())
+        return Plasmid(ast.get('name'), ast.get('annotations') or ())
 
     def PHENE(self, ast):
         return Change(after=self.FEATURE(ast), multiple=True)
 
     def FEATURE(self, ast):
-        return Feature(ast.name,
-                       ast.type,
-                       accession=ast.accession,
-                       organism=ast.organism,
-                       variant=tuple(ast.variant) if ast.variant else None)
+        variant = ast.get('variant')
+        return Feature(ast.get('name'),
+                       ast.get('type'),
+                       accession=ast.get('accession'),
+                       organism=ast.get('organism'),
+                       variant=tuple(variant) if variant else None)
 
     def NUCLEOTIDE_SEQUENCE(self, ast):
         return ''.join(ast)
@@ -61,7 +66,79 @@ class DefaultSemantics(GnomicSemantics):
         return ''.join(ast)
 
     def ACCESSION(self, ast):
-        return Accession(ast.id, ast.db)
+        return Accession(ast.get('id'), ast.get('db'))
 
     def ANNOTATION_AT_LOCUS(self, ast):
-        return AtLocus(ast.annotation, ast.locus)
+        return AtLocus(ast.get('annotation'), ast.get('locus'))
+
+
+class _LeanAST(AST):
+    """
+    An :class:`grako.ast.AST` that is created and copied without going through :meth:`AST.update` and the checks of
+    :meth:`AST.__setattr__`, as the parser creates and copies one for every rule and option it tries.
+    """
+
+    def __init__(self):
+        dict.__init__(self)
+        vars(self).update(_order=[], _parseinfo=None, _closed=True)
+
+    def copy(self):
+        ast = _LeanAST()
+        dict.update(ast, ((key, value[:] if isinstance(value, list) else value) for key, value in dict.items(self)))
+        vars(ast)['_order'] = self._order[:]
+        return ast
+
+
+class LeanParser(GnomicParser):
+    """
+    A :class:`GnomicParser` for parsing with :class:`DefaultSemantics` as fast as grako allows.
+
+    The parser does not record parse info on the nodes, which the semantics discard, uses a leaner AST class for the
+    nodes it builds for every rule and option it tries, and calls the rules of its semantics through a table built on
+    first use instead of looking them up for every node. A parser can be reused for any number of strings, but not by
+    several threads at once.
+    """
+
+    def __init__(self, semantics=None, **kwargs):
+        kwargs.setdefault('parseinfo', False)
+        super(LeanParser, self).__init__(**kwargs)
+        self.semantics = semantics if semantics is not None else DefaultSemantics()
+        self._semantic_rules = {}
+
+    def parse(self, text, *args, **kwargs):
+        try:
+            return super(LeanParser, self).parse(text, *args, **kwargs)
+        finally:
+            # parse failures of alternatives that were backtracked over keep the frames of their tracebacks, and
+            # with them the callers' local variables, alive for as long as the parser is kept
+            self._furthest_exception = None
+
+    def _push_ast(self):
+        self._push_cst()
+        self._ast_stack.append(_LeanAST())
+
+    def _invoke_semantic_rule(self, name, node, params, kwparams):
+        try:
+            rule, postproc = self._semantic_rules[name]
+        except KeyError:
+            rule, postproc = self._semantic_rules[name] = self._find_semantic_rule(name)
+        if rule is not None:
+            node = rule(node, *(params or ()), **(kwparams or {}))
+        if postproc is not None:
+            postproc(self, node)
+        return node
+
+
+_local = threading.local()
+
+
+def parse(text, rule_name='start'):
+    """
+    Parse ``text`` with :class:`DefaultSemantics`, using a :class:`LeanParser` that is kept for the current thread.
+
+    :param rule_name: the grammar rule to parse ``text`` as, e.g. ``'CHANGE'`` or ``'FEATURE'``
+    """
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = LeanParser()
+    return parser.parse(text, rule_name=rule_name, whitespace='')
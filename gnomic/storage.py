@@ -0,0 +1,495 @@
+"""
+Persistent storage of genotypes in a SQLite database.
+
+Genotypes are stored as the changes of their state, in normalized tables:
+
+- ``genotypes``: one row per strain, with the fingerprint of the genotype and a pointer to the parent genotype,
+- ``changes``: the changes of each genotype, in order,
+- ``annotations``: every distinct annotation, with the name, type, accession, organism and variant of features and
+  the name of plasmids in indexed columns,
+- ``annotation_members``: the members of fusions, composite annotations and plasmids, and the annotation and locus of
+  annotations at a locus,
+- ``change_annotations``: the role each annotation, including the ones nested inside others, plays in the changes of
+  a genotype (see :func:`gnomic.index.change_entries`).
+
+Genotypes are rebuilt from these tables without parsing, and :meth:`GenotypeStore.find` and
+:meth:`GenotypeStore.search` are evaluated by SQLite using the indexes.
+"""
+import json
+import sqlite3
+
+import six
+
+from gnomic.genotype import Genotype
+from gnomic.index import change_entries
+from gnomic.types import Accession, AtLocus, Change, CompositeAnnotation, Feature, Fusion, Plasmid
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS genotypes (
+    id INTEGER PRIMARY KEY,
+    strain TEXT NOT NULL UNIQUE,
+    fingerprint TEXT NOT NULL,
+    parent_id INTEGER REFERENCES genotypes (id) ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS genotypes_fingerprint ON genotypes (fingerprint);
+CREATE INDEX IF NOT EXISTS genotypes_parent ON genotypes (parent_id);
+
+CREATE TABLE IF NOT EXISTS annotations (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    name TEXT,
+    type TEXT,
+    accession TEXT,
+    organism TEXT,
+    variant TEXT
+);
+CREATE INDEX IF NOT EXISTS annotations_name ON annotations (name);
+CREATE INDEX IF NOT EXISTS annotations_organism ON annotations (organism, name);
+CREATE INDEX IF NOT EXISTS annotations_accession ON annotations (accession);
+CREATE INDEX IF NOT EXISTS annotations_plasmid ON annotations (name) WHERE kind = 'plasmid';
+
+CREATE TABLE IF NOT EXISTS annotation_members (
+    annotation_id INTEGER NOT NULL REFERENCES annotations (id),
+    position INTEGER NOT NULL,
+    member_id INTEGER NOT NULL REFERENCES annotations (id),
+    PRIMARY KEY (annotation_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS changes (
+    genotype_id INTEGER NOT NULL REFERENCES genotypes (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    before_id INTEGER REFERENCES annotations (id),
+    after_id INTEGER REFERENCES annotations (id),
+    multiple INTEGER NOT NULL,
+    PRIMARY KEY (genotype_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS change_annotations (
+    genotype_id INTEGER NOT NULL REFERENCES genotypes (id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    annotation_id INTEGER NOT NULL REFERENCES annotations (id),
+    PRIMARY KEY (annotation_id, role, genotype_id)
+);
+CREATE INDEX IF NOT EXISTS change_annotations_genotype ON change_annotations (genotype_id);
+"""
+
+FEATURE = 'feature'
+
+FUSION = 'fusion'
+
+COMPOSITE = 'composite'
+
+PLASMID = 'plasmid'
+
+AT_LOCUS = 'at_locus'
+
+
+def _kind(annotation):
+    if isinstance(annotation, Feature):
+        return FEATURE
+    elif isinstance(annotation, AtLocus):
+        return AT_LOCUS
+    elif isinstance(annotation, Plasmid):
+        return PLASMID
+    elif isinstance(annotation, Fusion):
+        return FUSION
+    elif isinstance(annotation, CompositeAnnotation):
+        return COMPOSITE
+    raise ValueError('Cannot store {!r}'.format(annotation))
+
+
+def _key(annotation):
+    return u'{}:{}'.format(_kind(annotation), six.text_type(annotation))
+
+
+def _accession(accession):
+    return six.text_type(accession) if accession is not None else None
+
+
+def _members(annotation):
+    if isinstance(annotation, AtLocus):
+        return annotation.annotation, annotation.locus
+    elif isinstance(annotation, Feature):
+        return ()
+    return annotation.annotations
+
+
+def _match_clause(annotation, match_variants):
+    """
+    Return a SQL condition on the ``annotations`` table, aliased ``a``, and its parameters that selects the annotations
+    ``annotation`` matches with :meth:`Annotation.match` semantics, or ``None`` if it matches nothing.
+
+    Features and plasmids are matched on their indexed columns and the members of fusions are matched in position;
+    other annotations are matched by equality, as :func:`gnomic.index.matches` does.
+    """
+    if isinstance(annotation, Feature):
+        if annotation.name:
+            clause, parameters = 'a.name = ?', [annotation.name]
+            if annotation.organism:
+                clause += ' AND a.organism = ?'
+                parameters.append(annotation.organism)
+            if annotation.variant and match_variants:
+                clause += ' AND a.variant = ?'
+                parameters.append(json.dumps(list(annotation.variant)))
+
+            if annotation.accession:
+                clause = 'a.accession = ? OR (a.accession IS NULL AND {})'.format(clause)
+                parameters.insert(0, _accession(annotation.accession))
+        elif annotation.accession:
+            clause, parameters = 'a.accession = ?', [_accession(annotation.accession)]
+        else:
+            return None
+        return "a.kind = 'feature' AND ({})".format(clause), parameters
+    elif isinstance(annotation, Plasmid):
+        return "a.kind = 'plasmid' AND a.name = ?", [annotation.name]
+    elif isinstance(annotation, Fusion):
+        clause = "a.kind = 'fusion' AND (SELECT COUNT(*) FROM annotation_members m WHERE m.annotation_id = a.id) = ?"
+        parameters = [len(annotation)]
+        for position, member in enumerate(annotation.annotations):
+            member_clause = _match_clause(member, match_variants)
+            if member_clause is None:
+                break
+            # the alias "a" of the member condition refers to the member within the subquery
+            clause += ' AND a.id IN (SELECT m.annotation_id FROM annotation_members m JOIN annotations a ' \
+                      'ON a.id = m.member_id WHERE m.position = ? AND ({}))'.format(member_clause[0])
+            parameters += [position] + member_clause[1]
+        else:
+            return clause, parameters
+    return 'a.key = ?', [_key(annotation)]
+
+
+class GenotypeStore(object):
+    """
+    A collection of genotypes persisted in a SQLite database, keyed by strain.
+
+    Example::
+
+        with GenotypeStore('strains.db') as store:
+            store.add('strain-1', Genotype.parse('-geneA +geneB'))
+            store.add('strain-2', Genotype.parse('+geneC'), parent='strain-1')
+            store.find(INSERTED, Feature('geneC'))  # {'strain-2'}
+            store.get('strain-2', parents=True).parent.changes()
+
+    :param path: the path of the database file, or ``':memory:'`` for a temporary database
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        with self._connection:
+            version = self._connection.execute('PRAGMA user_version').fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                raise ValueError('Unsupported schema version {} in {}'.format(version, path))
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+        self._annotation_ids = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM genotypes').fetchone()[0]
+
+    def __contains__(self, strain):
+        return self._genotype_id(strain) is not None
+
+    def __iter__(self):
+        for strain, in self._connection.execute('SELECT strain FROM genotypes ORDER BY id'):
+            yield strain
+
+    def _genotype_id(self, strain):
+        row = self._connection.execute('SELECT id FROM genotypes WHERE strain = ?',
+                                       (six.text_type(strain),)).fetchone()
+        return row[0] if row else None
+
+    def _annotation_id(self, annotation):
+        key = _key(annotation)
+        try:
+            return self._annotation_ids[key]
+        except KeyError:
+            pass
+
+        cursor = self._connection.cursor()
+        row = cursor.execute('SELECT id FROM annotations WHERE key = ?', (key,)).fetchone()
+        if row:
+            id = row[0]
+        else:
+            members = [self._annotation_id(member) for member in _members(annotation)]
+            if isinstance(annotation, Feature):
+                values = (annotation.name, annotation.type, _accession(annotation.accession), annotation.organism,
+                          json.dumps(list(annotation.variant)) if annotation.variant else None)
+            else:
+                values = (getattr(annotation, 'name', None), None, None, None, None)
+            cursor.execute('INSERT INTO annotations (key, kind, name, type, accession, organism, variant) '
+                           'VALUES (?, ?, ?, ?, ?, ?, ?)', (key, _kind(annotation)) + values)
+            id = cursor.lastrowid
+            cursor.executemany('INSERT INTO annotation_members (annotation_id, position, member_id) VALUES (?, ?, ?)',
+                               [(id, position, member) for position, member in enumerate(members)])
+
+        self._annotation_ids[key] = id
+        return id
+
+    def _add(self, strain, genotype, parent):
+        strain = six.text_type(strain)
+        cursor = self._connection.cursor()
+
+        if parent is not None:
+            parent_id = self._genotype_id(parent)
+            if parent_id is None:
+                raise KeyError(parent)
+        elif genotype.parent_fingerprint is not None:
+            row = cursor.execute('SELECT id FROM genotypes WHERE fingerprint = ? ORDER BY id',
+                                 (genotype.parent_fingerprint,)).fetchone()
+            parent_id = row[0] if row else None
+        else:
+            parent_id = None
+
+        # replace in place so that the genotypes that point to this one as their parent keep doing so
+        genotype_id = self._genotype_id(strain)
+        if genotype_id is None:
+            cursor.execute('INSERT INTO genotypes (strain, fingerprint, parent_id) VALUES (?, ?, ?)',
+                           (strain, genotype.fingerprint(), parent_id))
+            genotype_id = cursor.lastrowid
+        else:
+            cursor.execute('UPDATE genotypes SET fingerprint = ?, parent_id = ? WHERE id = ?',
+                           (genotype.fingerprint(), parent_id, genotype_id))
+            cursor.execute('DELETE FROM changes WHERE genotype_id = ?', (genotype_id,))
+            cursor.execute('DELETE FROM change_annotations WHERE genotype_id = ?', (genotype_id,))
+
+        changes, entries = [], set()
+        for position, change in enumerate(genotype.changes()):
+            changes.append((genotype_id, position,
+                            self._annotation_id(change.before) if change.before is not None else None,
+                            self._annotation_id(change.after) if change.after is not None else None,
+                            int(bool(change.multiple))))
+            entries.update((genotype_id, role, self._annotation_id(annotation))
+                           for role, annotation in change_entries(change.before, change.after))
+
+        cursor.executemany('INSERT INTO changes (genotype_id, position, before_id, after_id, multiple) '
+                           'VALUES (?, ?, ?, ?, ?)', changes)
+        cursor.executemany('INSERT INTO change_annotations (genotype_id, role, annotation_id) VALUES (?, ?, ?)',
+                           entries)
+
+    def add(self, strain, genotype, parent=None):
+        """
+        Store the genotype of ``strain``, replacing any genotype previously stored for it.
+
+        :param parent: the strain of the parent genotype. If not given, the parent is looked up by the
+            :attr:`Genotype.parent_fingerprint` of ``genotype`` among the stored genotypes.
+        :raises KeyError: if ``parent`` is not stored
+        """
+        self.add_many([(strain, genotype, parent)])
+
+    def add_many(self, genotypes, batch_size=1000):
+        """
+        Store genotypes in transactions of ``batch_size`` genotypes each.
+
+        :param genotypes: a dictionary or iterable of ``(strain, genotype)`` or ``(strain, genotype, parent)`` tuples
+        """
+        batch = []
+        for item in (genotypes.items() if hasattr(genotypes, 'items') else genotypes):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                self._add_batch(batch)
+                batch = []
+        if batch:
+            self._add_batch(batch)
+
+    def _add_batch(self, batch):
+        try:
+            with self._connection:
+                for item in batch:
+                    strain, genotype, parent = item if len(item) == 3 else tuple(item) + (None,)
+                    self._add(strain, genotype, parent)
+        except Exception:
+            # ids of annotations inserted in the failed transaction are no longer valid
+            self._annotation_ids.clear()
+            raise
+
+    def remove(self, strain):
+        """
+        Remove the genotype of ``strain``. Genotypes that have it as their parent no longer have a parent.
+
+        :raises KeyError: if no genotype is stored for ``strain``
+        """
+        with self._connection:
+            if not self._connection.execute('DELETE FROM genotypes WHERE strain = ?',
+                                            (six.text_type(strain),)).rowcount:
+                raise KeyError(strain)
+
+    def _annotations(self, ids):
+        """
+        Load the annotations with ``ids`` and the annotations nested inside them.
+        """
+        annotations, rows, members = {}, {}, {}
+        pending = set(ids)
+        while pending:
+            batch = list(pending)
+            placeholders = ', '.join('?' * len(batch))
+            for row in self._connection.execute('SELECT id, kind, name, type, accession, organism, variant '
+                                                'FROM annotations WHERE id IN ({})'.format(placeholders), batch):
+                rows[row[0]] = row[1:]
+                members[row[0]] = []
+            for id, member in self._connection.execute('SELECT annotation_id, member_id FROM annotation_members '
+                                                       'WHERE annotation_id IN ({}) ORDER BY annotation_id, position'
+                                                       .format(placeholders), batch):
+                members[id].append(member)
+            pending = set(member for id in batch for member in members[id]) - set(rows)
+
+        def build(id):
+            try:
+                return annotations[id]
+            except KeyError:
+                pass
+
+            kind, name, type, accession, organism, variant = rows[id]
+            children = [build(member) for member in members[id]]
+            if kind == FEATURE:
+                annotation = Feature(name, type,
+                                     accession=Accession.parse(accession) if accession is not None else None,
+                                     organism=organism,
+                                     variant=tuple(json.loads(variant)) if variant else None)
+            elif kind == AT_LOCUS:
+                annotation = AtLocus(*children)
+            elif kind == PLASMID:
+                annotation = Plasmid(name, tuple(children))
+            elif kind == FUSION:
+                annotation = Fusion(*children)
+            else:
+                annotation = CompositeAnnotation(*children)
+            annotations[id] = annotation
+            return annotation
+
+        return {id: build(id) for id in ids}
+
+    def get(self, strain, default=None, parents=False):
+        """
+        Load the genotype of ``strain``.
+
+        :param parents: also load the ancestors of the genotype and set them as its :attr:`Genotype.parent`
+        :return: the genotype, or ``default`` if no genotype is stored for ``strain``
+        """
+        row = self._connection.execute('SELECT id, parent_id FROM genotypes WHERE strain = ?',
+                                       (six.text_type(strain),)).fetchone()
+        if row is None:
+            return default
+        return self._load(*row, parents=parents)
+
+    def __getitem__(self, strain):
+        genotype = self.get(strain)
+        if genotype is None:
+            raise KeyError(strain)
+        return genotype
+
+    def _load(self, genotype_id, parent_id, parents=False):
+        genotype = self._genotype(genotype_id)
+
+        # walk up the lineage iteratively, as it can be longer than the recursion limit
+        child, seen = genotype, {genotype_id}
+        while parents and parent_id is not None and parent_id not in seen:
+            seen.add(parent_id)
+            child.parent = self._genotype(parent_id)
+            child = child.parent
+            parent_id, = self._connection.execute('SELECT parent_id FROM genotypes WHERE id = ?',
+                                                  (parent_id,)).fetchone()
+        return genotype
+
+    def _genotype(self, genotype_id):
+        rows = self._connection.execute('SELECT before_id, after_id, multiple FROM changes '
+                                        'WHERE genotype_id = ? ORDER BY position', (genotype_id,)).fetchall()
+        ids = set(id for before, after, _ in rows for id in (before, after) if id is not None)
+        annotations = self._annotations(ids)
+        # the stored changes are the net changes of the genotype, which must not be applied again
+        return Genotype.from_changes(Change(annotations.get(before), annotations.get(after), multiple=bool(multiple))
+                                     for before, after, multiple in rows)
+
+    def items(self):
+        for genotype_id, strain, parent_id in self._connection.execute(
+                'SELECT id, strain, parent_id FROM genotypes ORDER BY id').fetchall():
+            yield strain, self._load(genotype_id, parent_id)
+
+    def parent(self, strain):
+        """
+        Return the strain of the parent of ``strain``, or ``None``.
+
+        :raises KeyError: if no genotype is stored for ``strain``
+        """
+        row = self._connection.execute('SELECT p.strain FROM genotypes g LEFT JOIN genotypes p ON p.id = g.parent_id '
+                                       'WHERE g.strain = ?', (six.text_type(strain),)).fetchone()
+        if row is None:
+            raise KeyError(strain)
+        return row[0]
+
+    def lineage(self, strain):
+        """
+        Return the strains from the root of the lineage of ``strain`` down to ``strain``.
+        """
+        rows = self._connection.execute("""
+            WITH RECURSIVE lineage (id, strain, parent_id, depth) AS (
+                SELECT id, strain, parent_id, 0 FROM genotypes WHERE strain = ?
+                UNION ALL
+                SELECT g.id, g.strain, g.parent_id, l.depth + 1 FROM genotypes g JOIN lineage l ON g.id = l.parent_id
+            )
+            SELECT strain FROM lineage ORDER BY depth DESC""", (six.text_type(strain),)).fetchall()
+        if not rows:
+            raise KeyError(strain)
+        return [row[0] for row in rows]
+
+    def _find_query(self, role, annotation, match_variants):
+        clause = _match_clause(annotation, match_variants)
+        if clause is None:
+            return 'SELECT genotype_id FROM change_annotations WHERE 0', []
+        condition, parameters = clause
+        return 'SELECT ca.genotype_id FROM change_annotations ca JOIN annotations a ON a.id = ca.annotation_id ' \
+               'WHERE ca.role = ? AND ({})'.format(condition), [role] + parameters
+
+    def _strains(self, query, parameters):
+        return set(row[0] for row in self._connection.execute(
+            'SELECT strain FROM genotypes WHERE id IN ({})'.format(query), parameters))
+
+    def find(self, role, annotation, match_variants=True):
+        """
+        Return the strains of the genotypes with an annotation in ``role`` that ``annotation`` matches.
+
+        :param role: one of :data:`gnomic.index.INSERTED`, :data:`gnomic.index.REMOVED`,
+            :data:`gnomic.index.REPLACED`, :data:`gnomic.index.REPLACEMENT` or :data:`gnomic.index.LOCUS`
+        :param annotation:
+        :param match_variants: passed on to :meth:`Annotation.match`
+        :return: a set of strains
+        """
+        return self._strains(*self._find_query(role, annotation, match_variants))
+
+    def search(self, all_of=(), any_of=(), none_of=(), match_variants=True):
+        """
+        Evaluate a boolean query with the semantics of :meth:`gnomic.index.GenotypeIndex.search` in a single SQL
+        statement.
+
+        :return: a set of strains
+        """
+        query, parameters = 'SELECT id FROM genotypes', []
+
+        def combine(operator, terms):
+            queries = []
+            for role, annotation in terms:
+                term_query, term_parameters = self._find_query(role, annotation, match_variants)
+                queries.append(term_query)
+                parameters.extend(term_parameters)
+            return ' {} '.format(operator).join(queries)
+
+        if all_of:
+            query = combine('INTERSECT', all_of)
+        if any_of:
+            query = 'SELECT * FROM ({}) INTERSECT SELECT * FROM ({})'.format(query, combine('UNION', any_of))
+        if none_of:
+            query = 'SELECT * FROM ({}) EXCEPT SELECT * FROM ({})'.format(query, combine('UNION', none_of))
+        return self._strains(query, parameters)
@@ -0,0 +1,57 @@
+from typing import Any, Hashable, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+from gnomic.genotype import Genotype
+from gnomic.types import Annotation
+
+SCHEMA_VERSION: int
+FEATURE: str
+FUSION: str
+COMPOSITE: str
+PLASMID: str
+AT_LOCUS: str
+
+Term = Tuple[str, Annotation]
+
+
+class GenotypeStore(object):
+    path: str
+
+    def __init__(self, path: str = ':memory:') -> None: ...
+
+    def __enter__(self) -> 'GenotypeStore': ...
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None: ...
+
+    def close(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, strain: Hashable) -> bool: ...
+
+    def __iter__(self) -> Iterator[str]: ...
+
+    def add(self, strain: Hashable, genotype: Genotype, parent: Optional[Hashable] = None) -> None: ...
+
+    def add_many(self,
+                 genotypes: Union[Mapping[Hashable, Genotype], Iterable[Sequence[Any]]],
+                 batch_size: int = 1000) -> None: ...
+
+    def remove(self, strain: Hashable) -> None: ...
+
+    def get(self, strain: Hashable, default: Optional[Genotype] = None, parents: bool = False) -> Optional[Genotype]: ...
+
+    def __getitem__(self, strain: Hashable) -> Genotype: ...
+
+    def items(self) -> Iterator[Tuple[str, Genotype]]: ...
+
+    def parent(self, strain: Hashable) -> Optional[str]: ...
+
+    def lineage(self, strain: Hashable) -> List[str]: ...
+
+    def find(self, role: str, annotation: Annotation, match_variants: bool = True) -> Set[str]: ...
+
+    def search(self,
+               all_of: Iterable[Term] = (),
+               any_of: Iterable[Term] = (),
+               none_of: Iterable[Term] = (),
+               match_variants: bool = True) -> Set[str]: ...
@@ -0,0 +1,217 @@
+"""
+A table of interned features in shared memory, so that the processes of a :mod:`multiprocessing` pool can exchange
+compact integer ids instead of pickled :class:`gnomic.types.Feature` objects. Requires Python 3.8 or later.
+
+The parent process creates the table from the features it knows about and passes it to the workers, which attach
+to the same block of shared memory; pickling a table only transfers the name of the block. Lookups go through a hash
+table that also lives in shared memory, so workers do not build their own copies of the strings. Features are
+decoded from ids only on demand, and each process caches the features it has decoded::
+
+    with SharedSymbolTable.create(features) as table:
+        with Pool(initializer=init_worker, initargs=(table,)) as pool:
+            ids = pool.map(worker, genotypes)  # workers call table.id(feature)
+        features = [table[id] for id in ids]
+"""
+import json
+import struct
+import zlib
+
+import six
+
+from gnomic.types import Accession, Feature
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    shared_memory = None
+
+MAGIC = b'GSYM'
+
+_HEADER = struct.Struct('<4sIII')
+
+_UINT32 = struct.Struct('<I')
+
+
+def _require_shared_memory():
+    if shared_memory is None:
+        raise ImportError('multiprocessing.shared_memory is required for gnomic.symbols; use Python 3.8 or later')
+
+
+def encode_feature(feature):
+    """
+    Return the UTF-8 encoded record of a feature in a symbol table.
+    """
+    return json.dumps([feature.name,
+                       feature.type,
+                       six.text_type(feature.accession) if feature.accession is not None else None,
+                       feature.organism,
+                       list(feature.variant) if feature.variant else None],
+                      separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def decode_feature(record):
+    name, type, accession, organism, variant = json.loads(bytes(record).decode('utf-8'))
+    return Feature(name, type,
+                   accession=Accession.parse(accession) if accession is not None else None,
+                   organism=organism,
+                   variant=tuple(variant) if variant else None)
+
+
+class SharedSymbolTable(object):
+    """
+    A read-only table of features in a block of shared memory, mapping features to consecutive integer ids.
+
+    Use :meth:`create` to build a table and :meth:`attach` (or unpickling) to open it in another process. The
+    process that created the table owns the block and releases it with :meth:`unlink` or when the table is used as a
+    context manager.
+    """
+
+    def __init__(self, memory, owner=False):
+        self._memory = memory
+        self._owner = owner
+        self._cache = {}
+
+        magic, self._size, self._slots, self._data = _HEADER.unpack_from(memory.buf)
+        if magic != MAGIC:
+            raise ValueError('{} is not a gnomic symbol table'.format(memory.name))
+        self._offsets = _HEADER.size
+        self._table = self._offsets + _UINT32.size * (self._size + 1)
+
+    @classmethod
+    def create(cls, features, name=None):
+        """
+        Create a table of the distinct features in ``features``, numbered in order of first appearance.
+
+        :param name: the name of the shared memory block; a unique name is chosen if not given
+        """
+        _require_shared_memory()
+
+        records, ids = [], {}
+        for feature in features:
+            record = encode_feature(feature)
+            if record not in ids:
+                ids[record] = len(records)
+                records.append(record)
+
+        slots = 8
+        while slots < 2 * len(records):
+            slots *= 2
+
+        table = [0] * slots
+        for id, record in enumerate(records):
+            slot = zlib.crc32(record) & (slots - 1)
+            while table[slot]:
+                slot = (slot + 1) & (slots - 1)
+            table[slot] = id + 1
+
+        offsets = [0]
+        for record in records:
+            offsets.append(offsets[-1] + len(record))
+
+        data = _HEADER.size + _UINT32.size * (len(offsets) + slots)
+        buffer = b''.join([_HEADER.pack(MAGIC, len(records), slots, data),
+                           struct.pack('<{}I'.format(len(offsets)), *offsets),
+                           struct.pack('<{}I'.format(slots), *table)] + records)
+
+        memory = shared_memory.SharedMemory(name=name, create=True, size=len(buffer))
+        memory.buf[:len(buffer)] = buffer
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Open the table in the shared memory block ``name``.
+        """
+        _require_shared_memory()
+        try:
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # before Python 3.13, attaching also registers the block with the resource tracker, which is harmless in
+            # the workers of a pool as they share the tracker of the process that created the block
+            memory = shared_memory.SharedMemory(name=name)
+        return cls(memory)
+
+    def __reduce__(self):
+        return self.attach, (self.name,)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    @property
+    def name(self):
+        return self._memory.name
+
+    def close(self):
+        """
+        Detach from the shared memory block. The table cannot be used afterwards.
+        """
+        self._memory.close()
+
+    def unlink(self):
+        """
+        Release the shared memory block once every process has closed it.
+        """
+        self._memory.unlink()
+
+    def __len__(self):
+        return self._size
+
+    def _record(self, id):
+        start, end = struct.unpack_from('<II', self._memory.buf, self._offsets + _UINT32.size * id)
+        return self._memory.buf[self._data + start:self._data + end]
+
+    def get_id(self, feature, default=None):
+        """
+        Return the id of ``feature``, or ``default`` if it is not part of the table.
+        """
+        record = encode_feature(feature)
+        mask = self._slots - 1
+        slot = zlib.crc32(record) & mask
+        while True:
+            id, = _UINT32.unpack_from(self._memory.buf, self._table + _UINT32.size * slot)
+            if not id:
+                return default
+            if self._record(id - 1) == record:
+                return id - 1
+            slot = (slot + 1) & mask
+
+    def id(self, feature):
+        """
+        Return the id of ``feature``.
+
+        :raises KeyError: if ``feature`` is not part of the table
+        """
+        id = self.get_id(feature)
+        if id is None:
+            raise KeyError(feature)
+        return id
+
+    def ids(self, features):
+        return [self.id(feature) for feature in features]
+
+    def __contains__(self, feature):
+        return self.get_id(feature) is not None
+
+    def __getitem__(self, id):
+        """
+        Decode the feature with ``id``.
+        """
+        if not 0 <= id < self._size:
+            raise IndexError(id)
+        try:
+            return self._cache[id]
+        except KeyError:
+            feature = self._cache[id] = decode_feature(self._record(id))
+            return feature
+
+    def decode(self, ids):
+        return [self[id] for id in ids]
+
+    def __iter__(self):
+        for id in range(self._size):
+            yield self[id]
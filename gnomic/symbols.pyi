@@ -0,0 +1,50 @@
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from gnomic.types import Feature
+
+MAGIC: bytes
+
+
+def encode_feature(feature: Feature) -> bytes: ...
+
+
+def decode_feature(record: bytes) -> Feature: ...
+
+
+class SharedSymbolTable(object):
+    def __init__(self, memory: Any, owner: bool = False) -> None: ...
+
+    @classmethod
+    def create(cls, features: Iterable[Feature], name: Optional[str] = None) -> 'SharedSymbolTable': ...
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedSymbolTable': ...
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str]]: ...
+
+    def __enter__(self) -> 'SharedSymbolTable': ...
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None: ...
+
+    @property
+    def name(self) -> str: ...
+
+    def close(self) -> None: ...
+
+    def unlink(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def get_id(self, feature: Feature, default: Optional[int] = None) -> Optional[int]: ...
+
+    def id(self, feature: Feature) -> int: ...
+
+    def ids(self, features: Iterable[Feature]) -> List[int]: ...
+
+    def __contains__(self, feature: Feature) -> bool: ...
+
+    def __getitem__(self, id: int) -> Feature: ...
+
+    def decode(self, ids: Iterable[int]) -> List[Feature]: ...
+
+    def __iter__(self) -> Iterator[Feature]: ...
@@ -1,12 +1,31 @@
 from __future__ import unicode_literals
 
 from abc import ABCMeta
+from functools import wraps
 from itertools import chain
 
 import six
 
 
+def cached_str(method):
+    """
+    Cache the result of a ``__str__`` method on the object on first use.
+
+    Annotations and changes are treated as immutable: once an object has been converted to a string, changing its
+    attributes (or those of the annotations it contains) leaves the cached string out of date.
+    """
+    @wraps(method)
+    def __str__(self):
+        s = self._str
+        if s is None:
+            s = self._str = method(self)
+        return s
+    return __str__
+
+
 class Change(object):
+    _str = None
+
     def __init__(self, before=None, after=None, multiple=False):
         if before is None and after is None:
             raise ValueError()
@@ -17,15 +36,9 @@ class Change(object):
 
     @classmethod
     def parse(cls, gnomic_change_string):
-        from gnomic.grammar import GnomicParser
-        from gnomic.semantics import DefaultSemantics
+        from gnomic.semantics import parse
 
-        parser = GnomicParser()
-        semantics = DefaultSemantics()
-        return parser.parse(gnomic_change_string,
-                            whitespace='',
-                            semantics=semantics,
-                            rule_name='CHANGE')
+        return parse(gnomic_change_string, rule_name='CHANGE')
 
     def is_presence(self):
         if self.before is None and isinstance(self.after, Plasmid):
@@ -47,7 +60,8 @@ class Change(object):
     def __repr__(self):
         return '{}({})'.format(self.__class__.__name__,
                                ', '.join('{}={}'.format(key, repr(value))
-                                         for key, value in self.__dict__.items() if value is not None))
+                                         for key, value in self.__dict__.items()
+                                         if value is not None and not key.startswith('_')))
 
     def __mod__(self, locus):
         return self.__matmul__(locus)
@@ -63,6 +77,7 @@ class Change(object):
                       after=self.after,
                       multiple=self.multiple)
 
+    @cached_str
     def __str__(self):
         if self.after is None:
             return '-{!s}'.format(self.before)
@@ -83,6 +98,8 @@ class Present(Change):
 
 
 class Annotation(object):
+    _str = None
+
     def match(self, other, match_variants=True):
         return False
 
@@ -119,7 +136,8 @@ class Annotation(object):
     def __repr__(self):
         return '{}({})'.format(self.__class__.__name__,
                                ', '.join('{}={}'.format(key, repr(value))
-                                         for key, value in self.__dict__.items() if value is not None))
+                                         for key, value in self.__dict__.items()
+                                         if value is not None and not key.startswith('_')))
 
 
 class AtLocus(Annotation):
@@ -159,6 +177,7 @@ class AtLocus(Annotation):
                self.annotation != other.annotation or \
                self.locus != other.locus
 
+    @cached_str
     def __str__(self):
         return '{!s}@{!s}'.format(self.annotation, self.locus)
 
@@ -181,18 +200,12 @@ class Feature(Annotation):
 
     @classmethod
     def parse(cls, gnomic_feature_string):
-        from gnomic.grammar import GnomicParser
-        from gnomic.semantics import DefaultSemantics
+        from gnomic.semantics import parse
 
         if not isinstance(gnomic_feature_string, six.string_types):
             raise ValueError('"gnomic_feature_string" must a string, got {}'.format(repr(gnomic_feature_string)))
 
-        parser = GnomicParser()
-        semantics = DefaultSemantics()
-        return parser.parse(gnomic_feature_string,
-                            whitespace='',
-                            semantics=semantics,
-                            rule_name='FEATURE')
+        return parse(gnomic_feature_string, rule_name='FEATURE')
 
     def match(self, other, match_variants=True):
         if not isinstance(other, Feature):
@@ -253,6 +266,7 @@ class Feature(Annotation):
                    self.variant != other.variant
         return True
 
+    @cached_str
     def __str__(self):
         s = ''
         if self.organism:
@@ -308,6 +322,7 @@ class CompositeAnnotation(CompositeAnnotationBase):
                                                            else (annotation,)
                                                            for annotation in annotations)))
 
+    @cached_str
     def __str__(self):
         return '{{{}}}'.format(' '.join(map(str, self.annotations)))
 
@@ -362,6 +377,7 @@ class Fusion(CompositeAnnotationBase):
         else:
             return other in self.annotations
 
+    @cached_str
     def __str__(self):
         return ':'.join(map(str, self.annotations))
 
@@ -396,6 +412,7 @@ class Plasmid(CompositeAnnotationBase):
 
     __nonzero__ = __bool__
 
+    @cached_str
     def __str__(self):
         if self.annotations:
             return '({} {})'.format(self.name, ' '.join(map(str, self.annotations)))
@@ -407,6 +424,14 @@ class Accession(object):
         self.identifier = identifier
         self.database = database
 
+    @classmethod
+    def parse(cls, accession_string):
+        """
+        Parse an accession written as ``database:identifier`` or ``identifier``, the form used by :func:`repr`.
+        """
+        database, _, identifier = accession_string.rpartition(':')
+        return cls(identifier, database or None)
+
     def __eq__(self, other):
         return isinstance(other, Accession) and \
                self.database == other.database and \
@@ -1,6 +1,11 @@
 from abc import ABCMeta
 
-from typing import Tuple, Optional, Iterator, Sequence, Union, Iterable, Set
+from typing import Callable, Tuple, Optional, Iterator, Sequence, Union, Iterable, Set, TypeVar
+
+T = TypeVar('T')
+
+
+def cached_str(method: Callable[[T], str]) -> Callable[[T], str]: ...
 
 
 class Change(object):
@@ -125,3 +130,6 @@ class Accession(object):
     database: Optional[str]
 
     def __init__(self, identifier: str, database: str = None) -> None: ...
+
+    @classmethod
+    def parse(cls, accession_string: str) -> 'Accession': ...
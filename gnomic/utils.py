@@ -1,5 +1,5 @@
 from gnomic import Genotype
-from gnomic.formatters import BUILTIN_FORMATTERS
+from gnomic.formatters import BUILTIN_FORMATTERS, MultiFormatter
 
 
 def chain(*gnomic_strings, **kwargs):
@@ -22,6 +22,24 @@ def genotype_to_html(genotype):
     return BUILTIN_FORMATTERS['html'].format_genotype(genotype)
 
 
+_multi_formatters = {}
+
+
+def genotype_to_formats(genotype, formats=('gnomic', 'text', 'html')):
+    """
+    Format a genotype in several of the built-in formats at once, in a single pass over its changes.
+
+    :return: a dictionary with the formatted genotype for each format
+    """
+    formats = tuple(formats)
+    generation, formatter = _multi_formatters.get(formats, (None, None))
+    # formatters registered since the multi-formatter was created replace the ones it uses
+    if generation != BUILTIN_FORMATTERS.generation:
+        formatter = MultiFormatter({name: BUILTIN_FORMATTERS[name] for name in formats})
+        _multi_formatters[formats] = BUILTIN_FORMATTERS.generation, formatter
+    return formatter.format_genotype(genotype)
+
+
 def change_to_string(change):
     return BUILTIN_FORMATTERS['gnomic'].format_change(change)
 
@@ -1,10 +1,10 @@
-from typing import Any
+from typing import Any, Dict, Iterable
 
 from gnomic import Genotype
 from gnomic.types import Change, Feature
 
 
-def chain(*gnomic_strings: str, parent: Genotype = None, **kwargs: Any) -> Genotype: ...
+def chain(*gnomic_strings: str, parent: Genotype = None, detach: bool = False, **kwargs: Any) -> Genotype: ...
 
 
 def genotype_to_string(genotype: Genotype) -> str: ...
@@ -16,6 +16,9 @@ def genotype_to_text(genotype: Genotype) -> str: ...
 def genotype_to_html(genotype: Genotype) -> str: ...
 
 
+def genotype_to_formats(genotype: Genotype, formats: Iterable[str] = ('gnomic', 'text', 'html')) -> Dict[str, str]: ...
+
+
 def change_to_string(change: Change) -> str: ...
 
 
@@ -35,5 +35,7 @@ setup(
     ],
     extras_require={
         'docs': ['Sphinx', 'sphinx-rtd-theme'],
+        'numpy': ['numpy>=1.17'],
+        'scipy': ['numpy>=1.17', 'scipy'],
     }
 )
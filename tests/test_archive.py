@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import mmap
+
+import pytest
+
+from gnomic import Genotype
+from gnomic.archive import ArchiveError, ArchiveWriter, GenotypeArchive, write_archive
+
+GENOTYPES = {
+    'strain-a': '-geneA +Ec/geneB(x; y) siteC>geneD:geneE',
+    'strain-b': '(pX geneF) -geneA@siteG',
+    'strain-c': '',
+    'stämm-d': '+#ACC123 +{geneH, geneI} -gene.foo +geneJ#DB:ACC456',
+}
+
+
+@pytest.fixture
+def path(tmpdir):
+    path = str(tmpdir.join('strains.gnomic'))
+    write_archive(path, {strain: Genotype.parse(s) for strain, s in GENOTYPES.items()})
+    return path
+
+
+def test_random_access(path):
+    with GenotypeArchive(path) as archive:
+        assert len(archive) == 4
+        assert sorted(archive) == sorted(GENOTYPES)
+        for strain, s in GENOTYPES.items():
+            genotype = Genotype.parse(s)
+            assert strain in archive
+            assert archive[strain] == genotype
+            assert list(map(str, archive[strain].changes())) == list(map(str, genotype.changes()))
+            assert archive[strain].changes() == genotype.changes()
+
+        assert 'strain-z' not in archive
+        assert archive.get('strain-z') is None
+        with pytest.raises(KeyError):
+            archive['strain-z']
+        assert dict((strain, genotype.fingerprint()) for strain, genotype in archive.items()) == \
+            dict((strain, Genotype.parse(s).fingerprint()) for strain, s in GENOTYPES.items())
+
+
+def test_writer(tmpdir):
+    path = str(tmpdir.join('strains.gnomic'))
+    with ArchiveWriter(path) as writer:
+        writer.add(1, Genotype.parse('+geneA'))
+        with pytest.raises(ValueError):
+            writer.add('1', Genotype.parse('+geneB'))
+        assert len(writer) == 1
+
+    assert GenotypeArchive(path)[1] == Genotype.parse('+geneA')
+
+
+def test_net_changes_not_replayed(tmpdir):
+    genotype = None
+    for s in ('siteA>geneB', '+promoterX:siteA', 'siteA>geneC'):
+        genotype = Genotype.parse(s, parent=genotype)
+
+    path = str(tmpdir.join('strains.gnomic'))
+    write_archive(path, {'strain-a': genotype})
+    with GenotypeArchive(path) as archive:
+        assert list(map(str, archive['strain-a'].changes())) == ['+promoterX:siteA', 'siteA>geneC']
+        assert [restored.fingerprint() for _, restored in archive.items()] == [genotype.fingerprint()]
+
+
+def test_invalid_file(tmpdir):
+    path = tmpdir.join('invalid')
+    path.write(b'not an archive' * 10, mode='wb')
+    with pytest.raises(ArchiveError):
+        GenotypeArchive(str(path))
+
+    path.write(b'', mode='wb')
+    with pytest.raises(ArchiveError):
+        GenotypeArchive(str(path))
+
+
+def test_invalid_file_closed(tmpdir, monkeypatch):
+    maps, original = [], mmap.mmap
+
+    def track(*args, **kwargs):
+        maps.append(original(*args, **kwargs))
+        return maps[-1]
+
+    monkeypatch.setattr(mmap, 'mmap', track)
+    path = tmpdir.join('invalid')
+    path.write(b'not an archive' * 10, mode='wb')
+    with pytest.raises(ArchiveError):
+        GenotypeArchive(str(path))
+    assert [m.closed for m in maps] == [True]
@@ -0,0 +1,87 @@
+import pytest
+
+from gnomic import Genotype
+from gnomic.types import Accession, Change, Feature, Plasmid
+
+np = pytest.importorskip('numpy')
+
+from gnomic.columnar import FEATURE, FUSION, NODE_TYPES, PLASMID, GenotypeTable, StringDictionary  # noqa: E402
+from gnomic.distance import DELETION, INSERTION  # noqa: E402
+
+GENOTYPES = {
+    'a': '-geneA +Ec/geneB(x; y) siteC>>geneD:geneE',
+    'b': '(pX geneF) -geneA@siteG',
+    'c': '',
+    'd': '+#ACC123 +{geneH, geneI} +geneJ#DB:ACC456',
+}
+
+
+@pytest.fixture
+def genotypes():
+    return [(strain, Genotype.parse(GENOTYPES[strain])) for strain in sorted(GENOTYPES)]
+
+
+def test_string_dictionary():
+    dictionary = StringDictionary.from_strings(['geneA', u'gène', ''])
+    assert list(dictionary) == ['geneA', u'gène', '']
+    assert dictionary.code(u'gène') == 1
+    assert dictionary.code('geneZ') == -1
+    assert dictionary.get(-1) is None
+
+
+def test_columns(genotypes):
+    table = GenotypeTable.from_genotypes(genotypes)
+    assert len(table) == 8
+    assert table.strains == ['a', 'b', 'c', 'd']
+    assert table.change_strain.tolist() == [0, 0, 0, 1, 1, 3, 3, 3]
+    assert table.change_kind.tolist().count(table.kind_code(INSERTION)) == 5
+    assert table.change_multiple.tolist() == [change.multiple for _, genotype in genotypes
+                                              for change in genotype.changes()]
+
+    nodes = [NODE_TYPES[node] for node in table.node]
+    assert nodes.count(FUSION) == 1 and nodes.count(PLASMID) == 1
+
+    row = table.change_after[1]
+    assert table.dictionaries['organism'][table.organism[row]] == 'Ec'
+    assert [table.dictionaries['variant'][code] for code in table._list('variant', row)] == ['x', 'y']
+
+    deletions = np.flatnonzero(table.change_kind == table.kind_code(DELETION))
+    assert table.change(deletions[0]) == Change(before=Feature('geneA'))
+    assert table.annotation(table.change_after[3]) == Plasmid('pX')
+    assert table.annotation(table.change_after[7]).accession == Accession('ACC456', 'DB')
+    assert [NODE_TYPES[table.node[child]] for child in table._list('children', table.change_after[3])] == [FEATURE]
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_save_load(genotypes, tmpdir, mmap):
+    path = str(tmpdir.join('table'))
+    GenotypeTable.from_genotypes(genotypes).save(path)
+    table = GenotypeTable.load(path, mmap=mmap)
+
+    if mmap:
+        assert isinstance(table.node, np.memmap)
+    for strain, genotype in genotypes:
+        assert table.genotype(strain) == genotype
+        assert list(map(str, table.genotype(strain).changes())) == list(map(str, genotype.changes()))
+    assert [(strain, genotype.fingerprint()) for strain, genotype in table.genotypes()] == \
+        [(strain, genotype.fingerprint()) for strain, genotype in genotypes]
+    assert len(table.rows('c')) == 0
+    with pytest.raises(KeyError):
+        table.genotype('z')
+    with pytest.raises(KeyError):
+        table.rows('z')
+
+
+def test_duplicate_strains(genotypes):
+    with pytest.raises(ValueError):
+        GenotypeTable.from_genotypes(genotypes + [('a', Genotype.parse('+geneZ'))])
+
+
+def test_net_changes_not_replayed():
+    genotype = Genotype.parse('siteA>geneC', parent=Genotype.parse('+promoterX:siteA', parent=Genotype.parse(
+        'siteA>geneB')))
+    table = GenotypeTable.from_genotypes([('a', genotype)])
+
+    assert list(map(str, table.genotype('a').changes())) == ['+promoterX:siteA', 'siteA>geneC']
+    assert table.genotype('a').fingerprint() == genotype.fingerprint()
+    assert [restored.fingerprint() for _, restored in table.genotypes()] == [genotype.fingerprint()]
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import pytest
+
+from gnomic import Genotype
+from gnomic.dispatch import TypeDispatch
+from gnomic.formatters import GnomicFormatter, HTMLFormatter, TextFormatter
+from gnomic.index import INSERTED, GenotypeIndex, annotation_members, walk
+from gnomic.types import Annotation, CompositeAnnotation, CompositeAnnotationBase, Feature, Fusion
+
+
+class Phene(Feature):
+    pass
+
+
+class Operon(Annotation):
+    def __init__(self, name, *genes):
+        self.name = name
+        self.genes = genes
+
+    def __str__(self):
+        return '[{}]'.format(self.name)
+
+
+def test_type_dispatch():
+    dispatch = TypeDispatch({Feature: 'feature'})
+    assert dispatch.dispatch(Feature) == 'feature'
+    assert dispatch.dispatch(Phene) == 'feature'
+    assert dispatch.dispatch(Fusion) is None
+    assert Fusion not in dispatch
+
+    @dispatch.register(CompositeAnnotationBase)
+    def composite(annotation):
+        pass
+
+    assert dispatch.dispatch(Fusion) is composite
+    assert dispatch.dispatch(CompositeAnnotation) is composite
+
+    dispatch.register(Phene, 'phene')
+    assert dispatch.dispatch(Phene) == 'phene'
+    assert dispatch.copy().dispatch(Phene) == 'phene'
+
+
+def test_formatter_register():
+    class OperonFormatter(TextFormatter):
+        def format_operon(self, operon):
+            return 'operon {}'.format(operon.name)
+
+    class HTMLOperonFormatter(HTMLFormatter):
+        pass
+
+    assert HTMLOperonFormatter().format_annotation(Phene('growth')) == HTMLFormatter().format_feature(Phene('growth'))
+
+    OperonFormatter.register(Operon, 'format_operon')
+    HTMLOperonFormatter.register(Operon, lambda formatter, operon: '<b>{}</b>'.format(operon.name))
+    HTMLOperonFormatter.register(Phene, lambda formatter, phene: '<i>{}</i>'.format(phene.name))
+
+    assert OperonFormatter().format_annotation(Operon('lac')) == 'operon lac'
+    assert HTMLOperonFormatter().format_annotation(Operon('lac')) == '<b>lac</b>'
+    assert HTMLOperonFormatter().format_annotation(Phene('growth')) == '<i>growth</i>'
+    assert HTMLOperonFormatter().format_annotation(Feature('geneA')) == HTMLFormatter().format_feature(Feature('geneA'))
+    assert TextFormatter().format_annotation(Phene('growth')) == 'growth'
+
+    for formatter in (GnomicFormatter(), TextFormatter(), HTMLFormatter()):
+        with pytest.raises(NotImplementedError):
+            formatter.format_annotation(Operon('lac'))
+
+
+def test_walk_register():
+    operon = Operon('lac', Feature('lacZ'), Feature('lacY'))
+    assert list(walk(operon)) == [operon]
+
+    annotation_members.register(Operon, lambda operon: operon.genes)
+    try:
+        assert list(walk(operon)) == [operon, Feature('lacZ'), Feature('lacY')]
+        index = GenotypeIndex({1: Genotype([+operon])})
+        assert index.find(INSERTED, Feature('lacY')) == {1}
+    finally:
+        annotation_members.unregister(Operon)
+    assert list(walk(operon)) == [operon]
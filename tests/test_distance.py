@@ -0,0 +1,69 @@
+import itertools
+
+import pytest
+
+from gnomic import Genotype
+
+np = pytest.importorskip('numpy')
+
+from gnomic.distance import ChangeBitsets, DELETION, INSERTION, REPLACEMENT, change_kind, \
+    nearest_neighbours, pairwise_distances  # noqa: E402
+
+GENOTYPES = ('+geneA -geneB', '+geneA', '-geneB +geneA +geneC', '', 'siteD>geneE +geneA', '+{geneF, geneG}',
+             '+{geneG, geneF} siteD>geneE')
+
+
+@pytest.fixture
+def genotypes():
+    return [Genotype.parse(s) for s in GENOTYPES]
+
+
+def brute_force(genotypes, weights=None):
+    weights = weights or {}
+    distances = []
+    for a, b in itertools.combinations(genotypes, 2):
+        difference = set(map(str, a.canonical_changes())) ^ set(map(str, b.canonical_changes()))
+        distances.append(sum(weights.get(change_kind(Genotype.parse(c).changes()[0]), 1) for c in difference))
+    return distances
+
+
+def test_change_bitsets(genotypes):
+    bitsets = ChangeBitsets(genotypes)
+    assert len(bitsets) == len(genotypes)
+    assert len(bitsets.vocabularies[INSERTION]) == 3
+    assert len(bitsets.vocabularies[DELETION]) == 1
+    assert len(bitsets.vocabularies[REPLACEMENT]) == 1
+
+
+def test_pairwise_distances(genotypes):
+    assert pairwise_distances(genotypes).tolist() == brute_force(genotypes)
+
+
+def test_weighted_pairwise_distances(genotypes):
+    weights = {INSERTION: 0.5, DELETION: 2, REPLACEMENT: 3}
+    assert pairwise_distances(genotypes, weights=weights).tolist() == brute_force(genotypes, weights)
+
+
+def test_pairwise_distances_workers(genotypes):
+    genotypes = genotypes * 5
+    assert pairwise_distances(genotypes, workers=2).tolist() == pairwise_distances(genotypes).tolist()
+
+
+def test_pairwise_distances_empty():
+    assert pairwise_distances([]).tolist() == []
+    assert pairwise_distances([Genotype.parse('+geneA')]).tolist() == []
+
+
+def test_nearest_neighbours(genotypes):
+    indices, distances = nearest_neighbours(genotypes, k=2)
+    assert indices.shape == distances.shape == (len(genotypes), 2)
+    assert indices[0].tolist() == [1, 2]
+    assert distances[0].tolist() == [1, 1]
+    assert indices[5].tolist()[0] in (3, 6)
+    assert (indices != np.arange(len(genotypes))[:, None]).all()
+
+    square = np.zeros((len(genotypes),) * 2)
+    square[np.triu_indices(len(genotypes), 1)] = pairwise_distances(genotypes)
+    square += square.T
+    np.fill_diagonal(square, np.inf)
+    assert (distances == np.sort(square, axis=1)[:, :2]).all()
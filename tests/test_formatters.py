@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+import io
+
 import pytest
 
 from gnomic.formatters import GnomicFormatter, TextFormatter, HTMLFormatter
@@ -33,6 +35,21 @@ def test_feature_gnomic_format(gnomic_formatter):
     assert gnomic_formatter.format_annotation(Feature.parse('foo(mutant; variant)')) == 'foo(mutant; variant)'
 
 
+def test_feature_gnomic_format_overrides():
+    class BracketFormatter(GnomicFormatter):
+        def format_variant(self, variant):
+            return '[{}]'.format(','.join(variant))
+
+    class AccessionFormatter(GnomicFormatter):
+        @staticmethod
+        def format_accession(accession):
+            return '<{}>'.format(accession.identifier)
+
+    assert BracketFormatter().format_change(Change(after=Feature.parse('geneA(x; y)'))) == '+geneA[x,y]'
+    assert AccessionFormatter().format_feature(Feature.parse('geneA#DB:ACC1')) == 'geneA<ACC1>'
+    assert GnomicFormatter().format_feature(Feature.parse('geneA(x; y)')) == 'geneA(x; y)'
+
+
 def test_change_gnomic_format(gnomic_formatter):
     assert gnomic_formatter.format_change(Change(before=Feature('foo'))) == '-foo'
     assert gnomic_formatter.format_change(Change(after=Feature('foo'))) == '+foo'
@@ -119,3 +136,234 @@ def test_feature_html_format_escape_html(html_formatter):
     assert html_formatter.format_feature(Feature('geneB&')) == '<span class="gnomic-feature">geneB&amp;</span>'
     assert html_formatter.format_feature(Feature('geneB<')) == '<span class="gnomic-feature">geneB&lt;</span>'
     assert html_formatter.format_feature(Feature('geneB>')) == '<span class="gnomic-feature">geneB&gt;</span>'
+    assert html_formatter.format_feature(Feature('geneB', variant=('a<b', 'c&d'))) == \
+        '<span class="gnomic-feature">geneB<sup>a&lt;b; c&amp;d</sup></span>'
+    assert html_formatter.format_plasmid(Plasmid('p&', annotations=(Feature('x'),))) == \
+        '<span class="gnomic-plasmid">(<span class="gnomic-plasmid-name">p&amp;</span> ' \
+        '<span class="gnomic-feature">x</span>)</span>'
+
+
+def test_escape_html():
+    from gnomic.formatters import escape_html
+
+    assert escape_html('geneA') == 'geneA'
+    assert escape_html('<a & "b">') == '&lt;a &amp; "b"&gt;'
+    assert escape_html('<a & "b">', quote=True) == '&lt;a &amp; &quot;b&quot;&gt;'
+    assert escape_html('"b"', quote=True) == '&quot;b&quot;'
+    assert escape_html('"b"') == '"b"'
+
+
+@pytest.mark.parametrize('formatter', [GnomicFormatter(), TextFormatter(), HTMLFormatter()])
+def test_write_genotype(formatter):
+    genotypes = [Genotype.parse('-geneA +Ec/geneB(x) siteC>>promoter.geneD:geneE (pX geneF)'),
+                 Genotype.parse(''),
+                 Genotype.parse('-geneA@locusB')]
+
+    fp = io.StringIO()
+    formatter.write_genotype(genotypes[0], fp)
+    assert fp.getvalue() == formatter.format_genotype(genotypes[0])
+
+    fp = io.StringIO()
+    formatter.write_many(genotypes, fp)
+    assert fp.getvalue() == ''.join(formatter.format_genotype(genotype) + '\n' for genotype in genotypes)
+
+
+@pytest.mark.parametrize('formatter_class', [GnomicFormatter, TextFormatter, HTMLFormatter])
+def test_annotation_cache(formatter_class):
+    genotype = Genotype.parse('-geneA +Ec/geneB(x) siteC>>promoter.geneD:geneE (pX geneF)')
+    formatter = formatter_class(cache_size=3)
+    assert formatter.format_genotype(genotype) == formatter_class().format_genotype(genotype)
+    assert formatter.cache_info().currsize == 3
+
+    formatter.cache_clear()
+    feature = Feature('geneA')
+    assert formatter.format_annotation(feature) == formatter.format_annotation(feature)
+    assert formatter.cache_info() == (1, 1, 3, 1)
+
+    # identity, not equality
+    formatter.format_annotation(Feature('geneA'))
+    assert formatter.cache_info() == (1, 2, 3, 2)
+    assert formatter_class().cache_info() == (0, 0, 0, 0)
+
+
+def test_format_multiple():
+    from gnomic.formatters import MultiFormatter, format_multiple
+    from gnomic.utils import genotype_to_formats, genotype_to_html, genotype_to_string, genotype_to_text
+
+    class UpperFormatter(TextFormatter):
+        def format_change(self, change):
+            return super(UpperFormatter, self).format_change(change).upper()
+
+    genotype = Genotype.parse('-geneA +Ec/geneB(x) siteC>>promoter.geneD:geneE (pX geneF) foo>foo(x) -geneA@locusB')
+    assert genotype_to_formats(genotype) == {
+        'gnomic': genotype_to_string(genotype),
+        'text': genotype_to_text(genotype),
+        'html': genotype_to_html(genotype),
+    }
+    assert genotype_to_formats(genotype, ['text']) == {'text': genotype_to_text(genotype)}
+
+    shared = MultiFormatter({'gnomic': GnomicFormatter(), 'text': TextFormatter(), 'html': HTMLFormatter()})
+    assert sorted(sorted(key for key, _ in group) for _, group in shared._groups) == [['gnomic', 'text'], ['html']]
+
+    formatters = {'upper': UpperFormatter(), 'text': TextFormatter(), 'cached': GnomicFormatter(cache_size=10)}
+    assert format_multiple(genotype, formatters) == {key: formatter.format_genotype(genotype)
+                                                     for key, formatter in formatters.items()}
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_format_many(workers):
+    from gnomic.formatters import format_many, iter_format_many
+
+    genotypes = [Genotype.parse(s) for s in ['+geneA', '-geneB +geneC', 'siteD>(pE geneF)', '+geneC -geneB', '+geneA']]
+    expected = [HTMLFormatter().format_genotype(genotype) for genotype in genotypes]
+
+    formatted = format_many(genotypes, workers=workers, chunk_size=2)
+    assert formatted == expected
+    assert format_many(genotypes, 'gnomic', workers=workers, chunk_size=2)[2] == 'siteD>(pE geneF)'
+    assert format_many(genotypes, TextFormatter(), workers=workers)[1] == 'ΔgeneB geneC'
+    assert format_many([], workers=workers) == []
+
+    assert list(iter_format_many(genotypes, workers=workers, chunk_size=1)) == list(enumerate(formatted))
+    assert sorted(iter_format_many(genotypes, workers=workers, ordered=False, chunk_size=1)) == \
+        list(enumerate(formatted))
+
+    with pytest.raises(ValueError):
+        format_many(genotypes, 'pdf')
+
+
+def test_format_genotype_override():
+    from gnomic.formatters import format_many, format_multiple
+
+    class LineageFormatter(GnomicFormatter):
+        def format_genotype(self, genotype):
+            formatted = super(LineageFormatter, self).format_genotype(genotype)
+            if genotype.parent is not None:
+                formatted = '{} | {}'.format(self.format_genotype(genotype.parent), formatted)
+            return formatted
+
+    parent = Genotype.parse('+geneA')
+    genotypes = [Genotype.parse('-geneB', parent=parent), Genotype.parse('+geneA -geneB'), parent]
+    formatter = LineageFormatter()
+    expected = ['+geneA | +geneA -geneB', '+geneA -geneB', '+geneA']
+
+    assert [formatter.format_genotype(genotype) for genotype in genotypes] == expected
+    assert format_many(genotypes, formatter, workers=2, chunk_size=1) == expected
+    assert format_multiple(genotypes[0], {'lineage': formatter, 'gnomic': GnomicFormatter()}) == {
+        'lineage': expected[0], 'gnomic': '+geneA -geneB'}
+
+    fp = io.StringIO()
+    formatter.write_genotype(genotypes[0], fp)
+    assert fp.getvalue() == expected[0]
+
+
+def test_summary_formatter():
+    from gnomic.formatters import BUILTIN_FORMATTERS, SummaryFormatter, format_multiple
+
+    genotype = Genotype.parse('-geneA1 -geneA2 -geneA3 -geneA5 -Ec/geneB1 -Ec/geneB2 '
+                              '+Ec/geneC siteE>geneF -geneA4 -geneX')
+    formatter = SummaryFormatter()
+    groups = formatter.summarize(genotype.changes())
+    assert [group[:3] for group in groups] == [('deletion', None, 6), ('deletion', 'Ec', 2), ('insertion', 'Ec', 1),
+                                               ('replacement', None, 1)]
+    assert groups[0].entries == ['<span class="gnomic-run">Δ<span class="gnomic-feature">geneA1</span>…'
+                                 '<span class="gnomic-feature">geneA5</span> (5)</span>',
+                                 'Δ<span class="gnomic-feature">geneX</span>']
+    assert groups[1].entries == ['Δ<span class="gnomic-feature">Ec/geneB1</span>',
+                                 'Δ<span class="gnomic-feature">Ec/geneB2</span>']
+    assert formatter.summarize(genotype.changes(), details=False)[0].entries is None
+
+    html = formatter.format_genotype(genotype)
+    assert html.startswith('<div class="gnomic-summary"><span class="gnomic-summary-total">10 changes</span>'
+                           '<details class="gnomic-summary-group" data-kind="deletion"><summary>6 deletions</summary>')
+    assert '<summary>2 deletions in <span class="gnomic-organism">Ec</span></summary>' in html
+    assert '<summary>1 insertion in <span class="gnomic-organism">Ec</span></summary>' in html
+    assert genotype.format('summary') == html == BUILTIN_FORMATTERS['summary'].format_genotype(genotype)
+
+    counts = SummaryFormatter(details=False).format_genotype(genotype)
+    assert '<details' not in counts and 'geneA1' not in counts
+    assert '<span class="gnomic-summary-group" data-kind="deletion" data-organism="Ec">2 deletions in ' in counts
+    assert formatter.format_details(genotype, 'deletion', 'Ec') == ' '.join(groups[1].entries)
+    assert formatter.format_details(genotype, 'insertion') == ''
+
+    at_locus = formatter.summarize(Genotype.parse('-Ec/geneA@locusB -Ec/geneC').changes())
+    assert [group[:3] for group in at_locus] == [('deletion', 'Ec', 2)]
+
+    assert SummaryFormatter(min_run=6).summarize(genotype.changes())[0].entries[0] == \
+        'Δ<span class="gnomic-feature">geneA1</span>'
+
+    output = io.StringIO()
+    formatter.write_genotype(genotype, output)
+    assert output.getvalue() == html
+    assert format_multiple(genotype, {'summary': formatter, 'html': HTMLFormatter()}) == {
+        'summary': html, 'html': HTMLFormatter().format_genotype(genotype)}
+
+
+def test_formatter_registry(monkeypatch):
+    from gnomic import formatters
+    from gnomic.formatters import BUILTIN_FORMATTERS, FormatterRegistry
+
+    class EntryPoint(object):
+        loaded = 0
+
+        def __init__(self, name, value):
+            self.name = name
+            self.value = value
+
+        def load(self):
+            EntryPoint.loaded += 1
+            return self.value
+
+    class UpperFormatter(TextFormatter):
+        def format_change(self, change):
+            return super(UpperFormatter, self).format_change(change).upper()
+
+    monkeypatch.setattr(formatters, '_entry_points', lambda group: [EntryPoint('upper', UpperFormatter),
+                                                                    EntryPoint('text', UpperFormatter)])
+
+    registry = FormatterRegistry({'gnomic': GnomicFormatter, 'html': 'gnomic.formatters:HTMLFormatter'})
+    assert registry['gnomic'] is registry['gnomic']
+    assert isinstance(registry['html'], HTMLFormatter)
+    assert registry._entry_points is None
+    assert EntryPoint.loaded == 0
+
+    assert 'upper' in registry and 'pdf' not in registry
+    assert EntryPoint.loaded == 0
+    assert list(registry) == ['gnomic', 'html', 'upper', 'text']
+    assert registry['upper'].format_genotype(Genotype.parse('-geneA')) == 'ΔGENEA'
+    assert EntryPoint.loaded == 1
+    with pytest.raises(KeyError):
+        registry['pdf']
+
+    text = TextFormatter()
+    registry.register('text', text)
+    assert registry['text'] is text and len(registry) == 4
+
+    registry['upper'] = GnomicFormatter
+    assert isinstance(registry['upper'], GnomicFormatter)
+    del registry['gnomic']
+    assert 'gnomic' not in registry
+    with pytest.raises(KeyError):
+        del registry['gnomic']
+
+    assert isinstance(BUILTIN_FORMATTERS['summary'], formatters.SummaryFormatter)
+    assert 'html' in BUILTIN_FORMATTERS
+
+
+def test_registry_invalidates_formats():
+    from gnomic.formatters import BUILTIN_FORMATTERS
+    from gnomic.utils import genotype_to_formats
+
+    class UpperFormatter(TextFormatter):
+        def format_change(self, change):
+            return super(UpperFormatter, self).format_change(change).upper()
+
+    genotype = Genotype.parse('-geneA')
+    assert genotype_to_formats(genotype, ['text']) == {'text': 'ΔgeneA'}
+
+    text = BUILTIN_FORMATTERS['text']
+    BUILTIN_FORMATTERS['text'] = UpperFormatter
+    try:
+        assert genotype_to_formats(genotype, ['text']) == {'text': 'ΔGENEA'}
+    finally:
+        BUILTIN_FORMATTERS['text'] = text
+    assert genotype_to_formats(genotype, ['text']) == {'text': 'ΔgeneA'}
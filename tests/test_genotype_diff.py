@@ -0,0 +1,77 @@
+import pytest
+
+from gnomic import Genotype
+from gnomic.types import Change
+
+
+def assert_diff(source, target, expected):
+    source, target = Genotype.parse(source), Genotype.parse(target)
+    changes = source.diff(target)
+
+    assert set(changes) == set(Genotype._parse_gnomic_string(expected))
+    assert set(Genotype(changes, parent=source).changes()) == set(target.changes())
+
+
+def test_diff_identical():
+    assert Genotype.parse('+geneA -geneB').diff(Genotype.parse('-geneB +geneA')) == []
+
+
+def test_diff_insertions_and_deletions():
+    assert_diff('+geneA -geneB', '+geneC -geneB', '-geneA +geneC')
+    assert_diff('+geneA -geneB', '+geneA', '+geneB')
+    assert_diff('', '-geneA +geneB(x)', '-geneA +geneB(x)')
+
+
+def test_diff_replacements():
+    assert_diff('siteA>geneB', 'siteA>geneC', 'siteA>geneC')
+    assert_diff('siteA>geneB', '-siteA', '-geneB')
+    assert_diff('-siteA', 'siteA>geneB', 'siteA>geneB')
+    assert_diff('siteA>geneB', '', 'geneB>siteA')
+
+
+def test_diff_fusions():
+    assert_diff('+geneA:geneB', '+geneA:geneC', '-geneA:geneB +geneA:geneC')
+    assert_diff('siteA>geneA:geneB', 'siteA>geneA:geneC', 'siteA>geneA:geneC')
+    assert_diff('siteA>geneA:geneB', '', 'geneA:geneB>siteA')
+
+
+def test_diff_plasmids():
+    assert_diff('(pA) (pB)', '(pB) -(pC)', '-(pA) -(pC)')
+    assert_diff('siteA>(pA geneB)', '', '-(pA geneB) +siteA')
+
+
+def test_diff_plasmid_contents():
+    source, target = Genotype.parse('(pA)'), Genotype.parse('(pA geneB)')
+    changes = source.diff(target)
+
+    assert [str(change) for change in changes] == ['-(pA)', '+(pA geneB)']
+    assert [str(change) for change in Genotype(changes, parent=source).changes()] == ['+(pA geneB)']
+
+
+def test_diff_at_locus():
+    assert_diff('geneA@locusX>geneB', 'geneA@locusX>geneC', 'geneA@locusX>geneC')
+    assert_diff('geneA@locusX>geneB', '', 'geneB>geneA')
+    assert_diff('', '-geneA@locusX', '-geneA@locusX')
+
+
+def test_diff_irreversible():
+    with pytest.raises(ValueError):
+        Genotype.parse('-geneA@locusX').diff(Genotype.parse(''))
+    with pytest.raises(ValueError):
+        Genotype.parse('d(y):c(y)>a b>a#A2').diff(Genotype.parse(''))
+
+
+def test_diff_lineage():
+    parent = Genotype.parse('+geneA siteB>geneC')
+    first = Genotype.parse('-geneD', parent=parent)
+    second = Genotype.parse('siteB>geneE', parent=parent)
+
+    assert first.diff(second) == [Change.parse('+geneD'), Change.parse('siteB>geneE')]
+
+
+def test_diff_many():
+    reference = Genotype.parse('+geneA -geneB')
+    strains = [Genotype.parse('+geneA -geneB'), Genotype.parse('+geneA'), Genotype.parse('+geneC -geneB')]
+
+    assert reference.diff_many(strains) == [reference.diff(strain) for strain in strains]
+    assert [len(changes) for changes in reference.diff_many(strains)] == [0, 1, 2]
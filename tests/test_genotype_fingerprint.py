@@ -0,0 +1,54 @@
+from gnomic import Genotype
+from gnomic.genotype import canonicalize, GenotypeState
+from gnomic.types import Change, CompositeAnnotation, Feature as F, Fusion, Plasmid
+
+
+def test_canonicalize():
+    assert canonicalize(F('a')) == F('a')
+    assert canonicalize(Fusion(F('b'), F('a'))).annotations == (F('b'), F('a'))
+    assert canonicalize(CompositeAnnotation(F('b'), F('a'))).annotations == (F('a'), F('b'))
+    assert canonicalize(Plasmid('p', [F('b'), F('a')])).annotations == (F('a'), F('b'))
+    assert canonicalize(CompositeAnnotation(F('b'), F('a')) % F('c')).annotation.annotations == (F('a'), F('b'))
+
+
+def test_canonical_changes():
+    state = GenotypeState()
+    state.apply([+F('b'), -F('a'), F('c') > CompositeAnnotation(F('e'), F('d'))])
+
+    assert state.canonical_changes == (
+        Change(None, F('b')),
+        Change(F('a'), None),
+        Change(F('c'), CompositeAnnotation(F('d'), F('e'))),
+    )
+
+
+def test_fingerprint_ignores_order_and_history():
+    a = Genotype.parse('+geneA -geneB +{geneC, geneD} (pA geneE geneF)')
+    b = Genotype.parse('(pA geneF geneE) +{geneD, geneC} -geneB +geneX +geneA -geneX')
+    c = Genotype.parse('-geneB +{geneC, geneD}', parent=Genotype.parse('+geneA (pA geneE geneF)'))
+
+    assert a.fingerprint() == b.fingerprint() == c.fingerprint()
+    assert a == b == c
+    assert len({a, b, c}) == 1
+    assert {a: 'strain-1'}[c] == 'strain-1'
+
+
+def test_fingerprint_distinguishes_genotypes():
+    genotypes = [Genotype.parse(s) for s in ('', '+geneA', '-geneA', 'geneA>geneB', 'geneA>>geneB', '+geneA:geneB',
+                                             '+geneB:geneA', '(pA)', '(pA geneA)', '+geneA(x)', '-geneA@locus')]
+
+    assert len({genotype.fingerprint() for genotype in genotypes}) == len(genotypes) - 1  # > and >> are the same
+    assert Genotype.parse('+geneA') != Genotype.parse('+geneB')
+
+
+def test_fingerprint_is_stable():
+    assert Genotype.parse('+geneA -geneB').fingerprint() == '2503dba5193640d7d7d1cf4cc21c824d03788191'
+
+
+def test_fingerprint_reset_on_change():
+    genotype = Genotype.parse('+geneA')
+    fingerprint = genotype.fingerprint()
+    genotype.extend([-F('geneA')])
+
+    assert genotype.fingerprint() != fingerprint
+    assert genotype.fingerprint() == Genotype.parse('').fingerprint()
@@ -0,0 +1,61 @@
+import pytest
+
+from gnomic import Genotype
+from gnomic.index import GenotypeIndex, INSERTED, REMOVED, REPLACED, REPLACEMENT, LOCUS
+from gnomic.types import Feature, Fusion, Plasmid
+
+
+@pytest.fixture
+def index():
+    return GenotypeIndex({
+        1: Genotype.parse('-geneA (pX)'),
+        2: Genotype.parse('-geneA +geneB(x)'),
+        3: Genotype.parse('siteC>geneB:geneD (pX geneE)'),
+        4: Genotype.parse('-geneF@locusG +Ec/geneB'),
+    })
+
+
+def test_find(index):
+    assert index.find(REMOVED, Feature('geneA')) == {1, 2}
+    assert index.find(INSERTED, Plasmid('pX')) == {1, 3}
+    assert index.find(INSERTED, Feature('geneB')) == {2, 4}
+    assert index.find(INSERTED, Feature.parse('geneB(x)')) == {2}
+    assert index.find(INSERTED, Feature.parse('geneB(y)'), match_variants=False) == {2, 4}
+    assert index.find(INSERTED, Feature.parse('Ec/geneB')) == {4}
+    assert index.find(INSERTED, Feature('geneE')) == {3}
+    assert index.find(REPLACED, Feature('siteC')) == {3}
+    assert index.find(REPLACEMENT, Feature('geneB')) == {3}
+    assert index.find(REPLACEMENT, Fusion(Feature('geneB'), Feature('geneD'))) == {3}
+    assert index.find(REMOVED, Feature('geneF')) == {4}
+    assert index.find(LOCUS, Feature('locusG')) == {4}
+    assert index.find(REMOVED, Feature('geneX')) == set()
+
+
+def test_search(index):
+    assert index.search(all_of=[(REMOVED, Feature('geneA')), (INSERTED, Plasmid('pX'))]) == {1}
+    assert index.search(any_of=[(REMOVED, Feature('geneA')), (INSERTED, Plasmid('pX'))]) == {1, 2, 3}
+    assert index.search(none_of=[(REMOVED, Feature('geneA'))]) == {3, 4}
+    assert index.search(all_of=[(INSERTED, Feature('geneB'))], none_of=[(INSERTED, Feature.parse('geneB(x)'))]) == {4}
+    assert index.search() == {1, 2, 3, 4}
+
+
+def test_add_and_remove(index):
+    index.remove(1)
+    assert 1 not in index
+    assert index.find(INSERTED, Plasmid('pX')) == {3}
+
+    index.add(5, Genotype.parse('(pX) -geneA'))
+    assert len(index) == 4
+    assert index.search(all_of=[(REMOVED, Feature('geneA')), (INSERTED, Plasmid('pX'))]) == {5}
+
+    index.add(5, Genotype.parse('+geneZ'))
+    assert index.find(INSERTED, Plasmid('pX')) == {3}
+    assert index.find(INSERTED, Feature('geneZ')) == {5}
+
+    for genotype_id in (2, 3, 4, 5):
+        index.remove(genotype_id)
+    assert len(index) == 0
+    assert index._interned == {}
+
+    with pytest.raises(KeyError):
+        index.remove(1)
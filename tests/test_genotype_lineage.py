@@ -0,0 +1,52 @@
+import gc
+
+from gnomic import Genotype
+from gnomic.types import Feature
+from gnomic.utils import chain
+
+
+def test_detach():
+    parent = Genotype.parse('+geneA')
+    genotype = Genotype.parse('-geneB', parent=parent)
+    changes = genotype.changes()
+
+    assert genotype.detach() is genotype
+    assert genotype.changes() == changes
+    assert genotype.parent_fingerprint == parent.fingerprint()
+    assert genotype.parent is parent
+
+    del parent
+    gc.collect()
+
+    assert genotype.parent is None
+    assert genotype.is_inserted(Feature('geneA')) is True
+
+
+def test_detach_with_loader():
+    bank = {}
+    parent = Genotype.parse('+geneA')
+    bank[parent.fingerprint()] = parent.format('gnomic')
+
+    genotype = Genotype.parse('-geneB', parent=parent, detach=True)
+    genotype.detach(loader=lambda fingerprint: Genotype.parse(bank[fingerprint]))
+    del parent
+    gc.collect()
+
+    assert genotype.parent == Genotype.parse('+geneA')
+    assert genotype.parent_fingerprint == genotype.parent.fingerprint()
+
+
+def test_detach_without_parent():
+    genotype = Genotype.parse('+geneA', detach=True)
+
+    assert genotype.parent is None
+    assert genotype.parent_fingerprint is None
+
+
+def test_chain_detach():
+    genotype = chain('+geneA', '-geneB', '+geneC', detach=True)
+    gc.collect()
+
+    assert genotype.parent is None
+    assert genotype.parent_fingerprint == Genotype.parse('+geneA -geneB').fingerprint()
+    assert genotype == chain('+geneA', '-geneB', '+geneC')
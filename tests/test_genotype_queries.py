@@ -0,0 +1,78 @@
+from gnomic import Genotype
+from gnomic.index import FeatureIndex, INSERTED, LOCUS, REMOVED
+from gnomic.types import Feature, Fusion, Plasmid
+
+
+def test_is_inserted():
+    genotype = Genotype.parse('+geneA(x) +Ec/geneB siteA>P.promoterC:geneD')
+    assert genotype.is_inserted(Feature('geneA')) is True
+    assert genotype.is_inserted(Feature.parse('geneA(x)')) is True
+    assert genotype.is_inserted(Feature.parse('geneA(y)')) is False
+    assert genotype.is_inserted(Feature.parse('geneA(y)'), match_variants=False) is True
+    assert genotype.is_inserted(Feature('geneB')) is True
+    assert genotype.is_inserted(Feature.parse('Ec/geneB')) is True
+    assert genotype.is_inserted(Feature.parse('Sc/geneB')) is False
+    assert genotype.is_inserted(Feature('geneD')) is False
+
+
+def test_is_deleted():
+    genotype = Genotype.parse('-geneA -geneB@locusX -(pA) siteC>geneD')
+    assert genotype.is_deleted(Feature('geneA')) is True
+    assert genotype.is_deleted(Feature('geneB')) is True
+    assert genotype.is_deleted(Feature('locusX')) is False
+    assert genotype.is_deleted(Plasmid('pA')) is True
+    assert genotype.is_deleted(Feature('siteC')) is False
+    assert genotype.is_deleted(Feature('geneD')) is False
+
+
+def test_is_replaced():
+    genotype = Genotype.parse('siteC>geneD siteE@locusF>geneG')
+    assert genotype.is_replaced(Feature('siteC')) is True
+    assert genotype.is_replaced(Feature('siteE')) is True
+    assert genotype.is_replaced(Feature('geneD')) is False
+
+
+def test_is_present():
+    genotype = Genotype.parse('siteA>geneB:geneC (pD geneE) +geneF')
+    assert genotype.is_present(Feature('geneB')) is True
+    assert genotype.is_present(Fusion(Feature('geneB'), Feature('geneC'))) is True
+    assert genotype.is_present(Plasmid('pD')) is True
+    assert genotype.is_present(Feature('geneE')) is True
+    assert genotype.is_present(Feature('geneF')) is True
+    assert genotype.is_present(Feature('siteA')) is False
+
+
+def test_query_by_accession():
+    genotype = Genotype.parse('+geneA#GB:123 +#GB:456')
+    assert genotype.is_inserted(Feature.parse('#GB:123')) is True
+    assert genotype.is_inserted(Feature.parse('geneX#GB:456')) is True
+    assert genotype.is_inserted(Feature.parse('geneA#GB:789')) is False
+
+
+def test_variant_of():
+    genotype = Genotype.parse('+geneA(x) siteB>geneC(y) -geneD(z)')
+    assert genotype.variant_of(Feature('geneA')) == {Feature.parse('geneA(x)')}
+    assert genotype.variant_of(Feature.parse('geneC(q)')) == {Feature.parse('geneC(y)')}
+    assert genotype.variant_of(Feature('geneD')) == set()
+
+
+def test_index_follows_inheritance():
+    parent = Genotype.parse('+geneA -geneB')
+    genotype = Genotype.parse('-geneA', parent=parent)
+    assert parent.is_inserted(Feature('geneA')) is True
+    assert genotype.is_inserted(Feature('geneA')) is False
+    assert genotype.is_deleted(Feature('geneB')) is True
+
+
+def test_index_reset_on_change():
+    genotype = Genotype.parse('+geneA')
+    assert genotype.is_inserted(Feature('geneA')) is True
+    genotype.state.change(-Feature('geneA'))
+    assert genotype.is_inserted(Feature('geneA')) is False
+
+
+def test_feature_index_locus():
+    index = FeatureIndex(Genotype.parse('-geneA@locusX').changes())
+    assert index.find(LOCUS, Feature('locusX')) == [Feature('locusX')]
+    assert index.find(REMOVED, Feature('geneA')) == [Feature('geneA')]
+    assert index.find(INSERTED, Feature('geneA')) == []
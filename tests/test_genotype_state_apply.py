@@ -0,0 +1,93 @@
+import pytest
+
+from gnomic import Genotype
+from gnomic.genotype import GenotypeState, ADDED, MERGED, UNCHANGED
+from gnomic.types import Change, Feature as F, Plasmid
+
+
+@pytest.fixture
+def state():
+    return GenotypeState()
+
+
+def test_change_outcome(state):
+    assert state.change(+F('a')) == ADDED
+    assert state.change(+F('a')) == UNCHANGED
+    assert state.change(-F('a')) == MERGED
+    assert state.change(F('b') > F('b')) == UNCHANGED
+    assert state.change(F('b') > F('c')) == ADDED
+    assert state.change(F('c') > F('d')) == MERGED
+
+
+def test_apply_report(state):
+    report = state.apply([+F('a'), +F('a'), -F('b'), +F('b'), F('c') > F('d'), +Plasmid('pA')])
+
+    assert report == (4, 1, 1)
+    assert (report.added, report.merged, report.unchanged) == (4, 1, 1)
+    assert state.changes == (
+        Change(None, F('a')),
+        Change(F('c'), F('d')),
+        Change(None, Plasmid('pA')),
+    )
+
+
+def test_apply_matches_sequential_changes():
+    changes = Genotype._parse_gnomic_string('+a(x) -b c>d:e -d@c +b f>>g +a(y) -(pA) d>h (pB k) -e x>{y, z} -y@x')
+
+    sequential = GenotypeState()
+    for change in changes:
+        sequential.change(change)
+
+    batch = GenotypeState()
+    batch.apply(changes)
+
+    assert batch.changes == sequential.changes
+
+
+@pytest.mark.parametrize('definitions, expected', [
+    (['siteA>geneB', '+promoterX:siteA', 'siteA>geneC'], '+promoterX:siteA siteA>geneC'),
+    (['+a(x) -b c>d:e -d@c +b f>>g +a(y) -(pA) d>h (pB k) -e x>{y, z} -y@x'],
+     'f>g +a(y) -(pA) d>h (pB k) -c x>{z}'),
+    (['+geneA', '-geneA'], ''),
+    (['-geneA', '+geneA(x)'], '-geneA +geneA(x)'),
+    (['siteA>geneB', 'geneB>geneC'], 'siteA>geneC'),
+    (['siteA>geneB:geneC', 'geneC>geneD'], 'siteA>geneB:geneD'),
+    (['siteA>geneB:geneC', '-geneB@siteA'], 'siteA>geneC'),
+    (['+geneA(x)', '+geneA(y)'], '+geneA(y)'),
+    (['+geneA(x) +geneA(y)', 'geneA>>geneB'], '+{geneA(y), geneB}'),
+    (['(pA geneB)', '-(pA)'], ''),
+    (['-geneA', '-geneA', '+geneB', 'geneB>geneB'], '-geneA +geneB'),
+    (['siteA>P.pA:geneB', 'siteA>P.pB:geneB'], 'siteA>P.pB:geneB'),
+])
+def test_apply_regressions(definitions, expected):
+    genotype = None
+    for definition in definitions:
+        genotype = Genotype.parse(definition, parent=genotype)
+    assert genotype.format('gnomic') == expected
+
+    state = GenotypeState()
+    for definition in definitions:
+        state.apply(Genotype._parse_gnomic_string(definition))
+    assert state.changes == genotype.state.changes
+
+
+def test_apply_large_batch(state):
+    state.apply(+F('gene{}'.format(i)) for i in range(2000))
+    report = state.apply(-F('gene{}'.format(i)) for i in range(0, 2000, 2))
+
+    assert report == (0, 1000, 0)
+    assert len(state.changes) == 1000
+
+
+def test_genotype_extend():
+    genotype = Genotype.parse('+geneA -geneB')
+    assert genotype.is_inserted(F('geneA')) is True
+
+    report = genotype.extend(Genotype._parse_gnomic_string('-geneA +geneC'))
+
+    assert report == (1, 1, 0)
+    assert genotype.is_inserted(F('geneA')) is False
+    assert genotype.changes() == (
+        Change(F('geneB'), None),
+        Change(None, F('geneC')),
+    )
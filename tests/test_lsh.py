@@ -0,0 +1,92 @@
+import pytest
+
+from gnomic import Genotype
+
+np = pytest.importorskip('numpy')
+
+from gnomic.lsh import LSHIndex, MinHash, shingles, similarity  # noqa: E402
+
+
+def strain(n, extra=()):
+    return Genotype.parse(' '.join(['-gene{}'.format(i) for i in range(n)] + list(extra)))
+
+
+def test_shingles():
+    genotype = Genotype.parse('+geneA -geneB +geneA')
+    assert shingles(genotype) == {'+geneA', '-geneB'}
+    assert {'inserted:name:geneA', 'removed:name:geneB'} <= shingles(genotype, features=True)
+
+
+def test_minhash_similarity():
+    minhash = MinHash(num_perm=256)
+    a = minhash.signature(shingles(strain(40)))
+    b = minhash.signature(shingles(strain(40, ['+geneX'])))
+    c = minhash.signature(shingles(Genotype.parse('+geneY +geneZ')))
+
+    assert a.dtype == np.uint32 and a.shape == (256,)
+    assert similarity(a, a) == 1
+    assert abs(similarity(a, b) - 40 / 41.) < 0.1
+    assert similarity(a, c) < 0.1
+    assert list(MinHash(num_perm=256).signature(shingles(strain(40)))) == list(a)
+
+
+def test_lsh_index_query():
+    index = LSHIndex(num_perm=64, bands=16)
+    index.add('base', strain(30))
+    index.add('near', strain(30, ['+geneX']))
+    index.add('far', Genotype.parse('+geneY +geneZ'))
+
+    assert len(index) == 3 and 'near' in index
+    results = index.query(strain(30, ['+geneW']), threshold=0.5)
+    assert [genotype_id for genotype_id, _ in results] in (['base', 'near'], ['near', 'base'])
+    assert index.query(Genotype.parse('+geneQ')) == []
+
+    # replace and remove
+    index.add('far', strain(30))
+    assert index.query(strain(30), threshold=1)[0] in (('base', 1.0), ('far', 1.0))
+    index.remove('far')
+    assert index.ids == {'base', 'near'}
+    with pytest.raises(KeyError):
+        index.remove('far')
+
+
+def test_lsh_index_reuses_rows():
+    index = LSHIndex(num_perm=64, bands=16)
+    signatures = [index.signature(strain(i + 1)) for i in range(10)]
+    for _ in range(100):
+        for i, signature in enumerate(signatures):
+            index.add(i, signature=signature)
+
+    assert len(index._ids) == 10
+    assert len(index._signatures) == 16
+    assert index.query(signature=signatures[4], threshold=1) == [(4, 1.0)]
+
+
+def test_lsh_index_near_duplicates():
+    index = LSHIndex(num_perm=64, bands=16)
+    for i in range(5):
+        index.add(i, strain(30, ['+geneX{}'.format(i)]))
+    index.add('odd', Genotype.parse('+geneY'))
+
+    pairs = list(index.near_duplicates(threshold=0.8))
+    assert sorted((a, b) for a, b, _ in pairs) == [(a, b) for a in range(5) for b in range(a + 1, 5)]
+
+    with pytest.raises(ValueError):
+        LSHIndex(num_perm=64, bands=10)
+
+
+def test_lsh_index_save_load(tmpdir):
+    index = LSHIndex(num_perm=32, bands=8, features=True)
+    index.add('a', strain(10))
+    index.add('b', strain(10, ['+geneX']))
+    index.add('c', Genotype.parse('+geneY'))
+    index.remove('c')
+
+    path = str(tmpdir.join('signatures.npz'))
+    index.save(path)
+    loaded = LSHIndex.load(path)
+
+    assert (loaded.num_perm, loaded.bands, loaded.seed, loaded.features) == (32, 8, 1, True)
+    assert loaded.ids == {'a', 'b'}
+    assert list(loaded.get_signature('b')) == list(index.get_signature('b'))
+    assert loaded.query(strain(10)) == index.query(strain(10))
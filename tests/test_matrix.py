@@ -0,0 +1,150 @@
+import pytest
+
+from gnomic import Genotype
+from gnomic.types import Feature
+
+np = pytest.importorskip('numpy')
+
+from gnomic.matrix import FeatureBitsets, Vocabulary  # noqa: E402
+
+
+@pytest.fixture
+def genotypes():
+    return [Genotype.parse(s) for s in ('+geneA +geneB -geneC', '+geneA -geneC -geneD', '', '+geneE:geneB')]
+
+
+def test_vocabulary():
+    vocabulary = Vocabulary([Feature('a'), Feature('b'), Feature('a')])
+    assert len(vocabulary) == 2
+    assert vocabulary.id(Feature('b')) == 1
+    assert vocabulary[0] == Feature('a')
+    assert Feature.parse('a(x)') not in vocabulary
+    assert vocabulary.add(Feature.parse('a(x)')) == 2
+    with pytest.raises(KeyError):
+        vocabulary.id(Feature('c'))
+
+
+def test_features(genotypes):
+    bitsets = FeatureBitsets(genotypes)
+    assert len(bitsets) == 4
+    for row, genotype in enumerate(genotypes):
+        assert bitsets.features(row) == genotype.added_features
+        assert bitsets.features(row, removed=True) == genotype.removed_features
+
+
+def test_set_operations(genotypes):
+    bitsets = FeatureBitsets(genotypes)
+    assert bitsets.union() == {Feature('geneA'), Feature('geneB'), Feature('geneE')}
+    assert bitsets.union([0, 1], removed=True) == {Feature('geneC'), Feature('geneD')}
+    assert bitsets.intersection([0, 1]) == {Feature('geneA')}
+    assert bitsets.intersection([0, 1], removed=True) == {Feature('geneC')}
+    assert bitsets.intersection([]) == set()
+    assert bitsets.sizes().tolist() == [2, 1, 0, 2]
+
+
+def test_counts(genotypes):
+    bitsets = FeatureBitsets(genotypes)
+    counts = bitsets.counts()
+    assert counts[bitsets.vocabulary.id(Feature('geneA'))] == 2
+    assert counts[bitsets.vocabulary.id(Feature('geneB'))] == 2
+    assert bitsets.counts(removed=True)[bitsets.vocabulary.id(Feature('geneC'))] == 2
+
+
+def test_jaccard(genotypes):
+    bitsets = FeatureBitsets(genotypes)
+    assert bitsets.jaccard(0).tolist() == [1.0, 0.5, 0.0, pytest.approx(1 / 3.)]
+    assert bitsets.jaccard(2).tolist() == [0.0, 0.0, 1.0, 0.0]
+    matrix = bitsets.pairwise_jaccard(removed=True)
+    assert matrix.shape == (4, 4)
+    assert matrix[0, 1] == matrix[1, 0] == 0.5
+
+
+def test_vocabulary_growth():
+    bitsets = FeatureBitsets()
+    genotypes = [Genotype([+Feature('gene{}'.format(i)) for i in range(n, n + 50)]) for n in range(0, 500, 25)]
+    for genotype in genotypes:
+        bitsets.add(genotype)
+
+    assert len(bitsets.vocabulary) == 525
+    for row, genotype in enumerate(genotypes):
+        assert bitsets.features(row) == genotype.added_features
+    counts = bitsets.counts()
+    assert len(counts) == 525
+    assert counts[bitsets.vocabulary.id(Feature('gene0'))] == 1
+    assert counts[bitsets.vocabulary.id(Feature('gene25'))] == 2
+    assert counts[bitsets.vocabulary.id(Feature('gene524'))] == 1
+
+
+def test_shared_vocabulary(genotypes):
+    first = FeatureBitsets(genotypes[:1])
+    second = FeatureBitsets(genotypes[1:], vocabulary=first.vocabulary)
+    assert first.bits().shape[1] == second.bits().shape[1]
+    assert first.features(0) == genotypes[0].added_features
+
+
+def test_design_matrix_builder():
+    from gnomic.matrix import DesignMatrixBuilder, FEATURE, VARIANT, FUSION, PLASMID
+    from gnomic.types import Fusion, Plasmid
+
+    builder = DesignMatrixBuilder(chunk_size=2)
+    builder.add_many(Genotype.parse(s) for s in ('+geneA(x) -geneB', 'siteC>geneD:geneE', '(pF geneG)', '-geneA'))
+    assert len(builder) == 4
+
+    columns = builder.columns
+    rows, cols, values = builder.coo_arrays()
+    cells = {(int(row), columns[int(col)]): int(value) for row, col, value in zip(rows, cols, values)}
+
+    assert cells == {
+        (0, (VARIANT, Feature.parse('geneA(x)'))): 1,
+        (0, (FEATURE, Feature('geneA'))): 1,
+        (0, (FEATURE, Feature('geneB'))): -1,
+        (1, (FEATURE, Feature('siteC'))): -1,
+        (1, (FUSION, Fusion(Feature('geneD'), Feature('geneE')))): 1,
+        (1, (FEATURE, Feature('geneD'))): 1,
+        (1, (FEATURE, Feature('geneE'))): 1,
+        (2, (PLASMID, Plasmid('pF'))): 1,
+        (2, (FEATURE, Feature('geneG'))): 1,
+        (3, (FEATURE, Feature('geneA'))): -1,
+    }
+
+
+def test_design_matrix_frozen_columns():
+    from gnomic.matrix import DesignMatrixBuilder
+
+    training = DesignMatrixBuilder()
+    training.add(Genotype.parse('+geneA -geneB'))
+
+    builder = DesignMatrixBuilder(training.columns, frozen=True)
+    builder.add(Genotype.parse('+geneA +geneC'))
+    data, indices, indptr = builder.csr_arrays()
+
+    assert len(training.columns) == 2
+    assert indices.tolist() == [training.columns.id(('feature', Feature('geneA')))]
+    assert data.tolist() == [1]
+    assert indptr.tolist() == [0, 1]
+
+
+def test_design_matrix_large_counts():
+    from gnomic.matrix import DesignMatrixBuilder, FEATURE
+    from gnomic.types import Plasmid
+
+    builder = DesignMatrixBuilder()
+    builder.add(Genotype([+Plasmid('pA', [Feature('geneA')] * 200)]))
+    data, indices, indptr = builder.csr_arrays()
+
+    assert data[indices.tolist().index(builder.columns.id((FEATURE, Feature('geneA'))))] == 200
+
+
+def test_design_matrix_csr():
+    pytest.importorskip('scipy')
+    from gnomic.matrix import design_matrix
+
+    genotypes = [Genotype([+Feature('gene{}'.format(i % 7)), -Feature('gene{}'.format(i % 5))]) for i in range(25)]
+    matrix, columns = design_matrix(genotypes, chunk_size=4)
+
+    assert matrix.shape == (25, len(columns))
+    assert matrix.sum(axis=1).tolist() == [[0]] * 25
+    assert matrix[1, columns.id(('feature', Feature('gene1')))] == 0
+    assert matrix[2, columns.id(('feature', Feature('gene1')))] == 0
+    assert matrix[6, columns.id(('feature', Feature('gene6')))] == 1
+    assert matrix[6, columns.id(('feature', Feature('gene1')))] == -1
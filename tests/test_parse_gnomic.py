@@ -1,12 +1,15 @@
 import pytest
 
 from gnomic.grammar import GnomicParser
-from gnomic.semantics import DefaultSemantics
+from gnomic.semantics import DefaultSemantics, LeanParser, parse as lean_parse
 from gnomic.types import Feature, Plasmid, Change, Accession, Fusion, CompositeAnnotation
 
 
-@pytest.fixture
-def parse():
+@pytest.fixture(params=['grako', 'lean'])
+def parse(request):
+    if request.param == 'lean':
+        return lean_parse
+
     def parse_(gnomic_string, *args, **kwargs):
         parser = GnomicParser()
         semantics = DefaultSemantics(*args, **kwargs)
@@ -59,3 +62,10 @@ def test_parse_composite_annotation(parse):
         before=Feature('geneX'),
         after=Fusion(CompositeAnnotation(Feature('geneA'), Feature('geneB')), Feature('geneX')))
            ] == parse('geneX>{geneA, geneB}:geneX')
+
+
+def test_lean_parser():
+    parser = LeanParser()
+    assert parser.parse('+geneA siteB>geneC', whitespace='') == [+Feature('geneA'), Feature('siteB') > Feature('geneC')]
+    assert parser.parse('-geneD', whitespace='') == [-Feature('geneD')]
+    assert lean_parse('Ec/geneA', rule_name='FEATURE') == Feature('geneA', organism='Ec')
@@ -0,0 +1,78 @@
+import pytest
+
+from gnomic import Genotype
+from gnomic.index import GenotypeIndex
+from gnomic.query import Query, FeaturePattern, search
+from gnomic.types import Feature
+
+GENOTYPES = {
+    'a': '-geneA +Ec/geneB(x) (pUC19)',
+    'b': '-geneA +Sc/geneB (pUC19)',
+    'c': '-geneA siteC>Ec/geneB(y)',
+    'd': '+geneA +P.geneB(z) -geneD@locusE',
+    'e': 'siteC>P.promoterF:geneG (pUC19 geneH)',
+    'f': '+geneB',
+}
+
+
+@pytest.fixture
+def index():
+    return GenotypeIndex((key, Genotype.parse(value)) for key, value in GENOTYPES.items())
+
+
+def test_feature_pattern():
+    pattern = FeaturePattern('geneB', any_variant=True)
+    assert pattern.match(Feature.parse('geneB(x)')) is True
+    assert pattern.match(Feature.parse('geneB')) is False
+    assert FeaturePattern('geneB').match(Feature.parse('geneB')) is True
+    assert pattern != Feature('geneB') and Feature('geneB') != pattern
+    assert pattern == FeaturePattern('geneB', any_variant=True)
+
+
+@pytest.mark.parametrize('query_string', ['+*', '+geneB:*', 'geneA>*', '-*@locusA', '(*)'])
+def test_parse_name_wildcard(query_string):
+    with pytest.raises(ValueError):
+        Query.parse(query_string)
+
+
+def test_parse_wildcards():
+    query = Query.parse('+*/*.geneB(*) -Ec/geneA')
+    feature = query.changes[0].after
+    assert (feature.name, feature.organism, feature.type, feature.variant, feature.any_variant) \
+        == ('geneB', None, None, None, True)
+    assert query.changes[1].before.organism == 'Ec'
+    assert str(query) == '+geneB(*) -Ec/geneA'
+
+
+def test_str_plasmids():
+    query = Query.parse('(pUC19) -(pA) +geneB(*)')
+    assert str(query) == '(pUC19) -(pA) +geneB(*)'
+    assert str(Query.parse(str(query))) == str(query)
+
+
+@pytest.mark.parametrize('query_string, expected', [
+    ('-geneA', {'a', 'b', 'c'}),
+    ('-geneA +Ec/geneB(*) (pUC19)', {'a'}),
+    ('-geneA +Ec/geneB(*)', {'a', 'c'}),
+    ('+geneB(*)', {'a', 'c', 'd'}),
+    ('+geneB', {'a', 'b', 'c', 'd', 'f'}),
+    ('+*/geneB', {'a', 'b', 'c', 'd', 'f'}),
+    ('+geneB(y)', {'c'}),
+    ('(pUC19)', {'a', 'b', 'e'}),
+    ('+geneH', {'e'}),
+    ('siteC>*.promoterF:geneG', {'e'}),
+    ('siteC>geneB', {'c'}),
+    ('-geneD@locusE', {'d'}),
+    ('-geneD@locusX', set()),
+    ('', {'a', 'b', 'c', 'd', 'e', 'f'}),
+])
+def test_search(index, query_string, expected):
+    assert search(index, query_string) == expected
+
+    query = Query.parse(query_string)
+    assert {key for key, value in GENOTYPES.items() if query.match(Genotype.parse(value))} == expected
+
+
+def test_search_without_variants(index):
+    assert search(index, '+geneB(q)') == set()
+    assert search(index, '+geneB(q)', match_variants=False) == {'a', 'b', 'c', 'd', 'f'}
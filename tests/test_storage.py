@@ -0,0 +1,149 @@
+import pytest
+
+from gnomic import Genotype
+from gnomic.index import INSERTED, LOCUS, REMOVED, REPLACED, REPLACEMENT, GenotypeIndex
+from gnomic.storage import GenotypeStore
+from gnomic.types import Accession, CompositeAnnotation, Feature, Fusion, Plasmid
+from gnomic.utils import chain
+
+GENOTYPES = {
+    1: '-geneA (pX)',
+    2: '-geneA +geneB(x)',
+    3: 'siteC>geneB:geneD (pX geneE)',
+    4: '-geneF@locusG +Ec/geneB +#ACC1 +{geneH, geneI} +geneJ#DB:ACC2',
+}
+
+
+@pytest.fixture
+def store():
+    store = GenotypeStore()
+    store.add_many({strain: Genotype.parse(s) for strain, s in GENOTYPES.items()}, batch_size=3)
+    return store
+
+
+def test_load(store):
+    assert len(store) == 4
+    assert list(store) == ['1', '2', '3', '4']
+    for strain, s in GENOTYPES.items():
+        genotype = Genotype.parse(s)
+        assert strain in store
+        assert store[strain] == genotype
+        assert store[strain].changes() == genotype.changes()
+    assert dict(store.items())['3'].fingerprint() == Genotype.parse(GENOTYPES[3]).fingerprint()
+
+    assert 5 not in store
+    assert store.get(5) is None
+    with pytest.raises(KeyError):
+        store[5]
+
+
+def test_find(store):
+    assert store.find(REMOVED, Feature('geneA')) == {'1', '2'}
+    assert store.find(INSERTED, Plasmid('pX')) == {'1', '3'}
+    assert store.find(INSERTED, Feature('geneB')) == {'2', '4'}
+    assert store.find(INSERTED, Feature.parse('geneB(x)')) == {'2'}
+    assert store.find(INSERTED, Feature.parse('geneB(y)'), match_variants=False) == {'2', '4'}
+    assert store.find(INSERTED, Feature.parse('Ec/geneB')) == {'4'}
+    assert store.find(INSERTED, Feature(accession=Accession('ACC1'))) == {'4'}
+    assert store.find(INSERTED, Feature('geneJ', accession=Accession('ACC2', 'DB'))) == {'4'}
+    assert store.find(INSERTED, Feature('geneE')) == {'3'}
+    assert store.find(INSERTED, Feature('geneH')) == {'4'}
+    assert store.find(REPLACED, Feature('siteC')) == {'3'}
+    assert store.find(REPLACEMENT, Fusion(Feature('geneB'), Feature('geneD'))) == {'3'}
+    assert store.find(LOCUS, Feature('locusG')) == {'4'}
+    assert store.find(REMOVED, Feature('geneX')) == set()
+    assert store.find(INSERTED, Feature()) == set()
+
+
+@pytest.mark.parametrize('role, annotation', [
+    (INSERTED, Fusion(Feature('geneA'), Feature('geneB'))),
+    (INSERTED, Fusion(Feature.parse('geneA(x)'), Feature('geneB'))),
+    (INSERTED, Fusion(Feature('Ec/geneA'), Feature('geneB'))),
+    (INSERTED, Fusion(Feature('geneA'), Feature('geneB'), Feature('geneC'))),
+    (INSERTED, Fusion(Feature(), Feature('geneB'))),
+    (INSERTED, CompositeAnnotation(Feature('geneD'), Feature('geneE'))),
+    (INSERTED, CompositeAnnotation(Feature('geneD'))),
+    (LOCUS, Feature('locusF')),
+])
+def test_find_matches_index(role, annotation):
+    genotypes = {strain: Genotype.parse(s) for strain, s in [
+        ('1', '+geneA(x):geneB'), ('2', '+geneA:geneB:geneC'), ('3', '+geneA:geneB +{geneD, geneE}'),
+        ('4', '+Ec/geneA:geneB'), ('5', '+geneB:geneA -geneA@locusF'),
+    ]}
+    store = GenotypeStore()
+    store.add_many(genotypes)
+
+    assert store.find(role, annotation) == GenotypeIndex(genotypes).find(role, annotation)
+    assert store.find(role, annotation, match_variants=False) == \
+        GenotypeIndex(genotypes).find(role, annotation, match_variants=False)
+
+
+def test_search(store):
+    assert store.search(all_of=[(REMOVED, Feature('geneA')), (INSERTED, Plasmid('pX'))]) == {'1'}
+    assert store.search(any_of=[(REMOVED, Feature('geneA')), (INSERTED, Plasmid('pX'))]) == {'1', '2', '3'}
+    assert store.search(none_of=[(REMOVED, Feature('geneA'))]) == {'3', '4'}
+    assert store.search(all_of=[(INSERTED, Feature('geneB'))],
+                        none_of=[(INSERTED, Feature.parse('geneB(x)'))]) == {'4'}
+    assert store.search() == {'1', '2', '3', '4'}
+
+
+def test_replace_and_remove(store):
+    store.add(1, Genotype.parse('+geneZ'))
+    assert store.find(INSERTED, Plasmid('pX')) == {'3'}
+    assert store.find(INSERTED, Feature('geneZ')) == {'1'}
+
+    store.remove(1)
+    assert len(store) == 3
+    assert store.find(INSERTED, Feature('geneZ')) == set()
+    with pytest.raises(KeyError):
+        store.remove(1)
+
+
+def test_lineage(tmpdir):
+    path = str(tmpdir.join('strains.db'))
+    parent = chain('+geneA', '-geneB')
+    child = Genotype.parse('+geneC', parent=parent)
+
+    with GenotypeStore(path) as store:
+        store.add('root', parent.parent)
+        store.add('parent', parent)
+        store.add('child', child)
+        store.add('orphan', Genotype.parse('+geneD'), parent=None)
+        with pytest.raises(KeyError):
+            store.add('other', Genotype.parse('+geneD'), parent='missing')
+        assert 'other' not in store
+
+    with GenotypeStore(path) as store:
+        assert store.parent('child') == 'parent'
+        assert store.parent('orphan') is None
+        assert store.lineage('child') == ['root', 'parent', 'child']
+
+        genotype = store.get('child', parents=True)
+        assert genotype == child
+        assert genotype.parent == parent
+        assert genotype.parent.parent == parent.parent
+        assert store.get('child').parent is None
+
+        store.remove('parent')
+        assert store.lineage('child') == ['child']
+
+
+def test_net_changes_not_replayed():
+    genotype = chain('siteA>geneB', '+promoterX:siteA', 'siteA>geneC')
+    store = GenotypeStore()
+    store.add('a', genotype)
+
+    assert list(map(str, store['a'].changes())) == ['+promoterX:siteA', 'siteA>geneC']
+    assert store['a'].fingerprint() == genotype.fingerprint()
+
+
+def test_long_lineage():
+    store = GenotypeStore()
+    store.add_many((i, Genotype.parse('+gene{}'.format(i)), i - 1 if i else None) for i in range(1500))
+
+    genotype = store.get(1499, parents=True)
+    depth = 0
+    while genotype.parent is not None:
+        genotype, depth = genotype.parent, depth + 1
+    assert depth == 1499
+    assert genotype.changes() == Genotype.parse('+gene0').changes()
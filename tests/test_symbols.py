@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import pickle
+from multiprocessing import Pool
+
+import pytest
+
+from gnomic import Genotype
+from gnomic.types import Accession, Feature
+
+pytest.importorskip('multiprocessing.shared_memory')
+
+from gnomic.symbols import SharedSymbolTable, decode_feature, encode_feature  # noqa: E402
+
+FEATURES = [Feature('geneA'),
+            Feature('geneB', organism='Ec', variant=('x', 'y')),
+            Feature('geneA'),
+            Feature('gène', type='promoter'),
+            Feature(accession=Accession('ACC1', 'DB'))]
+
+_table = None
+
+
+def _init_worker(table):
+    global _table
+    _table = table
+
+
+def _added_feature_ids(gnomic_string):
+    return sorted(_table.id(feature) for feature in Genotype.parse(gnomic_string).added_features)
+
+
+def test_encode_decode():
+    for feature in FEATURES:
+        assert decode_feature(encode_feature(feature)) == feature
+        assert repr(decode_feature(encode_feature(feature))) == repr(feature)
+
+
+def test_symbol_table():
+    with SharedSymbolTable.create(FEATURES) as table:
+        assert len(table) == 4
+        assert table.ids(FEATURES) == [0, 1, 0, 2, 3]
+        assert list(table) == [FEATURES[0], FEATURES[1], FEATURES[3], FEATURES[4]]
+        assert Feature('geneC') not in table
+        assert table.get_id(Feature('geneB', organism='Ec')) is None
+        with pytest.raises(KeyError):
+            table.id(Feature('geneC'))
+        with pytest.raises(IndexError):
+            table[4]
+
+        other = pickle.loads(pickle.dumps(table))
+        assert other.name == table.name
+        assert other.id(Feature('gène', type='promoter')) == 2
+        assert other[1] == FEATURES[1]
+        other.close()
+
+
+def test_symbol_table_workers():
+    genotypes = ['+geneA +Ec/geneB(x; y)', '+promoter.geneC', '+#DB:ACC1 +geneA']
+    features = [feature for s in genotypes for feature in Genotype.parse(s).added_features]
+
+    with SharedSymbolTable.create(features) as table:
+        pool = Pool(2, initializer=_init_worker, initargs=(table,))
+        try:
+            ids = pool.map(_added_feature_ids, genotypes)
+        finally:
+            pool.close()
+            pool.join()
+
+        assert [set(table.decode(feature_ids)) for feature_ids in ids] == \
+            [set(Genotype.parse(s).added_features) for s in genotypes]
@@ -1,4 +1,4 @@
-from gnomic.types import Feature as F, Fusion
+from gnomic.types import Accession, Feature as F, Fusion
 
 
 def test_fusion_contains():
@@ -6,3 +6,20 @@ def test_fusion_contains():
     assert Fusion(F('a'), F('b'), F('c'), F('d')).contains(Fusion(F('a'), F('c'))) is False
     assert Fusion(F('a'), F('b'), F('c'), F('d')).contains(F('a')) is True
     assert Fusion(F('a'), F('b'), F('c'), F('d')).contains(F('x')) is False
+
+
+def test_accession_parse():
+    assert Accession.parse('DB:ACC1') == Accession('ACC1', 'DB')
+    assert Accession.parse('ACC1') == Accession('ACC1')
+    assert Accession.parse(repr(Accession('ACC1', 'DB'))) == Accession('ACC1', 'DB')
+
+
+def test_cached_str():
+    feature = F('geneA', organism='Ec', variant=('x',))
+    change = feature > Fusion(F('promoterB', type='promoter'), F('geneC'))
+    assert str(change) == 'Ec/geneA(x)>promoter.promoterB:geneC'
+    assert str(change) is str(change)
+    assert str(change.before) is str(feature)
+
+    assert repr(feature) == repr(F('geneA', organism='Ec', variant=('x',)))
+    assert '_str' not in repr(change)